@@ -0,0 +1,222 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+
+# run as a script from anywhere (python dataset/benchmark.py): the repository root holds the dataset
+# package and knowledge_graph_planning the pddl_parser one, spawned processes inherit sys.path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "knowledge_graph_planning"), ROOT):
+	if path not in sys.path:
+		sys.path.insert(0, path)
+
+if TYPE_CHECKING:
+	from dataset.dataset import DatasetGenerator
+	from pddl_parser.problem import Problem
+
+# (max rooms, max items, max people) handed to DatasetGenerator, the generator
+# stops early when it runs out of room types or names
+SCALES: dict[str, tuple[int, int, int]] = {
+	"small": (5, 20, 3),
+	"medium": (15, 60, 10),
+	"large": (35, 150, 25),
+}
+
+# goal kind -> the DatasetGenerator frequency that is set to 1, the others are set to 0,
+# people do not generate goals
+GOAL_KINDS: dict[str, str] = {
+	"room": "FRAC_ROOM_GOALS",
+	"collective": "FRAC_COLLECTIVE_GOALS",
+	"movable": "FRAC_MOVABLE_GOALS",
+}
+GOAL_FREQUENCIES = ["FRAC_ROOM_GOALS", "FRAC_COLLECTIVE_GOALS", "FRAC_MOVABLE_GOALS", "FRAC_PERSON_GOALS"]
+
+MAX_GOAL_ATTEMPTS = 10
+
+# seconds a planner process gets past its time limit before it is killed and the run recorded as a timeout,
+# the planner only checks its budget between search nodes
+KILL_GRACE = 30
+# seconds a scale gets to generate its problems
+GENERATION_TIMEOUT = 600
+
+# search:heuristic[:sas|full], full grounds the actions irrelevant to the goal as well
+DEFAULT_CONFIGURATIONS = ["gbfs:hff", "siw-bfsf:hadd"]
+
+def generate_problems(scale: str, seed: int, goals_per_kind: int, out_dir: str) -> list[dict[str, Any]]:
+	# runs in a fresh process, DatasetGenerator draws names from pools shared by the whole module
+	from dataset.dataset import DatasetGenerator
+
+	random.seed(seed)
+	np.random.seed(seed)
+	DatasetGenerator.MAX_ROOMS, DatasetGenerator.MAX_ITEMS, DatasetGenerator.MAX_PEOPLE = SCALES[scale]
+	generator = DatasetGenerator(out_dir)
+	os.makedirs(out_dir, exist_ok=True)
+	_, domain_pddl = generator.generate_domain_pddl()
+	domain_path = os.path.join(out_dir, "domain.pddl")
+	with open(domain_path, "w") as f:
+		f.write(domain_pddl)
+
+	problems: list[dict[str, Any]] = []
+	for kind, frequency in GOAL_KINDS.items():
+		for name in GOAL_FREQUENCIES:
+			setattr(DatasetGenerator, name, 1.0 if name == frequency else 0.0)
+		for i in range(goals_per_kind):
+			# the goal is applied to the world, so every problem starts where the previous goal left it
+			problem = generate_goal_problem(generator)
+			if problem is None:
+				print(f"No {kind} goal for the {scale} scale")
+				break
+			problem_path = os.path.join(out_dir, f"{kind}_{i:02d}.pddl")
+			problem.write(problem_path)
+			problems.append({
+				"scale": scale,
+				"rooms": len(generator.rooms),
+				"items": len(generator.movable_items),
+				"people": len(generator.people),
+				"objects": len(problem.objects),
+				"facts": len(problem.facts),
+				"goal_kind": kind,
+				"goal_literals": len(problem.positive_goals) + len(problem.negative_goals),
+				"domain_path": domain_path,
+				"problem_path": problem_path,
+			})
+	return problems
+
+def generate_goal_problem(generator: DatasetGenerator) -> Problem | None:
+	# goals that already hold in the current state are drawn again
+	for _ in range(MAX_GOAL_ATTEMPTS):
+		problem = generator.generate_problem()
+		try:
+			goal = generator.generate_goal()
+		except Exception:
+			return None
+		goal.add_to_problem(problem)
+		if any(atom not in problem.facts for atom in problem.positive_goals) or any(atom in problem.facts for atom in problem.negative_goals):
+			return problem
+	return None
+
+def run_configuration(domain_path: str, problem_path: str, configuration: str, time_limit: float | None) -> dict[str, Any]:
+	# runs in a fresh process so that peak_rss belongs to this planner call alone
+	from pddl_parser.planner import Planner
+	from pddl_parser.budget import Budget
+
+	search, heuristic, *mode = configuration.split(":")
+	planner = Planner(search, heuristic, cache_dir=None, sas="sas" in mode, relevance="full" not in mode)
+	planner.solve(domain_path, problem_path, budget=Budget(time_limit))
+	return planner.stats.as_dict()
+
+def current_commit() -> str | None:
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+def run_in_process(context: Any, timeout: float | None, function: Any, *args: Any) -> Any:
+	# runs function in a fresh process, raises multiprocessing.TimeoutError after timeout seconds and kills the process
+	pool = context.Pool(1)
+	try:
+		return pool.apply_async(function, args).get(timeout)
+	finally:
+		pool.terminate()
+		pool.join()
+
+def unfinished_stats(status: str, duration: float) -> dict[str, Any]:
+	# statistics of a planner run that was killed or raised before it could report its own
+	from pddl_parser.stats import PlannerStats
+
+	stats = PlannerStats()
+	stats.status = status
+	stats.total_time = duration
+	return stats.as_dict()
+
+def run_benchmark(scales: list[str], configurations: list[str], seed: int, goals_per_kind: int, time_limit: float | None, work_dir: str) -> dict[str, Any]:
+	from pddl_parser.budget import TIMEOUT
+	from pddl_parser.backend import ERROR
+
+	results: dict[str, Any] = {
+		"commit": current_commit(),
+		"python": platform.python_version(),
+		"date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+		"seed": seed,
+		"goals_per_kind": goals_per_kind,
+		"time_limit": time_limit,
+		"runs": [],
+	}
+	context = multiprocessing.get_context("spawn")
+	kill_timeout = None if time_limit is None else time_limit + KILL_GRACE
+	for scale in scales:
+		try:
+			problems = run_in_process(context, GENERATION_TIMEOUT, generate_problems, scale, seed, goals_per_kind, os.path.join(work_dir, scale))
+		except multiprocessing.TimeoutError:
+			print(f"Generating the {scale} problems took over {GENERATION_TIMEOUT}s, skipped")
+			continue
+		for problem in problems:
+			for configuration in configurations:
+				start_time = time.time()
+				try:
+					stats = run_in_process(context, kill_timeout, run_configuration, problem["domain_path"], problem["problem_path"], configuration, time_limit)
+				except multiprocessing.TimeoutError:
+					stats = unfinished_stats(TIMEOUT, time.time() - start_time)
+				except Exception as e:
+					# a broken configuration, such as an unknown search, must not lose the other runs
+					stats = unfinished_stats(ERROR, time.time() - start_time)
+					stats["error"] = f"{type(e).__name__}: {e}"
+				run = {key: value for key, value in problem.items() if not key.endswith("_path")}
+				run["problem"] = os.path.basename(problem["problem_path"])
+				run["configuration"] = configuration
+				run.update(stats)
+				results["runs"].append(run)
+				print(f"{scale} {run['problem']} {configuration}: {stats['status']} in {stats['total_time']:.2f}s " \
+					+ f"(parse {stats['parse_time']:.2f}s, grounding {stats['grounding_time']:.2f}s, search {stats['search_time']:.2f}s), " \
+					+ f"{stats['peak_rss']} KB")
+				if "error" in stats:
+					print(f"{scale} {run['problem']} {configuration}: {stats['error']}")
+	return results
+
+def compare(baseline: dict[str, Any], results: dict[str, Any]) -> None:
+	# total time and peak memory of every run relative to the same run in baseline
+	def key(run: dict[str, Any]) -> tuple[str, str, str]:
+		return run["scale"], run["problem"], run["configuration"]
+	baseline_runs = {key(run): run for run in baseline["runs"]}
+	print(f"Compared with {baseline.get('commit')}")
+	for run in results["runs"]:
+		old = baseline_runs.get(key(run))
+		if old is None:
+			continue
+		if old["status"] != run["status"]:
+			print(f"{' '.join(key(run))}: {old['status']} -> {run['status']}")
+			continue
+		time_ratio = run["total_time"] / old["total_time"] if old["total_time"] else float("nan")
+		memory_ratio = run["peak_rss"] / old["peak_rss"] if old["peak_rss"] and run["peak_rss"] else float("nan")
+		print(f"{' '.join(key(run))}: time x{time_ratio:.2f}, memory x{memory_ratio:.2f}")
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the planner on generated household problems")
+	parser.add_argument("-o", "--output", default="benchmark.json", help="JSON file the results are written to")
+	parser.add_argument("-s", "--scale", action="append", choices=sorted(SCALES), help="scale to run, may be repeated, all by default")
+	parser.add_argument("-c", "--config", action="append", metavar="SEARCH:HEURISTIC[:sas|full]", help="planner configuration, may be repeated")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("-g", "--goals", type=int, default=1, help="problems per goal kind and scale")
+	parser.add_argument("-t", "--time-limit", type=float, default=60, help="seconds per planner call")
+	parser.add_argument("-w", "--work-dir", default="benchmark", help="directory the generated domains and problems are written to")
+	parser.add_argument("--compare", metavar="BASELINE", help="results of an earlier run to compare with")
+	args = parser.parse_args()
+
+	results = run_benchmark(args.scale or list(SCALES), args.config or DEFAULT_CONFIGURATIONS, args.seed, args.goals, args.time_limit, args.work_dir)
+	with open(args.output, "w") as f:
+		json.dump(results, f, indent=1)
+	print(f"Results written to {args.output}")
+	if args.compare:
+		with open(args.compare) as f:
+			compare(json.load(f), results)
+
+if __name__ == "__main__":
+	main()
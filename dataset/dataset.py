@@ -2,12 +2,22 @@ from __future__ import annotations
 from abc import abstractmethod, ABC
 from typing import Any
 import random
-from typing import TypeVar, cast
+from typing import TypeVar, cast, TYPE_CHECKING
 from inspect import isabstract
 import re
 import os
+import sys
 import numpy as np
 
+# run as a script (python dataset/dataset.py): generate_problem imports the problem builder of the pddl_parser
+# package, which lives in knowledge_graph_planning
+PLANNING_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge_graph_planning")
+if PLANNING_DIR not in sys.path:
+	sys.path.append(PLANNING_DIR)
+
+if TYPE_CHECKING:
+	from pddl_parser.problem import Problem
+
 DIR = os.path.dirname(__file__)
 MAX_ITER = 100
 
@@ -43,6 +53,13 @@ class Goal:
 		self.description = description
 		self.predicate_list = predicate_list
 	
+	def add_to_problem(self, problem: Problem) -> None:
+		for predicate in self.predicate_list:
+			if predicate.startswith("not ("):
+				problem.add_goal(tuple(predicate[len("not ("):-1].split()), False)
+			else:
+				problem.add_goal(tuple(predicate.split()))
+	
 	def __str__(self) -> str:
 		return f"\t(:goal\n" \
 					+ "\t\t(and\n" \
@@ -2215,12 +2232,13 @@ class DatasetGenerator:
 			if (i + 1) % self.state_changes_per_goal == 0:
 				curr_dir = os.path.join(self.parent_dir, f"time_{time_step:04d}_goal")
 				os.makedirs(curr_dir, exist_ok=True)
-				problem_pddl = self.generate_problem_pddl(with_goal=True)
+				problem = self.generate_problem()
 				goal = self.generate_goal()
+				goal.add_to_problem(problem)
 				with open(os.path.join(curr_dir, "goal.txt"), "w") as f:
 					f.write(goal.description)
 				with open(os.path.join(curr_dir, "problem.pddl"), "w") as f:
-					f.write(problem_pddl.format(str(goal)))
+					f.write(problem.to_pddl())
 				with open(os.path.join(curr_dir, "knowledge.yaml"), "w") as f:
 					f.write(self.generate_knowledge_yaml())
 				time_step += 1
@@ -2257,7 +2275,10 @@ class DatasetGenerator:
 					+ "{}".format("\n".join(formatted_actions)) \
 				+ ")\n"
 	
-	def generate_problem_pddl(self, with_goal: bool = False) -> str:
+	def generate_problem(self) -> Problem:
+		# only generating the dataset needs the planner package, readers of it do not
+		from pddl_parser.problem import Problem
+		problem = Problem("simulation-a", "simulation")
 		objects: list[str] = []
 		init_conditions: list[str] = []
 
@@ -2276,19 +2297,17 @@ class DatasetGenerator:
 			objects += item.get_pddl_objects()
 			init_conditions += item.get_init_conditions()
 		
+		for obj in objects:
+			name, obj_type = obj.split(" - ")
+			problem.add_object(name, obj_type)
 		for entity in static_entities:
-			objects.append(f"{entity.entity_id.name} - {entity.entity_id.concept}")
-		
-		return "(define (problem simulation-a)\n" \
-					+ "\t(:domain simulation)\n" \
-					+ "\t(:objects\n" \
-						+ "\t\t{}\n".format("\n\t\t".join(objects)) \
-					+ "\t)\n" \
-					+ "\t(:init\n" \
-						+ "\t\t({})\n".format(")\n\t\t(".join(init_conditions)) \
-					+ "\t)\n" \
-					+ ("{}" if with_goal else "") \
-				+ ")\n"
+			problem.add_object(entity.entity_id.name, entity.entity_id.concept)
+		for condition in init_conditions:
+			problem.add_fact(tuple(condition.split()))
+		return problem
+	
+	def generate_problem_pddl(self) -> str:
+		return self.generate_problem().to_pddl()
 	
 	def generate_knowledge_yaml(self) -> str:
 		yaml = "version: 1\nentities:\n"
@@ -2390,7 +2409,8 @@ def get_concrete_subtypes(initial_type: type[T]) -> list[type[T]]:
 		if not isabstract(curr_type):
 			concrete_subtypes.add(curr_type)
 		found_types.extend(curr_type.__subclasses__())
-	return list(concrete_subtypes)
+	# sorted so that a seeded run builds the same world every time
+	return sorted(concrete_subtypes, key=lambda subtype: subtype.__name__)
 
 item_types = get_concrete_subtypes(RoomItem)
 movable_types = get_concrete_subtypes(MovableItem)
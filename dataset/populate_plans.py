@@ -1,31 +1,50 @@
-from dataset import Dataset
 import os
+import sys
 from pathlib import Path
-import time
+from concurrent.futures import ProcessPoolExecutor
+
+# run as a script from the repository root or dataset/: the pddl_parser package lives in knowledge_graph_planning,
+# and dataset.py is imported as a module of this directory
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (os.path.join(os.path.dirname(DATASET_DIR), "knowledge_graph_planning"), DATASET_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from dataset import Dataset
+from pddl_parser.planner import Planner
+from pddl_parser.backend import format_plan
+from pddl_parser.budget import Budget
+
+# seconds the planner gets per time step
+TIME_LIMIT = 300
 
-project_dir = Path(__file__).parent.parent.as_posix()
+def plan_time_steps(domain_path: str, time_steps: list[dict]):
+    # one shared grounding for all time steps of the chunk
+    planner = Planner("siw-bfsf", "hadd")
+    problems = [time_step['problem_path'] for time_step in time_steps]
+    for time_step, (plan, stats) in zip(time_steps, planner.solve_many(domain_path, problems, Budget(TIME_LIMIT))):
+        problem_dir = Path(time_step['problem_path']).parent
+        if plan is not None:
+            with open(os.path.join(problem_dir, "true_plan.pddl"), "w") as f:
+                f.write("\n".join(format_plan((act.name, act.parameters) for act in plan)))
+        else:
+            print("No plan for time step", time_step["time"], stats.status)
+        with open(os.path.join(problem_dir, "true_plan.time"), "w") as f:
+            f.write(str(stats.total_time))
+        print("Planned time step", time_step["time"])
 
 def main():
     dataset = Dataset("experiment/domains/gpt-4o")
+    goal_steps = [time_step for time_step in dataset if time_step["type"] == "goal"]
+
+    # goal steps are independent, split them in one chunk per core
+    max_workers = min(os.cpu_count() or 1, len(goal_steps)) or 1
+    chunks = [goal_steps[i::max_workers] for i in range(max_workers)]
+    with ProcessPoolExecutor(max_workers) as executor:
+        for future in [executor.submit(plan_time_steps, dataset.domain_path, chunk) for chunk in chunks]:
+            future.result()
 
-    for time_step in dataset:
-        if time_step["type"] != "goal":
-            continue
-        print("Planning for time step", time_step["time"])
-        problem_file = time_step['problem_path']
-        plan_file = os.path.join(Path(problem_file).parent, "true_plan.pddl")
-        
-        start_time = time.time()
-        os.system(f"sudo docker run --rm -v {project_dir}:/root/experiments lapkt/lapkt-public ./siw-then-bfsf " + \
-            f"--domain /root/experiments/{dataset.domain_path} " + \
-            f"--problem /root/experiments/{time_step['problem_path']} " + \
-            f"--output /root/experiments/{plan_file} " + \
-            f"> /dev/null")
-        duration = time.time() - start_time
-        with open(os.path.join(Path(problem_file).parent, "true_plan.time"), "w") as f:
-            f.write(str(duration))
-        
     print("Finished planning")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,12 +3,10 @@ from abc import ABC, abstractmethod
 from functools import partial
 from pydantic import BaseModel
 
-import itertools
 import os
 import re
 import time
 from contextlib import redirect_stdout
-from pathlib import Path
 import json
 
 import tiktoken
@@ -30,7 +28,10 @@ from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
 from .utils import get_prompt_template, extract_keywords
 from .chat_mem_buffer import TripletTrimBuffer
 
-from pddl_parser.PDDL import PDDL_Parser, Action
+from pddl_parser.PDDL import PDDL_Parser, DEFAULT_CACHE_DIR
+from pddl_parser.backend import PlannerBackend, InProcessBackend, PlanResult, ERROR, UNSOLVABLE
+from pddl_parser.validator import PlanValidator
+from pddl_parser.problem import Problem
 
 
 class KGBaseAgent(ABC):
@@ -66,8 +67,11 @@ class KGAgent(KGBaseAgent):
 	MAX_RETRY_STATE_CHANGE = 5
 	MAX_RETRY_GOAL = 5
 
-	def __init__(self, log_dir: str, use_rag: bool, use_verifier: bool, agent_label: str, model: str = "gpt-4o") -> None:
+	def __init__(self, log_dir: str, use_rag: bool, use_verifier: bool, agent_label: str, model: str = "gpt-4o", planner: PlannerBackend | None = None) -> None:
 		self.log_dir = log_dir
+		self.planner = planner if planner is not None else InProcessBackend()
+		# steps of the last plan found, repaired by the planner before it searches for the next goal
+		self.previous_plan: list[tuple[str, tuple[str, ...]]] | None = None
 		self.dbname = "knowledge_base"
 		self.dbuser = "postgres"
 		self.dbpass = "password"
@@ -150,12 +154,9 @@ class KGAgent(KGBaseAgent):
 		cur.close()	
 		entity_names = ", ".join(entity_list)
 
-		pddl_parser = PDDL_Parser()
+		pddl_parser = PDDL_Parser(cache_dir=DEFAULT_CACHE_DIR)
 		pddl_parser.parse_domain(domain_path)
-		self.pddl_actions : dict[str, Action] = {}
-		for action in pddl_parser.actions:
-			self.pddl_actions[action.name] = action
-		
+		self.pddl_domain_name = pddl_parser.domain_name
 		self.pddl_supertypes: dict[str, list[str]] = {}
 		for supertype in pddl_parser.types:
 			if supertype not in self.pddl_supertypes:
@@ -181,6 +182,12 @@ class KGAgent(KGBaseAgent):
 					self.entities_by_type[supertype] = []
 				self.entities_by_type[supertype].append(entity)
 
+		# plan steps are checked in memory, over the entities and the domain constants
+		pddl_objects = {type: list(entities) for type, entities in self.entities_by_type.items()}
+		for type, constants in pddl_parser.objects.items():
+			pddl_objects.setdefault(type, []).extend(constants)
+		self.plan_validator = PlanValidator(pddl_parser.actions, pddl_objects, pddl_parser.types)
+
 		# load in all default prompts
 		ENTITY_SELECT_PROMPT = get_prompt_template("prompts/entity_select_prompt.txt", entity_names=entity_names)
 		self.TRIPLET_UPDATE_PROMPT = get_prompt_template("prompts/triplet_update_prompt.txt",
@@ -393,7 +400,6 @@ class KGAgent(KGBaseAgent):
 		log = [f"PLAN QUERY: {query}"]
 		log_file = os.path.join(self.log_dir, f"{self.time:04d}_plan_query")
 		plan_file_name = self.log_dir + f"/{self.time:04d}_plan.pddl"
-		project_dir = Path(__file__).parent.parent.parent.as_posix()
 
 		# A. generate problem pddl file
 		with open(log_file + ".context.log", "w") as f:
@@ -403,40 +409,18 @@ class KGAgent(KGBaseAgent):
 		duration = time.time() - start_time
 		log.append(f"Completed RAG in {duration:.2f} seconds")
 
-		# objects = set(["me"])
-		# constants = {'Cold', 'Hot', 'RoomTemp', 'Water', 'Coffee', 'Wine'}
-		init_block = "\t(:init\n"
+		problem = Problem(f"p{self.time}", self.pddl_domain_name)
+		for obj, obj_type in self.entity_types.items():
+			problem.add_object(obj, obj_type)
 		if len(nodes) > 0:
 			for rel in nodes[0].metadata['kg_rel_text']:
 				predicate = rel.split('-[')[1].split(']')[0]
-				arg1 = rel.split(',')[0]
-				arg2 = rel.split('-> ')[1]
-				if self.get_relation_issues(arg1, predicate, arg2):
-					continue
-				if predicate == "instance_of":
-					continue
-				elif arg2 == 'true':
-					init_block += f"\t\t({predicate} {arg1})\n"
-					# if arg1 != "Robot":
-					# 	objects.add(arg1)
-				elif arg2 == 'None' or arg2 == 'false':
-					continue
-				else:
-					init_block += f"\t\t({predicate} {arg1} {arg2})\n"
-					# if arg1 != "Robot":
-					# 	objects.add(arg1)
-					# objects.add(arg2)
-					# if arg2 not in constants:
-					# 	objects.add(arg2)
-		init_block += "\t)\n"
-		objects_block = "\t(:objects\n"
-		for obj, obj_type in self.entity_types.items():
-			objects_block += f"\t\t{obj} - {obj_type}\n"
-		objects_block += "\t)\n"
+				self.add_relation_fact(problem, rel.split(',')[0], predicate, rel.split('-> ')[1])
 
 		curr_prompt = self.PLAN_QUERY_TEMPLATE.format(task_nl=query)
 		messages: list[ChatMessage] = []
 		num_attempts = 0
+		result = PlanResult(ERROR)
 
 		while num_attempts < KGAgent.MAX_RETRY_GOAL and curr_prompt:
 			if num_attempts > 0:
@@ -462,70 +446,43 @@ class KGAgent(KGBaseAgent):
 				continue
 			
 			goal_block = goal_block[start_idx : end_idx + 1]
-			task_pddl = f"(define (problem p{self.time})\n" + \
-					 f"\t(:domain simulation)\n" + \
-					 objects_block + \
-					 init_block + \
-					 f"\t{goal_block}\n)"
+			try:
+				problem.parse_goal(goal_block)
+			except Exception as e:
+				curr_prompt = f"There was an error with your provided goal block: {e}\nPlease try again."
+				continue
 
-			# B. write the problem file into the problem folder
+			# B. run the planner, the problem file in the problem folder is only written if the backend needs one
 			task_pddl_file_name = os.path.join(self.log_dir, f"{self.time:04d}_problem.pddl")
-			with open(task_pddl_file_name, "w") as f:
-				f.write(task_pddl)
-
-			# C. run lapkt to plan
-			curr_start_time = time.time()
-			os.system(f"sudo docker run --rm -v {project_dir}:/root/experiments lapkt/lapkt-public ./siw-then-bfsf " + \
-					f"--domain /root/experiments/{self.domain_path} " + \
-					f"--problem /root/experiments/{task_pddl_file_name} " + \
-					f"--output /root/experiments/{plan_file_name} " + \
-					f"> {log_file}.pddl.log.{num_attempts} 2>&1")
-			duration = time.time() - curr_start_time
-			log.append(f"Planner took {duration:.2f} seconds")
-			
-			with open(f"{log_file}.pddl.log.{num_attempts}") as f:
-				planner_output = f.read().strip()
+			result = self.planner.plan_problem(self.domain_path, problem, task_pddl_file_name, self.previous_plan)
+			log.append(f"Planner took {result.time:.2f} seconds")
+			log.append(f"Planner stats: {json.dumps(result.stats)}")
+			with open(f"{log_file}.pddl.log.{num_attempts}", "w") as f:
+				f.write(result.output)
 			
-			if planner_output == "":
+			if result.status == ERROR and result.output == "":
 				curr_prompt = "The planner crashed, so there is some error with your provided goal block. Please try again."
-			
-			if any(check_str in planner_output.lower() for check_str in ["error", "undeclared", "unknown"]):
-				curr_prompt = f"There was an error with your provided goal block, here is the planner output:\n```\n{planner_output}\n```\nPlease try again."
+			elif result.status == ERROR:
+				curr_prompt = f"There was an error with your provided goal block, here is the planner output:\n```\n{result.output}\n```\nPlease try again."
 		
-		if not curr_prompt and "simplified to false" in planner_output.lower():
+		if not curr_prompt and result.status == UNSOLVABLE:
 			# likely that RAG did not retrieve sufficient context, if so replan with full context
 			print("Retrying planner with full context in problem PDDL...")
-			init_block = "\t(:init\n"
+			problem.clear_facts()
 			for rel in self.get_all_relations():
-				rel_split = rel.split(" -> ")
-				arg1, predicate, arg2 = rel_split[0], rel_split[1], rel_split[2]
-				if self.get_relation_issues(arg1, predicate, arg2):
-					continue
-				elif arg2 == 'true':
-					init_block += f"\t\t({predicate} {arg1})\n"
-				elif arg2 == 'None' or arg2 == 'false':
-					continue
-				else:
-					init_block += f"\t\t({predicate} {arg1} {arg2})\n"
-			init_block += "\t)\n"
-			task_pddl = f"(define (problem p{self.time})\n" + \
-					 f"\t(:domain simulation)\n" + \
-					 objects_block + \
-					 init_block + \
-					 f"\t{goal_block}\n)"
+				arg1, predicate, arg2 = rel.split(" -> ")
+				self.add_relation_fact(problem, arg1, predicate, arg2)
 			
 			task_pddl_file_name = os.path.join(self.log_dir, f"{self.time:04d}_problem.pddl")
-			with open(task_pddl_file_name, "w") as f:
-				f.write(task_pddl)
-			
-			curr_start_time = time.time()
-			os.system(f"sudo docker run --rm -v {project_dir}:/root/experiments lapkt/lapkt-public ./siw-then-bfsf " + \
-					f"--domain /root/experiments/{self.domain_path} " + \
-					f"--problem /root/experiments/{task_pddl_file_name} " + \
-					f"--output /root/experiments/{plan_file_name} " + \
-					f"> {log_file}.pddl.log.{num_attempts + 1} 2>&1")
-			duration = time.time() - curr_start_time
-			log.append(f"Planner could not find solution, attempting last time with full context...\nPlanner took {duration:.2f} seconds")
+			result = self.planner.plan_problem(self.domain_path, problem, task_pddl_file_name, self.previous_plan)
+			with open(f"{log_file}.pddl.log.{num_attempts + 1}", "w") as f:
+				f.write(result.output)
+			log.append(f"Planner could not find solution, attempting last time with full context...\nPlanner took {result.time:.2f} seconds")
+			log.append(f"Planner stats: {json.dumps(result.stats)}")
+
+		if not curr_prompt and not result.solved:
+			# failed, timeout and the other limits: no plan to return, the goal block itself was fine
+			log.append(f"Planner did not find a plan, status: {result.status}")
 
 		duration = time.time() - start_time
 		self.total_prompt_tokens += self.token_counter.prompt_llm_token_count
@@ -543,61 +500,42 @@ class KGAgent(KGBaseAgent):
 		if curr_prompt:
 			print("Could not resolve goal block within maximum number of tries", KGAgent.MAX_RETRY_GOAL)
 			return []
+		if not result.solved:
+			print("Planner did not find a plan:", result.status)
+			return []
 		
-		with open(plan_file_name, "r") as f:
-			plan = f.read().splitlines()
-			self.process_plan(plan, truth_graph_store)
+		self.previous_plan = result.steps
+		plan = result.lines()
+		with open(plan_file_name, "w") as f:
+			f.write("\n".join(plan))
+		self.process_plan(plan, truth_graph_store)
 
 		return plan
 	
-	@staticmethod
-	def is_condition_met(condition: tuple, param_names: dict[str, str], graph_store: AgeGraphStore):
-		if condition[0] == 'not':
-			return not KGAgent.is_condition_met(condition[1], param_names, graph_store)
-		predicate, params = condition[0], condition[1:]
-		arg1, arg2 = param_names[params[0]], param_names[params[1]] if len(params) == 2 else "true"
-		return graph_store.rel_exists(arg1, predicate, arg2)
-
-	def process_forall_effect(self, forall_effect: tuple, param_names: dict[str, str], truth_graph_store: AgeGraphStore):
-		if forall_effect[0] != 'forall':
-			return False
-		quantifier_types = forall_effect[1:-1]
-		param_names = param_names.copy()
-		
-		update = forall_effect[-1]
-		assert update[0] == 'when'
-		
-		conditions = update[1]
-		if conditions[0] == 'and':
-			conditions = conditions[1:]
-		else:
-			conditions = [conditions]
-		
-		effects = update[2]
-		if effects[0] == 'and':
-			effects = effects[1:]
-		else:
-			effects = [effects]
-
-		for entity_selection in itertools.product(*[self.entities_by_type[type] for _, _, type in quantifier_types]):
-			for (quantifier, _, _), selection in zip(quantifier_types, entity_selection):
-				param_names[quantifier] = selection
-			if any(not KGAgent.is_condition_met(condition, param_names, self.graph_store) for condition in conditions):
+	def add_relation_fact(self, problem: Problem, arg1: str, predicate: str, arg2: str) -> None:
+		if self.get_relation_issues(arg1, predicate, arg2) or predicate == "instance_of" or arg2 == 'None' or arg2 == 'false':
+			return
+		problem.add_fact((predicate, arg1) if arg2 == 'true' else (predicate, arg1, arg2))
+	
+	def get_facts(self, graph_store: AgeGraphStore | None = None) -> set[tuple[str, ...]]:
+		# ground atoms holding in a graph (the agent's by default), read with a single query
+		graph_store = graph_store or self.graph_store
+		facts = set()
+		relations = graph_store.query("MATCH (V)-[R]->(V2) RETURN V.name, type(R), V2.name", return_count=3) or []
+		for row in relations:
+			if not all(isinstance(s, str) for s in row):
 				continue
-			for effect in effects:
-				remove = False
-				if effect[0] == 'not':
-					remove = True
-					effect = effect[1]
-				self.process_effect(effect, param_names, truth_graph_store, remove)
-		
-		return True
+			subj, rel, obj = (item[1:-1] for item in row)
+			if obj == "true":
+				facts.add((rel, subj))
+			elif obj != "false" and obj != "None":
+				facts.add((rel, subj, obj))
+		return facts
 	
-	def process_effect(self, effect: tuple[str], param_names: dict[str, str], truth_graph_store: AgeGraphStore, remove: bool = False):
-		predicate, required_params = effect[0], effect[1:]
-		if len(required_params) == 2:
-			arg1 = param_names[required_params[0]]
-			arg2 = param_names[required_params[1]]
+	def process_effect(self, effect: tuple[str, ...], truth_graph_store: AgeGraphStore, remove: bool = False):
+		predicate, args = effect[0], effect[1:]
+		if len(args) == 2:
+			arg1, arg2 = args
 			if remove:
 				self.graph_store.delete(arg1, predicate, arg2)
 				truth_graph_store.delete(arg1, predicate, arg2)
@@ -606,8 +544,8 @@ class KGAgent(KGBaseAgent):
 					self.graph_store.upsert_triplet(arg1, predicate, arg2)
 				if not truth_graph_store.rel_exists(arg1, predicate, arg2):
 					truth_graph_store.upsert_triplet(arg1, predicate, arg2)
-		elif len(required_params) == 1:
-			arg = param_names[required_params[0]]
+		elif len(args) == 1:
+			arg = args[0]
 			if remove:
 				if predicate != "held_by_robot":
 					if not self.graph_store.rel_exists(arg, predicate, "false"):
@@ -626,45 +564,41 @@ class KGAgent(KGBaseAgent):
 					truth_graph_store.delete(arg, predicate, "false")
 	
 	def process_plan(self, plan: list[str], truth_graph_store: AgeGraphStore):
+		# steps are checked and applied in memory against the true facts, read once, only effects are written to the graphs
+		state = self.get_facts(truth_graph_store)
 		for item in plan:
 			tokens = item[1:-1].lower().split()
-			action_name, args = tokens[0], tokens[1:]
-			action = self.pddl_actions[action_name]
-
-			assert len(args) == len(action.parameters)
-			param_names = {}
-			for token, name in zip(action.parameters, args):
-				param_names[token[0]] = name
+			action_name, args = tokens[0], tuple(tokens[1:])
 			
 			# check if action is able to succeed in real environment, update graph based on observation
-			valid_step = True
-			for pos_prec in action.positive_preconditions:
-				if not KGAgent.is_condition_met(pos_prec, param_names, truth_graph_store):
-					valid_step = False
-					predicate, params = pos_prec[0], pos_prec[1:]
-					arg1, arg2 = param_names[params[0]], param_names[params[1]] if len(params) == 2 else "true"
-					self.graph_store.delete(arg1, predicate, arg2)
-					if arg2 == "true":
-						self.graph_store.upsert_triplet_bool(arg1, predicate, False)
-			for neg_prec in action.negative_preconditions:
-				if not KGAgent.is_condition_met(("not", neg_prec), param_names, truth_graph_store):
-					valid_step = False
-					predicate, params = neg_prec[0], neg_prec[1:]
-					arg1, arg2 = param_names[params[0]], param_names[params[1]] if len(params) == 2 else "true"
-					self.graph_store.upsert_triplet(arg1, predicate, arg2)
-					if arg2 == "true":
-						self.graph_store.delete(arg1, predicate, "false")
-
-			if not valid_step:
+			try:
+				missing, present = self.plan_validator.check(state, action_name, args)
+			except Exception as e:
+				print(f"Failure processing step {item}: {e}")
+				continue
+			for predicate, *params in missing:
+				arg1, arg2 = params[0], params[1] if len(params) == 2 else "true"
+				self.graph_store.delete(arg1, predicate, arg2)
+				if arg2 == "true":
+					self.graph_store.upsert_triplet_bool(arg1, predicate, False)
+			for predicate, *params in present:
+				arg1, arg2 = params[0], params[1] if len(params) == 2 else "true"
+				self.graph_store.upsert_triplet(arg1, predicate, arg2)
+				if arg2 == "true":
+					self.graph_store.delete(arg1, predicate, "false")
+
+			if missing or present:
 				print(f"Failure processing step {item}")
 				continue
 			
-			for del_effect in action.del_effects:
-				self.process_effect(del_effect, param_names, truth_graph_store, remove=True)
-
-			for add_effect in action.add_effects:
-				if not self.process_forall_effect(add_effect, param_names, truth_graph_store):
-					self.process_effect(add_effect, param_names, truth_graph_store)
+			# conditional effects fire on the state before the step
+			add_effects, del_effects = self.plan_validator.effects(state, action_name, args)
+			for del_effect in del_effects:
+				self.process_effect(del_effect, truth_graph_store, remove=True)
+			for add_effect in add_effects:
+				self.process_effect(add_effect, truth_graph_store)
+			state.difference_update(del_effects)
+			state.update(add_effects)
 
 	def get_all_relations(self) -> list[str]:
 		relations = self.graph_store.query("MATCH (V)-[R]->(V2) RETURN V.name, type(R), V2.name", return_count=3)
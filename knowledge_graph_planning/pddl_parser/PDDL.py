@@ -16,13 +16,33 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
+import hashlib
+import os
+import pickle
 import re
+import tempfile
 from .action import Action
 
+DEFAULT_CACHE_DIR = os.environ.get('PDDL_PARSER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'pddl_parser'))
+
 
 class PDDL_Parser:
 
-    SUPPORTED_REQUIREMENTS = [':strips', ':negative-preconditions', ':typing']
+    SUPPORTED_REQUIREMENTS = [':strips', ':negative-preconditions', ':typing', ':conditional-effects']
+
+    # Parentheses, a comment start, or any other run of non-space characters
+    TOKEN = re.compile(r'[();]|[^\s();]+')
+
+    # Bump when the parsed representation changes so stale cache entries are ignored
+    CACHE_VERSION = 2
+    DOMAIN_FIELDS = ('domain_name', 'requirements', 'types', 'objects', 'actions', 'predicates')
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
 
     # -----------------------------------------------
     # Tokens
@@ -30,24 +50,32 @@ class PDDL_Parser:
 
     def scan_tokens(self, filename):
         with open(filename) as f:
-            # Remove single line comments
-            str = re.sub(r';.*', '', f.read(), flags=re.MULTILINE).lower()
-        # Tokenize
+            return self.tokenize(f)
+
+    def scan_string(self, text):
+        return self.tokenize(text.splitlines())
+
+    def tokenize(self, lines):
+        # Single pass over the lines: each line is lowercased as it is read,
+        # comments are cut at ';' and nesting is tracked with a stack
         stack = []
         list = []
-        for t in re.findall(r'[()]|[^\s()]+', str):
-            if t == '(':
-                stack.append(list)
-                list = []
-            elif t == ')':
-                if stack:
-                    li = list
-                    list = stack.pop()
-                    list.append(li)
+        for line in lines:
+            for t in self.TOKEN.findall(line.lower()):
+                if t == '(':
+                    stack.append(list)
+                    list = []
+                elif t == ')':
+                    if stack:
+                        li = list
+                        list = stack.pop()
+                        list.append(li)
+                    else:
+                        raise Exception('Missing open parentheses')
+                elif t == ';':
+                    break
                 else:
-                    raise Exception('Missing open parentheses')
-            else:
-                list.append(t)
+                    list.append(t)
         if stack:
             raise Exception('Missing close parentheses')
         if len(list) != 1:
@@ -59,17 +87,31 @@ class PDDL_Parser:
     # -----------------------------------------------
 
     def parse_domain(self, domain_filename, requirements=SUPPORTED_REQUIREMENTS):
-        tokens = self.scan_tokens(domain_filename)
-        if type(tokens) is list and tokens.pop(0) == 'define':
+        if self.cache_dir is None:
+            self.parse_domain_tokens(self.scan_tokens(domain_filename), 'File ' + domain_filename, requirements)
+            return
+        with open(domain_filename, 'rb') as f:
+            data = f.read()
+        cache_file = self.domain_cache_file(data, requirements)
+        if self.load_domain_cache(cache_file):
+            return
+        self.parse_domain_tokens(self.scan_string(data.decode()), 'File ' + domain_filename, requirements)
+        self.store_domain_cache(cache_file)
+
+    def parse_domain_string(self, domain, requirements=SUPPORTED_REQUIREMENTS):
+        self.parse_domain_tokens(self.scan_string(domain), 'Domain string', requirements)
+
+    def parse_domain_tokens(self, tokens, name, requirements=SUPPORTED_REQUIREMENTS):
+        if type(tokens) is list and tokens and tokens[0] == 'define':
             self.domain_name = None
             self.requirements = []
             self.types = {}
             self.objects = {}
             self.actions = []
             self.predicates = {}
-            while tokens:
-                group = tokens.pop(0)
-                t = group.pop(0)
+            for group in tokens[1:]:
+                t = group[0]
+                group = group[1:]
                 if t == 'domain':
                     self.domain_name = group[0]
                 elif t == ':requirements':
@@ -87,31 +129,73 @@ class PDDL_Parser:
                     self.parse_action(group)
                 else: self.parse_domain_extended(t, group)
         else:
-            raise Exception('File ' + domain_filename + ' does not match domain pattern')
+            raise Exception(name + ' does not match domain pattern')
 
     def parse_domain_extended(self, t, group):
         print(str(t) + ' is not recognized in domain')
 
+    # -----------------------------------------------
+    # Domain cache
+    # -----------------------------------------------
+
+    # Parsed domains are pickled under cache_dir, keyed by a hash of the file
+    # content, the accepted requirements and CACHE_VERSION. Any change to the
+    # file produces a new key, so entries never need explicit invalidation.
+
+    def domain_cache_file(self, data, requirements):
+        key = hashlib.sha256(data)
+        key.update(repr((sorted(requirements), self.CACHE_VERSION, type(self).__name__)).encode())
+        return os.path.join(self.cache_dir, key.hexdigest() + '.pickle')
+
+    def load_domain_cache(self, cache_file):
+        # Any entry that cannot be read, truncated or written by another
+        # version, is a cache miss and the domain is parsed again
+        try:
+            with open(cache_file, 'rb') as f:
+                fields = pickle.load(f)
+            values = [fields[field] for field in self.DOMAIN_FIELDS]
+        except Exception:
+            return False
+        for field, value in zip(self.DOMAIN_FIELDS, values):
+            setattr(self, field, value)
+        return True
+
+    def store_domain_cache(self, cache_file):
+        fields = {field: getattr(self, field) for field in self.DOMAIN_FIELDS}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial entry
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(fields, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
     # -----------------------------------------------
     # Parse hierarchy
     # -----------------------------------------------
 
     def parse_hierarchy(self, group, structure, name, redefine):
         list = []
-        while group:
-            if redefine and group[0] in structure:
-                raise Exception('Redefined supertype of ' + group[0])
-            elif group[0] == '-':
+        i = 0
+        while i < len(group):
+            if redefine and group[i] in structure:
+                raise Exception('Redefined supertype of ' + group[i])
+            elif group[i] == '-':
                 if not list:
                     raise Exception('Unexpected hyphen in ' + name)
-                group.pop(0)
-                type = group.pop(0)
+                if i + 1 == len(group):
+                    raise Exception('Missing type after hyphen in ' + name)
+                type = group[i + 1]
+                i += 2
                 if type not in structure:
                     structure[type] = []
                 structure[type] += list
                 list = []
             else:
-                list.append(group.pop(0))
+                list.append(group[i])
+                i += 1
         if list:
             if 'object' not in structure:
                 structure['object'] = []
@@ -137,23 +221,27 @@ class PDDL_Parser:
 
     def parse_predicates(self, group):
         for pred in group:
-            predicate_name = pred.pop(0)
+            predicate_name = pred[0]
             if predicate_name in self.predicates:
                 raise Exception('Predicate ' + predicate_name + ' redefined')
             arguments = {}
             untyped_variables = []
-            while pred:
-                t = pred.pop(0)
+            i = 1
+            while i < len(pred):
+                t = pred[i]
+                i += 1
                 if t == '-':
-                    if not untyped_variables:
+                    if not untyped_variables or i == len(pred):
                         raise Exception('Unexpected hyphen in predicates')
-                    type = pred.pop(0)
-                    while untyped_variables:
-                        arguments[untyped_variables.pop(0)] = type
+                    type = pred[i]
+                    i += 1
+                    for variable in untyped_variables:
+                        arguments[variable] = type
+                    untyped_variables = []
                 else:
                     untyped_variables.append(t)
-            while untyped_variables:
-                arguments[untyped_variables.pop(0)] = 'object'
+            for variable in untyped_variables:
+                arguments[variable] = 'object'
             self.predicates[predicate_name] = arguments
 
     # -----------------------------------------------
@@ -161,7 +249,7 @@ class PDDL_Parser:
     # -----------------------------------------------
 
     def parse_action(self, group):
-        name = group.pop(0)
+        name = group[0]
         if type(name) is not str:
             raise Exception('Action without name definition')
         for act in self.actions:
@@ -172,41 +260,57 @@ class PDDL_Parser:
         negative_preconditions = []
         add_effects = []
         del_effects = []
+        conditional_effects = []
         extensions = []
-        while group:
-            t = group.pop(0)
+        i = 1
+        while i < len(group):
+            t = group[i]
+            i += 1
             if t == ':parameters':
-                if type(group) is not list:
+                if i == len(group) or type(group[i]) is not list:
                     raise Exception('Error with ' + name + ' parameters')
-                parameters = []
-                untyped_parameters = []
-                p = group.pop(0)
-                while p:
-                    t = p.pop(0)
-                    if t == '-':
-                        if not untyped_parameters:
-                            raise Exception('Unexpected hyphen in ' + name + ' parameters')
-                        ptype = p.pop(0)
-                        while untyped_parameters:
-                            parameters.append([untyped_parameters.pop(0), ptype])
-                    else:
-                        untyped_parameters.append(t)
-                while untyped_parameters:
-                    parameters.append([untyped_parameters.pop(0), 'object'])
+                parameters = self.parse_parameters(group[i], name + ' parameters')
+                i += 1
             elif t == ':precondition':
-                self.split_predicates(group.pop(0), positive_preconditions, negative_preconditions, name, ' preconditions')
+                self.split_predicates(group[i], positive_preconditions, negative_preconditions, name, ' preconditions')
+                i += 1
             elif t == ':effect':
-                self.split_predicates(group.pop(0), add_effects, del_effects, name, ' effects')
+                self.split_effects(group[i], add_effects, del_effects, conditional_effects, name)
+                i += 1
             else:
-                group.insert(0, t)
-                extensions.append(group)
-        action = Action(name, parameters, positive_preconditions, negative_preconditions, add_effects, del_effects)
+                extensions.append(t)
+                # Skip the value of the unrecognized keyword
+                if i < len(group) and not (type(group[i]) is str and group[i].startswith(':')):
+                    i += 1
+        # A forall whose body is only a when leaves an empty effect behind
+        conditional_effects = [effect for effect in conditional_effects if effect[3] or effect[4]]
+        action = Action(name, parameters, positive_preconditions, negative_preconditions, add_effects, del_effects, conditional_effects)
         self.parse_action_extended(action, extensions)
         self.actions.append(action)
 
+    def parse_parameters(self, group, name):
+        parameters = []
+        untyped_parameters = []
+        j = 0
+        while j < len(group):
+            t = group[j]
+            j += 1
+            if t == '-':
+                if not untyped_parameters or j == len(group):
+                    raise Exception('Unexpected hyphen in ' + name)
+                ptype = group[j]
+                j += 1
+                for parameter in untyped_parameters:
+                    parameters.append([parameter, ptype])
+                untyped_parameters = []
+            else:
+                untyped_parameters.append(t)
+        for parameter in untyped_parameters:
+            parameters.append([parameter, 'object'])
+        return parameters
+
     def parse_action_extended(self, action, group):
-        while group:
-            t = group.pop(0)
+        for t in group:
             print(str(t) + ' is not recognized in action ' + action.name)
 
     # -----------------------------------------------
@@ -214,17 +318,22 @@ class PDDL_Parser:
     # -----------------------------------------------
 
     def parse_problem(self, problem_filename):
+        self.parse_problem_tokens(self.scan_tokens(problem_filename), 'File ' + problem_filename)
+
+    def parse_problem_string(self, problem):
+        self.parse_problem_tokens(self.scan_string(problem), 'Problem string')
+
+    def parse_problem_tokens(self, tokens, name):
         def frozenset_of_tuples(data):
             return frozenset([tuple(t) for t in data])
-        tokens = self.scan_tokens(problem_filename)
-        if type(tokens) is list and tokens.pop(0) == 'define':
+        if type(tokens) is list and tokens and tokens[0] == 'define':
             self.problem_name = None
             self.state = frozenset()
             self.positive_goals = frozenset()
             self.negative_goals = frozenset()
-            while tokens:
-                group = tokens.pop(0)
-                t = group.pop(0)
+            for group in tokens[1:]:
+                t = group[0]
+                group = group[1:]
                 if t == 'problem':
                     self.problem_name = group[0]
                 elif t == ':domain':
@@ -244,11 +353,53 @@ class PDDL_Parser:
                     self.negative_goals = frozenset_of_tuples(negative_goals)
                 else: self.parse_problem_extended(t, group)
         else:
-            raise Exception('File ' + problem_filename + ' does not match problem pattern')
+            raise Exception(name + ' does not match problem pattern')
 
     def parse_problem_extended(self, t, group):
         print(str(t) + ' is not recognized in problem')
 
+    # -----------------------------------------------
+    # Split effects
+    # -----------------------------------------------
+
+    # Literals outside forall and when go to add_effects and del_effects.
+    # Each forall or when opens a conditional effect [parameters,
+    # positive_conditions, negative_conditions, add_effects, del_effects]
+    # that inherits the variables and conditions of the enclosing ones.
+
+    def split_effects(self, group, add_effects, del_effects, conditional_effects, name, context=None):
+        if type(group) is not list:
+            raise Exception('Error with ' + name + ' effects')
+        if not group:
+            return
+        if group[0] == 'and':
+            for effect in group[1:]:
+                self.split_effects(effect, add_effects, del_effects, conditional_effects, name, context)
+        elif group[0] == 'forall':
+            if len(group) != 3 or type(group[1]) is not list:
+                raise Exception('Unexpected forall in ' + name + ' effects')
+            parameters = self.parse_parameters(group[1], name + ' forall parameters')
+            if context:
+                parameters = context[0] + parameters
+            effect = [parameters, context[1] if context else [], context[2] if context else [], [], []]
+            conditional_effects.append(effect)
+            self.split_effects(group[2], add_effects, del_effects, conditional_effects, name, effect)
+        elif group[0] == 'when':
+            if len(group) != 3:
+                raise Exception('Unexpected when in ' + name + ' effects')
+            positive_conditions = list(context[1]) if context else []
+            negative_conditions = list(context[2]) if context else []
+            self.split_predicates(group[1], positive_conditions, negative_conditions, name, ' effect conditions')
+            effect = [context[0] if context else [], positive_conditions, negative_conditions, [], []]
+            conditional_effects.append(effect)
+            self.split_effects(group[2], add_effects, del_effects, conditional_effects, name, effect)
+        elif group[0] == 'not':
+            if len(group) != 2:
+                raise Exception('Unexpected not in ' + name + ' effects')
+            (del_effects if context is None else context[4]).append(group[1])
+        else:
+            (add_effects if context is None else context[3]).append(group)
+
     # -----------------------------------------------
     # Split predicates
     # -----------------------------------------------
@@ -258,7 +409,7 @@ class PDDL_Parser:
             raise Exception('Error with ' + name + part)
         if group:
             if group[0] == 'and':
-                group.pop(0)
+                group = group[1:]
             else:
                 group = [group]
             for predicate in group:
@@ -25,9 +25,14 @@ class Action:
     # Initialize
     # -----------------------------------------------
 
-    def __init__(self, name, parameters, positive_preconditions, negative_preconditions, add_effects, del_effects):
+    # Conditional effects are (parameters, positive_conditions,
+    # negative_conditions, add_effects, del_effects) tuples. The parameters
+    # are the forall variables with their types, empty for a plain when and
+    # for ground actions.
+
+    def __init__(self, name, parameters, positive_preconditions, negative_preconditions, add_effects, del_effects, conditional_effects=()):
         def tuple_of_tuples(data):
-            if not isinstance(data, list):
+            if not isinstance(data, (list, tuple)):
                 return data
             return tuple([tuple_of_tuples(t) for t in data])
         def frozenset_of_tuples(data):
@@ -38,6 +43,8 @@ class Action:
         self.negative_preconditions = frozenset_of_tuples(negative_preconditions)
         self.add_effects = frozenset_of_tuples(add_effects)
         self.del_effects = frozenset_of_tuples(del_effects)
+        self.conditional_effects = tuple([(tuple_of_tuples(effect[0]),) + tuple([frozenset_of_tuples(group) for group in effect[1:]])
+                                          for effect in conditional_effects])
 
     # -----------------------------------------------
     # to String
@@ -49,7 +56,11 @@ class Action:
                '\n  positive_preconditions: ' + str([list(i) for i in self.positive_preconditions]) + \
                '\n  negative_preconditions: ' + str([list(i) for i in self.negative_preconditions]) + \
                '\n  add_effects: ' + str([list(i) for i in self.add_effects]) + \
-               '\n  del_effects: ' + str([list(i) for i in self.del_effects]) + '\n'
+               '\n  del_effects: ' + str([list(i) for i in self.del_effects]) + \
+               ''.join(['\n  conditional_effect: ' + str([list(i) for i in effect[0]]) +
+                        ' when ' + str([list(i) for i in effect[1]]) + ' not ' + str([list(i) for i in effect[2]]) +
+                        ' add ' + str([list(i) for i in effect[3]]) + ' del ' + str([list(i) for i in effect[4]])
+                        for effect in self.conditional_effects]) + '\n'
 
     # -----------------------------------------------
     # Equality
@@ -59,32 +70,21 @@ class Action:
         return self.__dict__ == other.__dict__
 
     # -----------------------------------------------
-    # Groundify
+    # Ground
     # -----------------------------------------------
 
-    def groundify(self, objects, types):
-        if not self.parameters:
-            yield self
-            return
-        type_map = []
-        variables = []
-        for var, type in self.parameters:
-            type_stack = [type]
-            items = []
-            while type_stack:
-                t = type_stack.pop()
-                if t in objects:
-                    items += objects[t]
-                if t in types:
-                    type_stack += types[t]
-            type_map.append(items)
-            variables.append(var)
-        for assignment in itertools.product(*type_map):
-            positive_preconditions = self.replace(self.positive_preconditions, variables, assignment)
-            negative_preconditions = self.replace(self.negative_preconditions, variables, assignment)
-            add_effects = self.replace(self.add_effects, variables, assignment)
-            del_effects = self.replace(self.del_effects, variables, assignment)
-            yield Action(self.name, assignment, positive_preconditions, negative_preconditions, add_effects, del_effects)
+    # Actions are ground by grounding.Grounder, which only instantiates the
+    # reachable ones
+
+    def ground_conditional_effects(self, variables, assignment, domain):
+        # Expands forall variables over the objects of their type
+        ground_effects = []
+        for parameters, positive, negative, add, delete in self.conditional_effects:
+            effect_variables = list(variables) + [var for var, _ in parameters]
+            for values in itertools.product(*[domain(type) for _, type in parameters]):
+                effect_assignment = list(assignment) + list(values)
+                ground_effects.append(((),) + tuple([self.replace(group, effect_variables, effect_assignment) for group in (positive, negative, add, delete)]))
+        return ground_effects
 
     # -----------------------------------------------
     # Replace
@@ -117,5 +117,13 @@ if __name__ == '__main__':
         'pos': ['p1', 'p2']
     }
     types = {'object': ['agent', 'pos']}
-    for act in a.groundify(objects, types):
+    state = [['at', 'ana', 'p1'], ['at', 'bob', 'p2'], ['adjacent', 'p1', 'p2'], ['adjacent', 'p2', 'p1']]
+    # Run as python action.py the package is not imported yet
+    if __package__:
+        from .grounding import Grounder
+    else:
+        import os, sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from pddl_parser.grounding import Grounder
+    for act in Grounder(objects, types).ground([a], frozenset(map(tuple, state))):
         print(act)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import os, subprocess, tempfile, time
+from .PDDL import DEFAULT_CACHE_DIR
+from .planner import Planner
+from .portfolio import Portfolio, DEFAULT_CONFIGURATIONS
+from .budget import Budget, SOLVED, UNSOLVABLE, FAILED
+
+ERROR = 'error'
+
+# -----------------------------------------------
+# Plan format
+# -----------------------------------------------
+
+# A plan is a list of steps, each a tuple (action name, parameters tuple).
+# As text it is one step per line written as (name arg1 arg2 ...).
+
+def parse_plan(text):
+    steps = []
+    for line in text.splitlines():
+        line = line.split(';', 1)[0].strip()
+        if line:
+            tokens = line.strip('()').lower().split()
+            steps.append((tokens[0], tuple(tokens[1:])))
+    return steps
+
+
+def format_plan(steps):
+    return ['(' + ' '.join((name,) + tuple(parameters)) + ')' for name, parameters in steps]
+
+
+class PlanResult:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Outcome of one planner call. status is SOLVED, UNSOLVABLE, FAILED
+    # (no plan found by an incomplete search), ERROR or the limit that
+    # stopped the planner (TIMEOUT, NODE_LIMIT, MEMORY_OUT or CANCELLED),
+    # steps is None unless solved, output is the planner's log and stats a
+    # dict of whatever else the backend measured.
+
+    def __init__(self, status, steps=None, output='', time=0.0, stats=None):
+        self.status = status
+        self.steps = steps
+        self.output = output
+        self.time = time
+        self.stats = stats or {}
+
+    @property
+    def solved(self):
+        return self.status == SOLVED
+
+    def lines(self):
+        return format_plan(self.steps or [])
+
+    def __repr__(self):
+        return 'PlanResult(' + self.status + ', ' + str(len(self.steps or [])) + ' steps, ' + str(round(self.time, 3)) + 's)'
+
+
+class PlannerBackend:
+
+    # -----------------------------------------------
+    # Plan
+    # -----------------------------------------------
+
+    # Solves the problem file against the domain file and returns a PlanResult.
+    # previous_plan is a list of steps the backend may repair instead of
+    # searching from scratch, backends that cannot repair ignore it.
+
+    def plan(self, domain, problem, previous_plan=None):
+        raise NotImplementedError
+
+    def plan_problem(self, domain, problem, filename, previous_plan=None):
+        # Plans for a problem.Problem, written to filename first unless the
+        # backend can take it as it is
+        problem.write(filename)
+        return self.plan(domain, filename, previous_plan)
+
+
+class InProcessBackend(PlannerBackend):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Plans with pddl_parser in the calling process. The default search is
+    # SIW then BFS(f) with h_add tie breaking, the lapkt configuration this
+    # backend replaces. Every call gets a fresh Budget with the given
+    # limits, see budget.Budget.
+
+    def __init__(self, search='siw-bfsf', heuristic='hadd', cache_dir=DEFAULT_CACHE_DIR, time_limit=None, node_limit=None, memory_limit=None):
+        self.planner = Planner(search, heuristic, cache_dir=cache_dir)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.memory_limit = memory_limit
+
+    # -----------------------------------------------
+    # Plan
+    # -----------------------------------------------
+
+    def plan(self, domain, problem, previous_plan=None):
+        # problem is a file or a problem.Problem
+        start_time = time.time()
+        try:
+            budget = Budget(self.time_limit, self.node_limit, self.memory_limit)
+            plan = self.planner.solve(domain, problem, previous_plan, budget)
+        except Exception as e:
+            return PlanResult(ERROR, output='Error: ' + str(e), time=time.time() - start_time)
+        duration = time.time() - start_time
+        stats = self.planner.stats.as_dict()
+        if plan is None:
+            status = self.planner.stats.status or FAILED
+            if status == UNSOLVABLE:
+                output = 'The problem has no plan'
+            elif status == FAILED:
+                output = 'No plan was found'
+            else:
+                output = 'Planner stopped: ' + status
+            return PlanResult(status, output=output, time=duration, stats=stats)
+        steps = [(act.name, tuple(act.parameters)) for act in plan]
+        return PlanResult(SOLVED, steps, 'Plan found with ' + str(len(steps)) + ' steps', duration, stats)
+
+    def plan_problem(self, domain, problem, filename, previous_plan=None):
+        # The planner loads the Problem directly, filename is not written
+        return self.plan(domain, problem, previous_plan)
+
+
+class PortfolioBackend(InProcessBackend):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Plans with a Portfolio racing several search configurations on all
+    # cores, configurations are (search, heuristic, time limit) tuples and
+    # time_limit is both the default per configuration and the limit of
+    # the call
+
+    def __init__(self, configurations=DEFAULT_CONFIGURATIONS, time_limit=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.planner = Portfolio(configurations, time_limit, cache_dir=cache_dir)
+        self.time_limit = time_limit
+        self.node_limit = None
+        self.memory_limit = None
+
+    # -----------------------------------------------
+    # Plan
+    # -----------------------------------------------
+
+    def plan(self, domain, problem, previous_plan=None):
+        # Errors of single configurations are appended to the output, the
+        # race goes on without them
+        self.planner.errors = []
+        result = super().plan(domain, problem, previous_plan)
+        for configuration, error in self.planner.errors:
+            result.output += '\n' + ':'.join(configuration[:2]) + ' failed: ' + error
+        return result
+
+
+class LapktBackend(PlannerBackend):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Runs a lapkt planner in a fresh docker container per call. The project
+    # directory is mounted at /root/experiments, so domain and problem files
+    # must live below it.
+
+    def __init__(self, project_dir, image='lapkt/lapkt-public', planner='./siw-then-bfsf', sudo=True):
+        self.project_dir = os.path.abspath(project_dir)
+        self.image = image
+        self.planner = planner
+        self.sudo = sudo
+
+    def container_path(self, filename):
+        relative = os.path.relpath(os.path.abspath(filename), self.project_dir)
+        if relative.startswith('..'):
+            raise Exception(filename + ' is not inside ' + self.project_dir)
+        return '/root/experiments/' + relative.replace(os.sep, '/')
+
+    # -----------------------------------------------
+    # Plan
+    # -----------------------------------------------
+
+    def plan(self, domain, problem, previous_plan=None):
+        start_time = time.time()
+        fd, plan_file = tempfile.mkstemp(dir=self.project_dir, suffix='.plan')
+        os.close(fd)
+        os.remove(plan_file)
+        command = ['sudo'] if self.sudo else []
+        command += ['docker', 'run', '--rm', '-v', self.project_dir + ':/root/experiments', self.image, self.planner,
+                    '--domain', self.container_path(domain),
+                    '--problem', self.container_path(problem),
+                    '--output', self.container_path(plan_file)]
+        try:
+            output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True).stdout.strip()
+            duration = time.time() - start_time
+            if not output or any(word in output.lower() for word in ('error', 'undeclared', 'unknown')):
+                return PlanResult(ERROR, output=output, time=duration)
+            if 'simplified to false' in output.lower():
+                return PlanResult(UNSOLVABLE, output=output, time=duration)
+            if not os.path.exists(plan_file):
+                return PlanResult(FAILED, output=output, time=duration)
+            with open(plan_file) as f:
+                return PlanResult(SOLVED, parse_plan(f.read()), output, duration)
+        finally:
+            if os.path.exists(plan_file):
+                os.remove(plan_file)
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    result = InProcessBackend().plan(domain, problem)
+    print(result.output)
+    print('Time: ' + str(result.time) + 's')
+    if result.solved:
+        print('\n'.join(result.lines()))
+    else:
+        sys.exit(result.status)
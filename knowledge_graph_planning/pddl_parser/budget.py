@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import os, threading, time
+from .stats import peak_rss
+
+# Outcome of a planner call
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+# An incomplete search ended without a plan, which proves nothing
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+NODE_LIMIT = 'node-limit'
+MEMORY_OUT = 'memory-out'
+CANCELLED = 'cancelled'
+
+# Memory is read once every that many nodes
+MEMORY_CHECK_INTERVAL = 1024
+
+
+def current_rss():
+    # Resident set size of this process in kilobytes, the peak where the
+    # current one cannot be read
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+class LimitReached(Exception):
+
+    # Raised out of a search when its budget runs out, status says which
+    # limit was reached
+
+    def __init__(self, status):
+        super().__init__('Search stopped: ' + status)
+        self.status = status
+
+
+class CancellationToken:
+
+    # Shared between the thread running the planner and any thread that
+    # wants to stop it
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class Budget:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Limits of one planner call: wall-clock seconds from the creation of
+    # the budget, expanded nodes, resident memory in kilobytes, and a
+    # cancellation token. Any of them may be None. Searches call check() once
+    # per expansion, the planner check(0) between phases, and it raises
+    # LimitReached when a limit is exceeded.
+
+    def __init__(self, time_limit=None, node_limit=None, memory_limit=None, token=None):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.memory_limit = memory_limit
+        self.token = token
+        self.deadline = None if time_limit is None else time.time() + time_limit
+        self.nodes = 0
+
+    @property
+    def remaining(self):
+        # Seconds left, None without a time limit
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.time(), 0.0)
+
+    # -----------------------------------------------
+    # Check
+    # -----------------------------------------------
+
+    def check(self, nodes=1):
+        self.nodes += nodes
+        if self.token is not None and self.token.cancelled:
+            raise LimitReached(CANCELLED)
+        if self.deadline is not None and time.time() > self.deadline:
+            raise LimitReached(TIMEOUT)
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise LimitReached(NODE_LIMIT)
+        if self.memory_limit is not None and (not nodes or self.nodes % MEMORY_CHECK_INTERVAL == 0) and current_rss() > self.memory_limit:
+            raise LimitReached(MEMORY_OUT)
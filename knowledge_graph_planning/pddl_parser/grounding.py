@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import itertools
+from .action import Action
+
+
+class Grounder:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Grounds action schemas by a relaxed reachability fixpoint from the
+    # initial state instead of the Cartesian product of typed parameters.
+    # Delete effects and negative preconditions are ignored, so the result is
+    # a superset of the actions applicable in any reachable state, but only
+    # contains actions whose positive preconditions can all become true.
+    #
+    # Static predicates appear in no effect, so their atoms keep their
+    # initial value. Static preconditions and effect conditions are evaluated
+    # once while grounding: actions and conditional effects that can never
+    # apply are dropped and the others lose their static conditions, so
+    # static atoms need not be part of the search state.
+
+    def __init__(self, objects, types):
+        self.objects = objects
+        self.types = types
+        self.domains = {}
+
+    # -----------------------------------------------
+    # Type domain
+    # -----------------------------------------------
+
+    def domain(self, type):
+        # Types are names or ['either', ...] lists as parsed, kept as tuples
+        if isinstance(type, list):
+            type = tuple(type)
+        if type not in self.domains:
+            type_stack = list(type[1:]) if isinstance(type, (list, tuple)) and type and type[0] == 'either' else [type]
+            items = []
+            while type_stack:
+                t = type_stack.pop()
+                if t in self.objects:
+                    items += self.objects[t]
+                if t in self.types:
+                    type_stack += self.types[t]
+            self.domains[type] = tuple(sorted(set(items)))
+        return self.domains[type]
+
+    # -----------------------------------------------
+    # Ground
+    # -----------------------------------------------
+
+    def ground(self, actions, state, static_facts=None):
+        self.set_statics(actions, state, static_facts)
+        self.reachable = set(state)
+        self.index = {}
+        for fact in self.reachable:
+            self.add_to_index(fact)
+        schemas = [self.prepare(action) for action in actions]
+        ground_actions = []
+        seen = set()
+        delta = sorted(self.reachable)
+        first = True
+        while delta or first:
+            delta_index = {}
+            for fact in delta:
+                delta_index.setdefault(fact[0], []).append(fact)
+            new_facts = []
+            for action, variables, domains, members, preconditions in schemas:
+                if first:
+                    assignments = self.naive(preconditions, variables, domains, members)
+                else:
+                    assignments = self.semi_naive(preconditions, variables, domains, members, delta_index)
+                for assignment in assignments:
+                    key = (action.name, assignment)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    act = self.instantiate(action, variables, assignment)
+                    if act is None:
+                        continue
+                    ground_actions.append(act)
+                    # Conditional add effects count as reachable whether or
+                    # not their condition ever holds
+                    for fact in itertools.chain(act.add_effects, *[effect[3] for effect in act.conditional_effects]):
+                        if fact not in self.reachable:
+                            self.reachable.add(fact)
+                            self.add_to_index(fact)
+                            new_facts.append(fact)
+            delta = new_facts
+            first = False
+        return ground_actions
+
+    # -----------------------------------------------
+    # Statics
+    # -----------------------------------------------
+
+    def set_statics(self, actions, state, static_facts=None):
+        # static_facts are the static atoms known to hold, by default those of
+        # state. Static atoms of state outside static_facts are kept as
+        # preconditions, for a state that is a union of several initial states.
+        self.statics = self.static_predicates(actions)
+        self.state = frozenset(state)
+        if static_facts is None:
+            static_facts = state
+        self.static_facts = frozenset(fact for fact in static_facts if fact[0] in self.statics)
+
+    def static_predicates(self, actions):
+        dynamic = set()
+        for action in actions:
+            for fact in action.add_effects | action.del_effects:
+                dynamic.add(fact[0])
+            for effect in action.conditional_effects:
+                for fact in effect[3] | effect[4]:
+                    dynamic.add(fact[0])
+        predicates = set()
+        for action in actions:
+            for fact in action.positive_preconditions | action.negative_preconditions:
+                predicates.add(fact[0])
+            for effect in action.conditional_effects:
+                for fact in effect[1] | effect[2]:
+                    predicates.add(fact[0])
+        return frozenset(predicates - dynamic)
+
+    def dynamic(self, atoms):
+        # Atoms without the static facts, for the task's states and goals
+        return frozenset(atoms) - self.static_facts
+
+    def compile_statics(self, positive, negative):
+        # Returns the conditions without the static atoms whose value is
+        # known, or None if one of them fails
+        if not any(fact[0] in self.statics for fact in positive | negative):
+            return positive, negative
+        new_positive = set()
+        for fact in positive:
+            if fact[0] not in self.statics or fact not in self.static_facts:
+                if fact[0] in self.statics and fact not in self.state:
+                    return None
+                new_positive.add(fact)
+        new_negative = set()
+        for fact in negative:
+            if fact[0] in self.statics:
+                if fact in self.static_facts:
+                    return None
+                if fact not in self.state:
+                    continue
+            new_negative.add(fact)
+        return new_positive, new_negative
+
+    # -----------------------------------------------
+    # Prepare
+    # -----------------------------------------------
+
+    def prepare(self, action):
+        variables = [var for var, _ in action.parameters]
+        domains = [self.domain(tuple(type) if isinstance(type, list) else type) for _, type in action.parameters]
+        members = [frozenset(domain) for domain in domains]
+        # Join smaller predicates first, then prefer atoms sharing bound variables
+        remaining = sorted(action.positive_preconditions, key=lambda atom: (len(self.index.get(atom[0], ())), atom))
+        ordered = []
+        bound = set()
+        while remaining:
+            best = max(remaining, key=lambda atom: sum(1 for arg in atom[1:] if arg in bound))
+            remaining.remove(best)
+            ordered.append(best)
+            bound.update(arg for arg in best[1:] if arg in variables)
+        return action, variables, domains, members, ordered
+
+    # -----------------------------------------------
+    # Join
+    # -----------------------------------------------
+
+    def naive(self, preconditions, variables, domains, members):
+        for binding in self.join(preconditions, {}, variables, members):
+            for assignment in self.complete(binding, variables, domains):
+                yield assignment
+
+    def semi_naive(self, preconditions, variables, domains, members, delta_index):
+        # Only assignments using at least one fact that became reachable in
+        # the previous round can be new
+        for k, atom in enumerate(preconditions):
+            for fact in delta_index.get(atom[0], ()):
+                binding = self.unify(atom, fact, {}, variables, members)
+                if binding is None:
+                    continue
+                rest = preconditions[:k] + preconditions[k + 1:]
+                for full in self.join(rest, binding, variables, members):
+                    for assignment in self.complete(full, variables, domains):
+                        yield assignment
+
+    def join(self, atoms, binding, variables, members):
+        if not atoms:
+            yield binding
+            return
+        atom = atoms[0]
+        for fact in self.candidates(atom, binding):
+            new_binding = self.unify(atom, fact, binding, variables, members)
+            if new_binding is not None:
+                for result in self.join(atoms[1:], new_binding, variables, members):
+                    yield result
+
+    def candidates(self, atom, binding):
+        # Use the first bound argument (or constant) to narrow the facts
+        for position, arg in enumerate(atom[1:], 1):
+            if arg in binding:
+                return self.index.get((atom[0], position, binding[arg]), ())
+            if not arg.startswith('?'):
+                return self.index.get((atom[0], position, arg), ())
+        return self.index.get(atom[0], ())
+
+    def unify(self, atom, fact, binding, variables, members):
+        if len(atom) != len(fact):
+            return None
+        new_binding = binding
+        for arg, value in zip(atom[1:], fact[1:]):
+            if arg in variables:
+                bound = new_binding.get(arg)
+                if bound is None:
+                    if value not in members[variables.index(arg)]:
+                        return None
+                    if new_binding is binding:
+                        new_binding = dict(binding)
+                    new_binding[arg] = value
+                elif bound != value:
+                    return None
+            elif arg != value:
+                return None
+        return new_binding
+
+    def complete(self, binding, variables, domains):
+        # Parameters not constrained by a positive precondition range over their type
+        free = [i for i, var in enumerate(variables) if var not in binding]
+        for values in itertools.product(*[domains[i] for i in free]):
+            assignment = [binding.get(var) for var in variables]
+            for i, value in zip(free, values):
+                assignment[i] = value
+            yield tuple(assignment)
+
+    # -----------------------------------------------
+    # Index
+    # -----------------------------------------------
+
+    def add_to_index(self, fact):
+        self.index.setdefault(fact[0], []).append(fact)
+        for position, value in enumerate(fact[1:], 1):
+            if isinstance(value, str):
+                self.index.setdefault((fact[0], position, value), []).append(fact)
+
+    # -----------------------------------------------
+    # Instantiate
+    # -----------------------------------------------
+
+    def instantiate(self, action, variables, assignment):
+        # Returns None if a static precondition fails
+        positive_preconditions = action.replace(action.positive_preconditions, variables, assignment)
+        negative_preconditions = action.replace(action.negative_preconditions, variables, assignment)
+        preconditions = self.compile_statics(frozenset(map(tuple, positive_preconditions)), frozenset(map(tuple, negative_preconditions)))
+        if preconditions is None:
+            return None
+        add_effects = action.replace(action.add_effects, variables, assignment)
+        del_effects = action.replace(action.del_effects, variables, assignment)
+        conditional_effects = []
+        for effect in action.ground_conditional_effects(variables, assignment, lambda type: self.domain(tuple(type) if isinstance(type, list) else type)):
+            conditions = self.compile_statics(frozenset(map(tuple, effect[1])), frozenset(map(tuple, effect[2])))
+            if conditions is None:
+                continue
+            # Effects whose conditions were all static always fire
+            if conditions[0] or conditions[1]:
+                conditional_effects.append((effect[0],) + conditions + tuple(effect[3:]))
+            else:
+                add_effects += effect[3]
+                del_effects += effect[4]
+        return Action(action.name, assignment, preconditions[0], preconditions[1], add_effects, del_effects, conditional_effects)
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys, time
+    from .PDDL import PDDL_Parser
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    start_time = time.time()
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    print('Time: ' + str(time.time() - start_time) + 's')
+    print('Reachable facts: ' + str(len(grounder.reachable)))
+    print('Static predicates: ' + ' '.join(sorted(grounder.statics)))
+    print('Static facts: ' + str(len(grounder.static_facts)))
+    print('Ground actions: ' + str(len(ground_actions)))
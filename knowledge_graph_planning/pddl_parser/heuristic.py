@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import heapq
+
+
+def negated_atoms(task):
+    # Sorted ids of the atoms that appear negated in the goal or a condition
+    negated = set(task.goal_neg_ids)
+    for ids in task.pre_neg_ids:
+        negated.update(ids)
+    for effects in task.conditional_ids:
+        for _, neg, _, _ in effects:
+            negated.update(neg)
+    return sorted(negated)
+
+
+class RelaxedHeuristic:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Delete-relaxation heuristics over a grounded Task. Costs of atoms are
+    # propagated with a generalized Dijkstra: an action fires once all its
+    # preconditions are reached (deletes are ignored) and every action has
+    # unit cost. Each conditional effect is a relaxed action of its own,
+    # preconditions joined with its condition, and origin maps relaxed
+    # actions back to task actions. Evaluating a dead end returns None.
+    #
+    # Atoms that appear negated in the goal or a condition get a not-atom
+    # fact, numbered after the task's atoms, which holds where the atom is
+    # false and is added by the actions deleting the atom. Negative goals
+    # and preconditions then count like positive ones.
+
+    maximize = False
+
+    def __init__(self, task):
+        self.task = task
+        negated = negated_atoms(task)
+        self.negated = {atom: len(task.atoms) + k for k, atom in enumerate(negated)}
+        self.size = len(task.atoms) + len(negated)
+        def negations(ids):
+            return tuple([self.negated[atom] for atom in ids if atom in self.negated])
+        # SASTask compiles negations away and has no deletes to track
+        del_ids = task.del_ids if negated else [()] * len(task.actions)
+        self.preconditions = [tuple(pos) + negations(neg) for pos, neg in zip(task.pre_pos_ids, task.pre_neg_ids)]
+        self.add_ids = [tuple(add) + negations(delete) for add, delete in zip(task.add_ids, del_ids)]
+        self.origin = list(range(len(self.preconditions)))
+        for index, effects in enumerate(task.conditional_ids):
+            for pos, neg, add, delete in effects:
+                add = tuple(add) + (negations(delete) if negated else ())
+                if add:
+                    self.preconditions.append(tuple(sorted(set(self.preconditions[index]) | set(pos) | set(negations(neg)))))
+                    self.add_ids.append(add)
+                    self.origin.append(index)
+        self.goals = tuple(task.goal_pos_ids) + negations(task.goal_neg_ids)
+        self.counts = [len(pre) for pre in self.preconditions]
+        self.precondition_of = [[] for _ in range(self.size)]
+        self.no_preconditions = []
+        for index, pre in enumerate(self.preconditions):
+            if pre:
+                for atom in pre:
+                    self.precondition_of[atom].append(index)
+            else:
+                self.no_preconditions.append(index)
+
+    # -----------------------------------------------
+    # Evaluate
+    # -----------------------------------------------
+
+    def __call__(self, state):
+        cost = self.explore(state)
+        if cost is None:
+            return None
+        return self.combine([cost[atom] for atom in self.goals])
+
+    def combine(self, costs):
+        if self.maximize:
+            return max(costs, default=0)
+        return sum(costs)
+
+    # -----------------------------------------------
+    # Explore
+    # -----------------------------------------------
+
+    def explore(self, state):
+        # Returns the cost of every atom (None if unreached) or None if a goal is unreachable
+        cost = [None] * self.size
+        self.supporter = supporter = {}
+        unsatisfied = self.counts[:]
+        accumulated = [0] * len(unsatisfied)
+        precondition_of = self.precondition_of
+        add_ids = self.add_ids
+        maximize = self.maximize
+        queue = []
+        true = list(self.task.indices(state))
+        for atom in true:
+            cost[atom] = 0
+            queue.append((0, atom))
+        if self.negated:
+            true = set(true)
+            for atom, negation in self.negated.items():
+                if atom not in true:
+                    cost[negation] = 0
+                    queue.append((0, negation))
+        for index in self.no_preconditions:
+            for atom in add_ids[index]:
+                if cost[atom] is None:
+                    cost[atom] = 1
+                    supporter[atom] = index
+                    queue.append((1, atom))
+        heapq.heapify(queue)
+        # Costs are final once popped, so stop when every goal has been popped
+        goals_left = set(self.goals)
+        while queue and goals_left:
+            atom_cost, atom = heapq.heappop(queue)
+            if atom_cost > cost[atom]:
+                continue
+            goals_left.discard(atom)
+            for index in precondition_of[atom]:
+                if maximize:
+                    if atom_cost > accumulated[index]:
+                        accumulated[index] = atom_cost
+                else:
+                    accumulated[index] += atom_cost
+                unsatisfied[index] -= 1
+                if not unsatisfied[index]:
+                    action_cost = accumulated[index] + 1
+                    for added in add_ids[index]:
+                        old = cost[added]
+                        if old is None or action_cost < old:
+                            cost[added] = action_cost
+                            supporter[added] = index
+                            heapq.heappush(queue, (action_cost, added))
+        if goals_left:
+            return None
+        return cost
+
+
+class HMax(RelaxedHeuristic):
+
+    maximize = True
+
+
+class HAdd(RelaxedHeuristic):
+
+    maximize = False
+
+
+class HFF(HAdd):
+
+    # -----------------------------------------------
+    # Relaxed plan
+    # -----------------------------------------------
+
+    # Extracts a relaxed plan from the h_add best supporters and counts its
+    # distinct task actions
+
+    def __call__(self, state):
+        plan = self.relaxed_plan(state)
+        if plan is None:
+            return None
+        return len(plan)
+
+    def relaxed_plan(self, state):
+        cost = self.explore(state)
+        if cost is None:
+            return None
+        plan = set()
+        marked = set()
+        stack = [atom for atom in self.goals if cost[atom]]
+        while stack:
+            atom = stack.pop()
+            if atom in marked:
+                continue
+            marked.add(atom)
+            index = self.supporter[atom]
+            if index not in plan:
+                plan.add(index)
+                stack += [pre for pre in self.preconditions[index] if cost[pre]]
+        return set(self.origin[index] for index in plan)
+
+
+HEURISTICS = {
+    'hmax': HMax,
+    'hadd': HAdd,
+    'hff': HFF,
+}
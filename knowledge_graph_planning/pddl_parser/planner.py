@@ -16,52 +16,271 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
-from .PDDL import PDDL_Parser
+import os, time
+from .PDDL import PDDL_Parser, DEFAULT_CACHE_DIR
+from .grounding import Grounder
+from .relevance import RelevanceGrounder
+from .task import Task
+from .successor import SuccessorGenerator
+from .search import SEARCHES, BreadthFirstSearch, IteratedWidth, SerializedIteratedWidth, SIWThenBFSF, RegressionSearch, BidirectionalSearch
+from .heuristic import HEURISTICS, HMax
+from .repair import PlanRepair
+from .stats import PlannerStats
+from .budget import Budget, LimitReached, SOLVED, UNSOLVABLE, FAILED
+from .sas import SASTask, synthesize_invariants, mutex_groups
+from .problem import Problem
+
+# Searches that run over the finite-domain encoding, the width based ones
+# need the bit vector states of Task
+SAS_SEARCHES = ('bfs', 'gbfs', 'astar', 'anytime')
+# Searches that prune subgoals with the mutex invariants
+REGRESSION_SEARCHES = ('regression', 'bidirectional')
 
 
 class Planner:
 
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # width is k for IW(k) and the largest k SIW tries. Each call to solve
+    # or solve_task leaves its PlannerStats in self.stats, and
+    # every hook is called as hook(phase, stats) when the parse, grounding
+    # or search phase ends. With sas, solve searches over the finite-domain
+    # translation of the task (see sas.SASTask), using mutex invariants
+    # synthesized once per domain. The regression searches use the same
+    # invariants to prune unreachable subgoals. With relevance, only the
+    # actions that can contribute to reaching the goal are grounded, see
+    # relevance.RelevanceGrounder, and stats.pruned_objects counts the
+    # objects none of them mentions.
+
+    def __init__(self, search='bfs', heuristic='hff', weight=1, cache_dir=DEFAULT_CACHE_DIR, width=2, hooks=(), sas=False, relevance=True):
+        if search not in SEARCHES:
+            raise Exception('Search ' + search + ' not supported')
+        if sas and search not in SAS_SEARCHES:
+            raise Exception('Search ' + search + ' does not support the finite-domain encoding')
+        if heuristic not in HEURISTICS:
+            raise Exception('Heuristic ' + heuristic + ' not supported')
+        if width not in (1, 2):
+            raise Exception('Width must be 1 or 2')
+        self.search = search
+        self.heuristic = heuristic
+        self.weight = weight
+        self.cache_dir = cache_dir
+        self.width = width
+        self.hooks = list(hooks)
+        self.sas = sas
+        self.relevance = relevance
+        self.domains = {}
+        self.stats = None
+
     # -----------------------------------------------
     # Solve
     # -----------------------------------------------
 
-    def solve(self, domain, problem):
-        # Parser
-        parser = PDDL_Parser()
-        parser.parse_domain(domain)
-        parser.parse_problem(problem)
-        # Parsed data
-        state = parser.state
-        goal_pos = parser.positive_goals
-        goal_not = parser.negative_goals
-        # Do nothing
-        if self.applicable(state, goal_pos, goal_not):
-            return []
-        # Grounding process
-        ground_actions = []
-        for action in parser.actions:
-            for act in action.groundify(parser.objects, parser.types):
-                ground_actions.append(act)
-        # Search
-        visited = set([state])
-        fringe = [state, None]
-        while fringe:
-            state = fringe.pop(0)
-            plan = fringe.pop(0)
-            for act in ground_actions:
-                if self.applicable(state, act.positive_preconditions, act.negative_preconditions):
-                    new_state = self.apply(state, act.add_effects, act.del_effects)
-                    if new_state not in visited:
-                        if self.applicable(new_state, goal_pos, goal_not):
-                            full_plan = [act]
-                            while plan:
-                                act, plan = plan
-                                full_plan.insert(0, act)
-                            return full_plan
-                        visited.add(new_state)
-                        fringe.append(new_state)
-                        fringe.append((act, plan))
-        return None
+    # A previous plan, as (name, parameters) steps, is repaired before
+    # searching: see PlanRepair. A Budget bounds the call; when it runs out
+    # the anytime search returns its best plan so far and the others None.
+    # Either way stats.status tells why the call ended, FAILED when an
+    # incomplete search found no plan.
+
+    def solve(self, domain, problem, previous_plan=None, budget=None):
+        stats = self.stats = PlannerStats()
+        budget = budget or Budget()
+        try:
+            # Parser
+            start_time = time.time()
+            parser = self.parse(domain, problem)
+            # Parsed data
+            state = parser.state
+            goal_pos = parser.positive_goals
+            goal_not = parser.negative_goals
+            self.check_goals(parser)
+            stats.objects = sum(len(objects) for objects in parser.objects.values())
+            self.end_phase('parse', start_time)
+            # Do nothing
+            if self.applicable(state, goal_pos, goal_not):
+                stats.plan_length = 0
+                stats.status = SOLVED
+                return []
+            budget.check(0)
+            # Grounding process
+            start_time = time.time()
+            grounder = self.grounder(parser.objects, parser.types, goal_pos, goal_not)
+            ground_actions = grounder.ground(parser.actions, state)
+            if self.relevance:
+                stats.pruned_objects = len(grounder.irrelevant_objects)
+            # A goal outside the relaxed reachable facts can never be achieved
+            if not goal_pos.issubset(grounder.reachable) or goal_not & grounder.static_facts:
+                stats.status = UNSOLVABLE
+                return None
+            # Static facts hold in every state and are left out of the task
+            task = Task(grounder.dynamic(state), grounder.dynamic(goal_pos), goal_not, ground_actions)
+            self.end_phase('grounding', start_time)
+            return self.solve_task(task, previous_plan, stats, parser.invariants if self.uses_invariants() else None, budget)
+        except LimitReached as e:
+            stats.status = e.status
+            return None
+        finally:
+            stats.finish()
+
+    def solve_many(self, domain, problems, budget=None):
+        # Problems over the same objects are grounded once, from the union of
+        # their initial states, which reaches a superset of the actions each
+        # one needs. Each problem is then solved with solve_task on a copy of
+        # the shared task with its own initial state and goal, under a fresh
+        # Budget with the limits and token of budget. Returns a (plan, stats)
+        # pair per problem, the stats exclude the shared grounding, and
+        # self.stats is left with those of the last problem.
+        results = [None] * len(problems)
+        groups = {}
+        for index, problem in enumerate(problems):
+            stats = self.stats = PlannerStats()
+            start_time = time.time()
+            parser = self.parse(domain, problem)
+            self.check_goals(parser)
+            stats.objects = sum(len(objects) for objects in parser.objects.values())
+            self.end_phase('parse', start_time)
+            if self.applicable(parser.state, parser.positive_goals, parser.negative_goals):
+                stats.plan_length = 0
+                stats.status = SOLVED
+                stats.finish()
+                results[index] = ([], stats)
+                continue
+            key = tuple(sorted((type, tuple(sorted(objects))) for type, objects in parser.objects.items()))
+            groups.setdefault(key, []).append((index, parser, stats))
+        for group in groups.values():
+            parsers = [parser for _, parser, _ in group]
+            state = frozenset().union(*[parser.state for parser in parsers])
+            goal_pos = frozenset().union(*[parser.positive_goals for parser in parsers])
+            goal_not = frozenset().union(*[parser.negative_goals for parser in parsers])
+            # Only static facts of every initial state are compiled away
+            grounder = self.grounder(parsers[0].objects, parsers[0].types, goal_pos, goal_not)
+            ground_actions = grounder.ground(parsers[0].actions, state, frozenset.intersection(*[parser.state for parser in parsers]))
+            shared = Task(grounder.dynamic(state), grounder.dynamic(goal_pos), goal_not, ground_actions)
+            # The finite-domain translation is built per problem and has its own successors
+            generator = None if self.sas else SuccessorGenerator(shared)
+            for index, parser, stats in group:
+                self.stats = stats
+                # The clock restarts after the shared grounding
+                stats.start_time = time.time() - stats.parse_time
+                if self.relevance:
+                    stats.pruned_objects = len(grounder.irrelevant_objects)
+                task = shared.with_problem(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals)
+                if parser.negative_goals & grounder.static_facts or HMax(task)(task.init) is None:
+                    # Relaxed reachability from this initial state alone
+                    stats.status = UNSOLVABLE
+                    stats.finish()
+                    plan = None
+                else:
+                    problem_budget = Budget() if budget is None else Budget(budget.time_limit, budget.node_limit, budget.memory_limit, budget.token)
+                    invariants = parser.invariants if self.uses_invariants() else None
+                    plan = self.solve_task(task, None, stats, invariants, problem_budget, generator)
+                results[index] = (plan, stats)
+        return results
+
+    def grounder(self, objects, types, positive_goals, negative_goals):
+        if self.relevance:
+            return RelevanceGrounder(objects, types, positive_goals, negative_goals)
+        return Grounder(objects, types)
+
+    def parse(self, domain, problem):
+        # Parsed domains stay in memory for the life of the planner, keyed by
+        # path and file stamp so an edited domain is parsed again. problem is
+        # a file or a Problem, which is loaded without writing it out.
+        parser = PDDL_Parser(self.cache_dir)
+        stat = os.stat(domain)
+        key = (os.path.abspath(domain), stat.st_mtime_ns, stat.st_size)
+        fields = self.domains.get(key)
+        if fields is None:
+            parser.parse_domain(domain)
+            fields = self.domains[key] = {field: getattr(parser, field) for field in parser.DOMAIN_FIELDS}
+            if self.uses_invariants():
+                fields['invariants'] = synthesize_invariants(parser.actions)
+        for field, value in fields.items():
+            setattr(parser, field, value)
+        # Problem objects are added to the domain constants in place
+        parser.objects = {type: list(objects) for type, objects in fields['objects'].items()}
+        if isinstance(problem, Problem):
+            problem.load(parser)
+        else:
+            parser.parse_problem(problem)
+        return parser
+
+    def solve_task(self, task, previous_plan=None, stats=None, invariants=None, budget=None, generator=None):
+        # Repair works on task, the search on its finite-domain translation
+        # when invariants are given with sas. generator is a successor
+        # generator over task to reuse, see solve_many
+        stats = self.stats = stats or PlannerStats()
+        budget = budget or Budget()
+        stats.atoms = len(task.atoms)
+        stats.actions = len(task.actions)
+        start_time = time.time()
+        plan = None
+        engine = None
+        try:
+            budget.check(0)
+            if task.goal_reached(task.init):
+                plan = []
+            # Repair
+            elif previous_plan:
+                plan = PlanRepair(task, generator=generator, budget=budget).repair(previous_plan)
+                stats.repaired = plan is not None
+            # Search
+            if plan is None:
+                engine = self.search_engine(task, generator, invariants)
+                engine.budget = budget
+                plan = engine.search()
+            if plan is not None:
+                stats.status = SOLVED
+            else:
+                stats.status = UNSOLVABLE if engine.complete else FAILED
+        except LimitReached as e:
+            # The anytime search keeps its best plan so far
+            plan = getattr(engine, 'best', None)
+            stats.status = SOLVED if plan is not None else e.status
+        if engine is not None:
+            stats.add_search(engine)
+        self.end_phase('search', start_time)
+        if plan is not None:
+            stats.plan_length = len(plan)
+        stats.finish()
+        if plan is None:
+            return None
+        return [task.actions[index] for index in plan]
+
+    def end_phase(self, phase, start_time):
+        setattr(self.stats, phase + '_time', time.time() - start_time)
+        for hook in self.hooks:
+            hook(phase, self.stats)
+
+    def uses_invariants(self):
+        return self.sas or self.search in REGRESSION_SEARCHES
+
+    def search_engine(self, task, generator=None, invariants=None):
+        search = SEARCHES[self.search]
+        if self.sas and invariants is not None:
+            task = SASTask(task, invariants)
+        if search is BreadthFirstSearch:
+            return search(task, generator)
+        if search in (RegressionSearch, BidirectionalSearch):
+            return search(task, generator, mutex_groups(task, invariants) if invariants is not None else ())
+        if search in (IteratedWidth, SerializedIteratedWidth):
+            return search(task, self.width, generator)
+        if search is SIWThenBFSF:
+            return search(task, HEURISTICS[self.heuristic](task), self.width, generator)
+        return search(task, HEURISTICS[self.heuristic](task), self.weight, generator=generator)
+
+    def check_goals(self, parser):
+        objects = set()
+        for group in parser.objects.values():
+            objects.update(group)
+        for atom in parser.positive_goals | parser.negative_goals:
+            if atom[0] not in parser.predicates:
+                raise Exception('Goal uses undeclared predicate ' + atom[0])
+            for arg in atom[1:]:
+                if arg not in objects:
+                    raise Exception('Goal uses unknown object ' + arg)
 
     # -----------------------------------------------
     # Applicable
@@ -74,7 +293,12 @@ class Planner:
     # Apply
     # -----------------------------------------------
 
-    def apply(self, state, positive, negative):
+    def apply(self, state, positive, negative, conditional_effects=()):
+        # Conditions of ground conditional effects are checked against the old state
+        for _, condition_positive, condition_negative, add, delete in conditional_effects:
+            if self.applicable(state, condition_positive, condition_negative):
+                positive = positive.union(add)
+                negative = negative.union(delete)
         return state.difference(negative).union(positive)
 
 
@@ -82,17 +306,50 @@ class Planner:
 # Main
 # -----------------------------------------------
 if __name__ == '__main__':
-    import sys, time
+    import argparse, sys
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('domain')
+    argparser.add_argument('problem', nargs='+', help='several problems are solved together with solve_many')
+    argparser.add_argument('-v', '--verbose', action='store_true')
+    argparser.add_argument('-s', '--search', default='bfs', choices=sorted(SEARCHES))
+    argparser.add_argument('-H', '--heuristic', default='hff', choices=sorted(HEURISTICS))
+    argparser.add_argument('-w', '--weight', type=float, default=1)
+    argparser.add_argument('-k', '--width', type=int, choices=(1, 2), default=2, help='k of IW(k), largest k of SIW')
+    argparser.add_argument('--no-cache', action='store_true', help='do not use the parsed domain cache')
+    argparser.add_argument('-r', '--repair', metavar='PLAN', help='plan file to repair before searching')
+    argparser.add_argument('--stats', action='store_true', help='print phase timings and search statistics')
+    argparser.add_argument('--json', action='store_true', help='print the statistics as one JSON line')
+    argparser.add_argument('--sas', action='store_true', help='search over the finite-domain translation')
+    argparser.add_argument('--no-relevance', action='store_true', help='ground every reachable action, not only those relevant to the goal')
+    argparser.add_argument('-t', '--time-limit', type=float, help='seconds for the whole call')
+    argparser.add_argument('-n', '--node-limit', type=int, help='expanded nodes for the whole call')
+    argparser.add_argument('-m', '--memory-limit', type=int, help='resident memory in kilobytes')
+    args = argparser.parse_args()
+    previous_plan = None
+    if args.repair:
+        from .backend import parse_plan
+        with open(args.repair) as f:
+            previous_plan = parse_plan(f.read())
     start_time = time.time()
-    domain = sys.argv[1]
-    problem = sys.argv[2]
-    verbose = len(sys.argv) > 3 and sys.argv[3] == '-v'
-    planner = Planner()
-    plan = planner.solve(domain, problem)
+    hooks = []
+    if args.stats:
+        hooks.append(lambda phase, stats: print(phase + ' phase: ' + str(getattr(stats, phase + '_time')) + 's'))
+    planner = Planner(args.search, args.heuristic, args.weight, None if args.no_cache else DEFAULT_CACHE_DIR, args.width, hooks, args.sas, not args.no_relevance)
+    if len(args.problem) > 1:
+        for problem, (plan, stats) in zip(args.problem, planner.solve_many(args.domain, args.problem, Budget(args.time_limit, args.node_limit, args.memory_limit))):
+            print(problem + ': ' + ('no plan' if plan is None else str(len(plan)) + ' steps') + ' in ' + str(stats.total_time) + 's, ' + stats.status)
+        print('Time: ' + str(time.time() - start_time) + 's')
+        sys.exit()
+    plan = planner.solve(args.domain, args.problem[0], previous_plan, Budget(args.time_limit, args.node_limit, args.memory_limit))
     print('Time: ' + str(time.time() - start_time) + 's')
+    print('Status: ' + planner.stats.status)
+    if args.stats:
+        print(planner.stats)
+    if args.json:
+        print(planner.stats.to_json())
     if plan is not None:
         print('plan:')
         for act in plan:
-            print(act if verbose else act.name + ' ' + ' '.join(act.parameters))
+            print(act if args.verbose else act.name + ' ' + ' '.join(act.parameters))
     else:
         sys.exit('No plan was found')
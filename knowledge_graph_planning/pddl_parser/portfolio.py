@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import multiprocessing, queue, time
+from .PDDL import DEFAULT_CACHE_DIR
+from .planner import Planner
+from .repair import PlanRepair
+from .stats import PlannerStats
+from .budget import Budget, LimitReached, SOLVED, UNSOLVABLE, FAILED
+from .search import SEARCHES
+from .heuristic import HEURISTICS
+
+# (search, heuristic, time limit in seconds or None for the portfolio default),
+# the blind searches ignore their heuristic
+DEFAULT_CONFIGURATIONS = (
+    ('siw-bfsf', 'hadd', None),
+    ('gbfs', 'hff', None),
+    ('iw', 'hff', None),
+    ('bfs', 'hff', None),
+)
+POLL_INTERVAL = 0.1
+
+
+def run_configuration(task, search, heuristic, weight, index, results):
+    # Runs in a child process, reports (index, plan, search counts, proven,
+    # error) with plan None on failure, proven True when a complete search
+    # found no plan and error the text of the exception the configuration
+    # raised, if any
+    plan = None
+    counts = (0, 0, 0)
+    proven = False
+    error = None
+    try:
+        engine = Planner(search, heuristic, weight, cache_dir=None).search_engine(task)
+        plan = engine.search()
+        counts = (engine.expanded, engine.generated, engine.duplicates)
+        proven = plan is None and engine.complete
+    except Exception as e:
+        error = type(e).__name__ + ': ' + str(e)
+    results.put((index, plan, counts, proven, error))
+
+
+class Portfolio(Planner):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Runs several search configurations in parallel processes on the same
+    # grounded task, handed to every process when it starts: forked processes
+    # share its pages until they write to them, spawned ones receive a
+    # pickled copy. The first plan found wins and the other processes
+    # are terminated, as is any configuration that runs past its time limit.
+    # The configuration that won is kept in self.winner and its search
+    # counts in self.stats. A complete configuration that ends without a
+    # plan ends the race as UNSOLVABLE, otherwise a race without a plan is
+    # FAILED. Configurations that raised or died are listed in self.errors
+    # as (configuration, error) pairs. The budget's time limit and cancellation token stop the whole
+    # race; node and memory limits apply to the repair only.
+
+    def __init__(self, configurations=DEFAULT_CONFIGURATIONS, time_limit=None, weight=1, cache_dir=DEFAULT_CACHE_DIR):
+        super().__init__(configurations[0][0], configurations[0][1], weight, cache_dir)
+        for search, heuristic, _ in configurations:
+            if search not in SEARCHES:
+                raise Exception('Search ' + search + ' not supported')
+            if heuristic not in HEURISTICS:
+                raise Exception('Heuristic ' + heuristic + ' not supported')
+        self.configurations = list(configurations)
+        self.time_limit = time_limit
+        self.winner = None
+        self.errors = []
+
+    # -----------------------------------------------
+    # Solve
+    # -----------------------------------------------
+
+    def solve_task(self, task, previous_plan=None, stats=None, invariants=None, budget=None, generator=None):
+        # The configurations search task itself, invariants and generator are
+        # unused
+        stats = self.stats = stats or PlannerStats()
+        budget = budget or Budget()
+        stats.atoms = len(task.atoms)
+        stats.actions = len(task.actions)
+        self.winner = None
+        self.proven = False
+        self.errors = []
+        start_time = time.time()
+        plan = None
+        try:
+            budget.check(0)
+            if task.goal_reached(task.init):
+                plan = []
+            elif previous_plan:
+                plan = PlanRepair(task, budget=budget).repair(previous_plan)
+                stats.repaired = plan is not None
+            if plan is None:
+                plan = self.race(task, budget)
+            if plan is not None:
+                stats.status = SOLVED
+            else:
+                stats.status = UNSOLVABLE if self.proven else FAILED
+        except LimitReached as e:
+            stats.status = e.status
+        self.end_phase('search', start_time)
+        if plan is not None:
+            stats.plan_length = len(plan)
+        stats.finish()
+        if plan is None:
+            return None
+        return [task.actions[index] for index in plan]
+
+    def race(self, task, budget=None):
+        results = multiprocessing.Queue()
+        start_time = time.time()
+        running = {}
+        for index, (search, heuristic, time_limit) in enumerate(self.configurations):
+            process = multiprocessing.Process(target=run_configuration, args=(task, search, heuristic, self.weight, index, results), daemon=True)
+            process.start()
+            limit = time_limit if time_limit is not None else self.time_limit
+            running[index] = (process, None if limit is None else start_time + limit)
+        try:
+            while running:
+                try:
+                    index, plan, counts, proven, error = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if budget is not None:
+                        budget.check(0)
+                    # Drop configurations past their limit or that died without reporting
+                    now = time.time()
+                    for index, (process, deadline) in list(running.items()):
+                        if deadline is not None and now > deadline or not process.is_alive() and results.empty():
+                            if process.exitcode:
+                                self.errors.append((self.configurations[index], 'Process exited with code ' + str(process.exitcode)))
+                            process.terminate()
+                            del running[index]
+                    continue
+                running.pop(index, None)
+                if error is not None:
+                    self.errors.append((self.configurations[index], error))
+                if plan is not None:
+                    self.winner = self.configurations[index]
+                    self.stats.expanded, self.stats.generated, self.stats.duplicates = counts
+                    return plan
+                if proven:
+                    self.proven = True
+                    return None
+            return None
+        finally:
+            for process, _ in running.values():
+                process.terminate()
+            for process, _ in running.values():
+                process.join()
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import argparse, sys
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('domain')
+    argparser.add_argument('problem')
+    argparser.add_argument('-c', '--config', action='append', metavar='SEARCH:HEURISTIC[:LIMIT]', help='configuration to run, may be repeated')
+    argparser.add_argument('-t', '--time-limit', type=float, help='default time limit per configuration in seconds')
+    args = argparser.parse_args()
+    configurations = DEFAULT_CONFIGURATIONS
+    if args.config:
+        configurations = []
+        for config in args.config:
+            fields = config.split(':')
+            configurations.append((fields[0], fields[1] if len(fields) > 1 else 'hff', float(fields[2]) if len(fields) > 2 else None))
+    start_time = time.time()
+    portfolio = Portfolio(configurations, args.time_limit)
+    plan = portfolio.solve(args.domain, args.problem)
+    print('Time: ' + str(time.time() - start_time) + 's')
+    for configuration, error in portfolio.errors:
+        print(':'.join(configuration[:2]) + ' failed: ' + error)
+    if plan is None:
+        sys.exit('No plan was found')
+    if portfolio.winner:
+        print('Winner: ' + ':'.join(portfolio.winner[:2]))
+    print('plan:')
+    for act in plan:
+        print(act.name + ' ' + ' '.join(act.parameters))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+from .PDDL import PDDL_Parser
+
+
+class Problem:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # A planning problem built in code: objects by type, init facts and goal
+    # literals, atoms being tuples (predicate, arg, ...). Names are lowercased
+    # as PDDL_Parser does when reading a file, and facts keep the order they
+    # were added in. to_pddl() writes the problem in one join, and load()
+    # fills a parser as parse_problem would, so Planner.solve can take a
+    # Problem in place of a problem file without writing or parsing it.
+
+    def __init__(self, name, domain_name):
+        self.name = name.lower()
+        self.domain_name = domain_name.lower()
+        self.objects = {}
+        self.facts = {}
+        self.positive_goals = {}
+        self.negative_goals = {}
+
+    # -----------------------------------------------
+    # Build
+    # -----------------------------------------------
+
+    def add_object(self, name, type='object'):
+        self.objects[name.lower()] = type.lower()
+
+    def add_fact(self, atom):
+        self.facts[tuple([arg.lower() for arg in atom])] = None
+
+    def add_goal(self, atom, positive=True):
+        goals = self.positive_goals if positive else self.negative_goals
+        goals[tuple([arg.lower() for arg in atom])] = None
+
+    def clear_facts(self):
+        self.facts = {}
+
+    def clear_goal(self):
+        self.positive_goals = {}
+        self.negative_goals = {}
+
+    def parse_goal(self, text):
+        # Sets the goal from a (:goal ...) block or a bare condition, raises
+        # an Exception if it is malformed
+        parser = PDDL_Parser()
+        tokens = parser.scan_string(text)
+        if type(tokens) is list and tokens and tokens[0] == ':goal':
+            if len(tokens) != 2:
+                raise Exception('Malformed goal')
+            tokens = tokens[1]
+        positive = []
+        negative = []
+        parser.split_predicates(tokens, positive, negative, '', 'goals')
+        self.clear_goal()
+        for group, is_positive in ((positive, True), (negative, False)):
+            for atom in group:
+                if type(atom) is not list or not atom or any(type(arg) is list for arg in atom):
+                    raise Exception('Malformed goal literal ' + str(atom))
+                self.add_goal(atom, is_positive)
+
+    # -----------------------------------------------
+    # Write
+    # -----------------------------------------------
+
+    def to_pddl(self):
+        lines = ['(define (problem ' + self.name + ')', '\t(:domain ' + self.domain_name + ')', '\t(:objects']
+        lines += ['\t\t' + name + ' - ' + type for name, type in self.objects.items()]
+        lines += ['\t)', '\t(:init']
+        lines += ['\t\t(' + ' '.join(atom) + ')' for atom in self.facts]
+        lines.append('\t)')
+        if self.positive_goals or self.negative_goals:
+            lines += ['\t(:goal', '\t\t(and']
+            lines += ['\t\t\t(' + ' '.join(atom) + ')' for atom in self.positive_goals]
+            lines += ['\t\t\t(not (' + ' '.join(atom) + '))' for atom in self.negative_goals]
+            lines += ['\t\t)', '\t)']
+        lines.append(')')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            f.write(self.to_pddl())
+
+    # -----------------------------------------------
+    # Load
+    # -----------------------------------------------
+
+    def load(self, parser):
+        # Same result as parser.parse_problem on the written problem, the
+        # domain must already be parsed
+        if parser.domain_name != self.domain_name:
+            raise Exception('Different domain specified in problem ' + self.name)
+        parser.problem_name = self.name
+        for name, type in self.objects.items():
+            parser.objects.setdefault(type, []).append(name)
+        parser.state = frozenset(self.facts)
+        parser.positive_goals = frozenset(self.positive_goals)
+        parser.negative_goals = frozenset(self.negative_goals)
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    # Rebuilds a problem file through Problem and checks that it parses the same
+    import sys, time
+    domain = sys.argv[1]
+    filename = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    constants = {type: list(objects) for type, objects in parser.objects.items()}
+    parser.parse_problem(filename)
+    problem = Problem(parser.problem_name, parser.domain_name)
+    for type, objects in parser.objects.items():
+        for name in objects:
+            if name not in constants.get(type, ()):
+                problem.add_object(name, type)
+    for atom in sorted(parser.state):
+        problem.add_fact(atom)
+    for atom in sorted(parser.positive_goals):
+        problem.add_goal(atom)
+    for atom in sorted(parser.negative_goals):
+        problem.add_goal(atom, False)
+    start_time = time.time()
+    text = problem.to_pddl()
+    print('Write time: ' + str(time.time() - start_time) + 's, ' + str(len(text)) + ' bytes')
+    rebuilt = PDDL_Parser()
+    rebuilt.parse_domain(domain)
+    rebuilt.parse_problem_string(text)
+    loaded = PDDL_Parser()
+    loaded.parse_domain(domain)
+    start_time = time.time()
+    problem.load(loaded)
+    print('Load time: ' + str(time.time() - start_time) + 's')
+    for other in (rebuilt, loaded):
+        for field in ('state', 'positive_goals', 'negative_goals'):
+            if getattr(other, field) != getattr(parser, field):
+                sys.exit('Rebuilt problem differs in ' + field)
+        if {type: sorted(objects) for type, objects in other.objects.items()} != {type: sorted(objects) for type, objects in parser.objects.items()}:
+            sys.exit('Rebuilt problem differs in objects')
+    print('Problem rebuilt')
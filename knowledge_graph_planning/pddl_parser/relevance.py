@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+from collections import deque
+from .grounding import Grounder
+
+
+class RelevanceGrounder(Grounder):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Grounds only the actions that can contribute to a plan, working
+    # backwards from the goal instead of forwards from the initial state.
+    # An atom that must become true is relevant with its achievers, an atom
+    # that must become false with the actions deleting it, and the
+    # preconditions of a relevant action are relevant in turn. Achievers are
+    # instantiated by unifying their effect with the atom, parameters left
+    # free are joined over the static facts and then range over their type.
+    # Conditions of conditional effects are relevant both ways, since the
+    # effect may as well undo a relevant atom.
+    #
+    # The relevant actions are then filtered by the same relaxed
+    # reachability as Grounder.ground, so the result is the grounded task
+    # without the actions that no plan needs. Every action of a relaxed plan
+    # is relevant, so reachable tells as before whether the goal can be
+    # reached. Objects that no remaining action or goal mentions are left in
+    # self.irrelevant_objects.
+
+    def __init__(self, objects, types, positive_goals, negative_goals):
+        super().__init__(objects, types)
+        self.positive_goals = positive_goals
+        self.negative_goals = negative_goals
+        self.irrelevant_objects = set()
+
+    # -----------------------------------------------
+    # Ground
+    # -----------------------------------------------
+
+    def ground(self, actions, state, static_facts=None):
+        self.set_statics(actions, state, static_facts)
+        # Joins only narrow free parameters, so every static atom that may hold is indexed
+        self.index = {}
+        for fact in self.state:
+            if fact[0] in self.statics:
+                self.add_to_index(fact)
+        achievers = self.achievers(actions)
+        relevant = set()
+        queue = deque()
+        def require(atoms, value):
+            for atom in sorted(atoms):
+                if atom[0] not in self.statics and (atom, value) not in relevant:
+                    relevant.add((atom, value))
+                    queue.append((atom, value))
+        require(self.positive_goals, True)
+        require(self.negative_goals, False)
+        candidates = []
+        seen = set()
+        while queue:
+            fact, value = queue.popleft()
+            for schema, effect, effect_variables, effect_members in achievers.get((fact[0], value), ()):
+                action, variables, domains, members, preconditions = schema
+                binding = self.unify(effect, fact, {}, effect_variables, effect_members)
+                if binding is None:
+                    continue
+                # Forall variables are expanded with the action
+                binding = {var: binding[var] for var in variables if var in binding}
+                for full in self.join(preconditions, binding, variables, members):
+                    for assignment in self.complete(full, variables, domains):
+                        key = (action.name, assignment)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        act = self.instantiate(action, variables, assignment)
+                        if act is None:
+                            continue
+                        candidates.append(act)
+                        require(act.positive_preconditions, True)
+                        require(act.negative_preconditions, False)
+                        for effect_conditions in act.conditional_effects:
+                            for value in (True, False):
+                                require(effect_conditions[1] | effect_conditions[2], value)
+        ground_actions = self.reachable_actions(candidates, state)
+        used = set()
+        for act in ground_actions:
+            used.update(act.parameters)
+        for atom in self.positive_goals | self.negative_goals:
+            used.update(atom[1:])
+        self.irrelevant_objects = set(obj for objects in self.objects.values() for obj in objects) - used
+        return ground_actions
+
+    def achievers(self, actions):
+        # (predicate, value) -> (schema, effect atom, variables, members) of
+        # every effect that makes an atom of predicate take value
+        achievers = {}
+        for action in actions:
+            schema = self.prepare(action)
+            _, variables, _, members, _ = schema
+            # Only static preconditions can be joined before the action is ground
+            schema = schema[:4] + ([atom for atom in schema[4] if atom[0] in self.statics],)
+            for value, effects in ((True, action.add_effects), (False, action.del_effects)):
+                for effect in effects:
+                    achievers.setdefault((effect[0], value), []).append((schema, effect, variables, members))
+            for parameters, _, _, add, delete in action.conditional_effects:
+                effect_variables = variables + [var for var, _ in parameters]
+                effect_members = members + [frozenset(self.domain(tuple(type) if isinstance(type, list) else type)) for _, type in parameters]
+                for value, effects in ((True, add), (False, delete)):
+                    for effect in effects:
+                        achievers.setdefault((effect[0], value), []).append((schema, effect, effect_variables, effect_members))
+        return achievers
+
+    def reachable_actions(self, candidates, state):
+        # Relaxed reachability from state over candidates, counting for each
+        # action the positive preconditions still missing
+        self.reachable = set(state)
+        missing = []
+        waiting = {}
+        queue = deque()
+        for index, act in enumerate(candidates):
+            atoms = [atom for atom in act.positive_preconditions if atom not in self.reachable]
+            missing.append(len(atoms))
+            for atom in atoms:
+                waiting.setdefault(atom, []).append(index)
+            if not atoms:
+                queue.append(index)
+        reached = set()
+        while queue:
+            index = queue.popleft()
+            reached.add(index)
+            act = candidates[index]
+            for fact in act.add_effects.union(*[effect[3] for effect in act.conditional_effects]):
+                if fact in self.reachable:
+                    continue
+                self.reachable.add(fact)
+                for other in waiting.pop(fact, ()):
+                    missing[other] -= 1
+                    if not missing[other]:
+                        queue.append(other)
+        return [act for index, act in enumerate(candidates) if index in reached]
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    # Compares the relevant task with full grounding
+    import sys, time
+    from .PDDL import PDDL_Parser
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    start_time = time.time()
+    grounder = RelevanceGrounder(parser.objects, parser.types, parser.positive_goals, parser.negative_goals)
+    relevant_actions = grounder.ground(parser.actions, parser.state)
+    print('Relevance time: ' + str(time.time() - start_time) + 's, ' + str(len(relevant_actions)) + ' actions')
+    start_time = time.time()
+    ground_actions = Grounder(parser.objects, parser.types).ground(parser.actions, parser.state)
+    print('Grounded time: ' + str(time.time() - start_time) + 's, ' + str(len(ground_actions)) + ' actions')
+    objects = sum(len(objects) for objects in parser.objects.values())
+    print('Objects: ' + str(objects - len(grounder.irrelevant_objects)) + ' of ' + str(objects))
+    def steps(actions):
+        return set((act.name, tuple(act.parameters)) for act in actions)
+    if not steps(relevant_actions) <= steps(ground_actions):
+        sys.exit('Relevant actions that grounding does not reach')
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+from .search import IteratedWidth
+
+
+class PlanRepair:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Reuses a previous plan after the initial state or the goal changed.
+    # The goal is regressed through the old plan, giving for each suffix the
+    # condition under which that suffix reaches the goal. If the initial
+    # state meets one of them the suffix is the plan, otherwise IW up to
+    # max_width looks for a short bridge into any of them. repair() returns
+    # None when both fail and the caller should search from scratch. The
+    # bridge search is charged to budget if one is given.
+
+    def __init__(self, task, max_width=1, generator=None, budget=None):
+        self.task = task
+        self.max_width = max_width
+        self.generator = generator
+        self.budget = budget
+
+    # -----------------------------------------------
+    # Repair
+    # -----------------------------------------------
+
+    def repair(self, steps):
+        # steps are (name, parameters) pairs, returns action indices or None
+        task = self.task
+        plan = self.indices(steps)
+        subgoals = self.regress(plan)
+        if not subgoals:
+            return None
+        # Prefer the shortest suffix that already works
+        for k, positive, negative in subgoals:
+            if task.init & positive == positive and not task.init & negative:
+                return plan[k:]
+        def is_subgoal(state):
+            return any(state & positive == positive and not state & negative for _, positive, negative in subgoals)
+        search = IteratedWidth(task, 1, self.generator)
+        search.budget = self.budget
+        for width in range(1, self.max_width + 1):
+            result = search.iterated_width(task.init, width, is_subgoal)
+            if result is not None:
+                bridge, state = result
+                for k, positive, negative in subgoals:
+                    if state & positive == positive and not state & negative:
+                        return bridge + plan[k:]
+        return None
+
+    def indices(self, steps):
+        # Steps the new task does not have are None, no suffix may contain them
+        action_index = {}
+        for index, act in enumerate(self.task.actions):
+            action_index[(act.name, tuple(act.parameters))] = index
+        return [action_index.get((name, tuple(parameters))) for name, parameters in steps]
+
+    # -----------------------------------------------
+    # Regress
+    # -----------------------------------------------
+
+    def regress(self, plan):
+        # Returns (k, positive, negative) masks under which plan[k:] reaches
+        # the goal, from the last step backwards. Regression stops at unknown
+        # steps, at conditional effects and when the condition becomes
+        # inconsistent.
+        task = self.task
+        positive = task.goal_pos
+        negative = task.goal_neg
+        subgoals = [(len(plan), positive, negative)]
+        for k in range(len(plan) - 1, -1, -1):
+            index = plan[k]
+            if index is None or task.conditional[index]:
+                break
+            add = task.add_effects[index]
+            # Adds win over deletes of the same atom when applied
+            delete = ~task.del_effects[index] & ~add
+            if positive & delete or negative & add:
+                break
+            positive = positive & ~add | task.pre_pos[index]
+            negative = negative & ~delete | task.pre_neg[index]
+            if positive & negative:
+                break
+            subgoals.append((k, positive, negative))
+        return subgoals
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys, time
+    from .PDDL import PDDL_Parser
+    from .grounding import Grounder
+    from .task import Task
+    from .backend import parse_plan
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    with open(sys.argv[3]) as f:
+        steps = parse_plan(f.read())
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+    start_time = time.time()
+    plan = PlanRepair(task).repair(steps)
+    print('Time: ' + str(time.time() - start_time) + 's')
+    if plan is None:
+        sys.exit('Plan could not be repaired')
+    for index in plan:
+        act = task.actions[index]
+        print(act.name + ' ' + ' '.join(act.parameters))
@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import heapq, itertools
+from array import array
+
+MAX_CANDIDATES = 2000
+
+# -----------------------------------------------
+# Invariant synthesis
+# -----------------------------------------------
+
+# A lifted mutex invariant, in the style of the Fast Downward translator, is
+# a frozenset of (predicate, key positions) parts. Two atoms whose arguments
+# at the key positions are equal fall in the same group, and at most one atom
+# of a group holds in any state reachable from an initial state where at
+# most one holds. Each part leaves at most one argument out of its key.
+
+
+def is_variable(arg):
+    return arg.startswith('?')
+
+
+def key_of(atom, positions):
+    return tuple([atom[1 + position] for position in positions])
+
+
+def could_unify(key, other):
+    # Different variables may be bound to the same object
+    for arg, other_arg in zip(key, other):
+        if arg != other_arg and not is_variable(arg) and not is_variable(other_arg):
+            return False
+    return True
+
+
+def effect_contexts(action):
+    # (adds, deletes, conditions, forall variables) for the main effect and
+    # each conditional effect, whose adds may be balanced by its own or the
+    # action's deletes
+    contexts = [(action.add_effects, action.del_effects, action.positive_preconditions, ())]
+    for parameters, positive, _, add, delete in action.conditional_effects:
+        contexts.append((add, delete | action.del_effects, action.positive_preconditions | positive, tuple([p[0] for p in parameters])))
+    return contexts
+
+
+def synthesize_invariants(actions):
+    # Guess and check: start from every dynamic predicate with one counted
+    # argument (or none), and extend a candidate that fails only because an
+    # add effect is unbalanced with the predicates that action deletes
+    arity = {}
+    for act in actions:
+        for adds, deletes, _, _ in effect_contexts(act):
+            for atom in adds | deletes:
+                arity[atom[0]] = len(atom) - 1
+    queue = []
+    for predicate, n in sorted(arity.items()):
+        queue.append(frozenset([(predicate, tuple(range(n)))]))
+        for counted in range(n):
+            queue.append(frozenset([(predicate, tuple([p for p in range(n) if p != counted]))]))
+    seen = set(queue)
+    invariants = []
+    while queue:
+        candidate = queue.pop(0)
+        extensions = check_invariant(candidate, actions, arity)
+        if extensions is None:
+            # Parts that never leave an argument out say nothing on their own
+            if len(candidate) > 1 or any(len(positions) < arity[predicate] for predicate, positions in candidate):
+                invariants.append(candidate)
+            continue
+        for extension in extensions:
+            if extension not in seen and len(seen) < MAX_CANDIDATES:
+                seen.add(extension)
+                queue.append(extension)
+    return invariants
+
+
+def check_invariant(candidate, actions, arity):
+    # None if every action keeps the invariant, otherwise the candidates
+    # that could fix it (possibly none)
+    parts = dict(candidate)
+    for act in actions:
+        contexts = effect_contexts(act)
+        adds = []
+        for number, (add_effects, _, _, forall) in enumerate(contexts):
+            for atom in add_effects:
+                positions = parts.get(atom[0])
+                if positions is None:
+                    continue
+                key = key_of(atom, positions)
+                # Instances of a forall effect must not share a group
+                if any(arg in forall and arg not in key for arg in atom[1:]):
+                    return []
+                adds.append((atom, key, number))
+        # Two distinct adds that may land in the same group
+        for (atom, key, _), (other, other_key, _) in itertools.combinations(adds, 2):
+            if atom != other and could_unify(key, other_key):
+                return []
+        for atom, key, number in adds:
+            _, deletes, conditions, _ = contexts[number]
+            balanced = False
+            for delete in deletes:
+                positions = parts.get(delete[0])
+                if positions is not None and delete in conditions and key_of(delete, positions) == key:
+                    balanced = True
+                    break
+            if balanced:
+                continue
+            extensions = []
+            for delete in deletes:
+                if delete[0] in parts or delete not in conditions or delete[0] not in arity:
+                    continue
+                if arity[delete[0]] - len(key) > 1:
+                    continue
+                choices = [[p for p in range(arity[delete[0]]) if delete[1 + p] == arg] for arg in key]
+                for positions in itertools.product(*choices):
+                    if len(set(positions)) == len(positions):
+                        extensions.append(candidate | frozenset([(delete[0], positions)]))
+            return extensions
+    return None
+
+
+def mutex_groups(task, invariants):
+    # Grounds every invariant over the task's atoms, giving tuples of atom
+    # ids of which at most one holds in any reachable state
+    parts = {}
+    for number, invariant in enumerate(invariants):
+        for predicate, positions in invariant:
+            parts.setdefault(predicate, []).append((number, positions))
+    groups = {}
+    for index, atom in enumerate(task.atoms):
+        for number, positions in parts.get(atom[0], ()):
+            groups.setdefault((number, key_of(atom, positions)), []).append(index)
+    # An invariant whose groups start with two true atoms does not hold
+    init = set(task.indices(task.init))
+    broken = set(number for (number, _), atoms in groups.items() if len(init.intersection(atoms)) > 1)
+    return [tuple(atoms) for (number, _), atoms in sorted(groups.items()) if number not in broken and len(atoms) > 1]
+
+
+class SASTask:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Finite-domain view of a grounded Task. Every mutex group picked from
+    # the invariants becomes one variable whose values are its atoms, plus
+    # a none value when no atom of the group may hold. Atoms left over are
+    # binary variables. A state is a bytes object with one byte per variable
+    # (two when a domain has more than 256 values).
+    #
+    # Deleting an atom resets its variable to none only if the atom is the
+    # current value, and adds win over deletes as in Task.apply. For the
+    # relaxed heuristics each (variable, value) pair is a fact with an id
+    # in atoms and the actions expose the same *_ids lists as Task.
+
+    def __init__(self, task, invariants):
+        self.actions = task.actions
+        self.variables = self.choose_variables(task, invariants)
+        var_of = {}
+        for var, atoms in enumerate(self.variables):
+            for value, atom in enumerate(atoms):
+                var_of[atom] = (var, value)
+        self.var_of = var_of
+        init = set(task.indices(task.init))
+        needs_none = [not init.intersection(atoms) or len(atoms) == 1 for atoms in self.variables]
+        for index in range(len(task.actions)):
+            assigned = set(var_of[atom][0] for atom in task.add_ids[index])
+            for atom in task.del_ids[index]:
+                needs_none[var_of[atom][0]] |= var_of[atom][0] not in assigned
+            for _, _, add, delete in task.conditional_ids[index]:
+                cond_assigned = assigned | set(var_of[atom][0] for atom in add)
+                for atom in delete:
+                    needs_none[var_of[atom][0]] |= var_of[atom][0] not in cond_assigned
+        self.none = [len(atoms) if needs_none[var] else None for var, atoms in enumerate(self.variables)]
+        self.domains = [len(atoms) + (1 if needs_none[var] else 0) for var, atoms in enumerate(self.variables)]
+        self.typecode = 'B' if max(self.domains, default=1) <= 256 else 'H'
+        # Facts for the relaxed heuristics
+        self.offsets = []
+        self.atoms = []
+        for var, atoms in enumerate(self.variables):
+            self.offsets.append(len(self.atoms))
+            self.atoms += [task.atoms[atom] for atom in atoms]
+            if needs_none[var]:
+                self.atoms.append(('<none>',) + task.atoms[atoms[0]])
+        values = [self.none[var] for var in range(len(self.variables))]
+        for atom in init:
+            var, value = var_of[atom]
+            values[var] = value
+        self.init = array(self.typecode, values).tobytes()
+        self.goal, self.goal_neg = self.conditions(task.goal_pos_ids, task.goal_neg_ids)
+        self.goal_pos_ids = self.fact_ids(self.goal)
+        self.goal_neg_ids = ()
+        # Actions
+        self.pre = []
+        self.pre_neg = []
+        self.effects = []
+        self.clears = []
+        self.conditional = []
+        self.pre_pos_ids = []
+        self.pre_neg_ids = []
+        self.add_ids = []
+        self.conditional_ids = []
+        for index in range(len(task.actions)):
+            pre, pre_neg = self.conditions(task.pre_pos_ids[index], task.pre_neg_ids[index])
+            effects, clears = self.assignments(task.add_ids[index], task.del_ids[index], pre)
+            assigned = set(self.var_of[atom][0] for atom in task.add_ids[index])
+            conditional = []
+            for pos, neg, add, delete in task.conditional_ids[index]:
+                cond_pre, cond_neg = self.conditions(pos, neg)
+                cond_effects, cond_clears = self.assignments(add, delete, pre + cond_pre, assigned)
+                conditional.append((cond_pre, cond_neg, cond_effects, cond_clears))
+            self.pre.append(pre)
+            self.pre_neg.append(pre_neg)
+            self.effects.append(effects)
+            self.clears.append(clears)
+            self.conditional.append(tuple(conditional))
+            self.pre_pos_ids.append(self.fact_ids(pre))
+            self.pre_neg_ids.append(())
+            self.add_ids.append(self.fact_ids(effects) + self.fact_ids([(var, self.none[var]) for var, _ in clears]))
+            self.conditional_ids.append(tuple([(self.fact_ids(cond_pre), (), self.fact_ids(cond_effects) + self.fact_ids([(var, self.none[var]) for var, _ in cond_clears]), ())
+                                               for cond_pre, _, cond_effects, cond_clears in conditional]))
+
+    def choose_variables(self, task, invariants):
+        # Cover the atoms greedily with the largest mutex groups first
+        groups = mutex_groups(task, invariants)
+        covered = set()
+        variables = []
+        heap = [(-len(atoms), number) for number, atoms in enumerate(groups)]
+        heapq.heapify(heap)
+        while heap:
+            size, number = heapq.heappop(heap)
+            atoms = [atom for atom in groups[number] if atom not in covered]
+            if len(atoms) < 2:
+                continue
+            if len(atoms) < -size:
+                heapq.heappush(heap, (-len(atoms), number))
+                continue
+            variables.append(tuple(atoms))
+            covered.update(atoms)
+        variables += [(atom,) for atom in range(len(task.atoms)) if atom not in covered]
+        return variables
+
+    # -----------------------------------------------
+    # Conditions / Effects
+    # -----------------------------------------------
+
+    def conditions(self, positive, negative):
+        # (var, value) pairs that must hold and must not hold, a negated atom
+        # of a binary variable is its none value
+        pairs = [self.var_of[atom] for atom in positive]
+        negated = []
+        for atom in negative:
+            var, value = self.var_of[atom]
+            if len(self.variables[var]) == 1:
+                pairs.append((var, self.none[var]))
+            else:
+                negated.append((var, value))
+        return tuple(sorted(pairs)), tuple(sorted(negated))
+
+    def assignments(self, add, delete, pre, assigned=()):
+        # Adds become assignments, deletes of variables no add assigns (here
+        # or in assigned) become clears: (var, value) reset to none only
+        # while var has that value. A delete required by the conditions
+        # always resets.
+        effects = {}
+        for atom in add:
+            var, value = self.var_of[atom]
+            if effects.get(var, value) != value:
+                raise Exception('Action adds two values of variable ' + str(var))
+            effects[var] = value
+        clears = []
+        for atom in delete:
+            var, value = self.var_of[atom]
+            if var in effects or var in assigned:
+                continue
+            if (var, value) in pre:
+                effects[var] = self.none[var]
+            else:
+                clears.append((var, value))
+        return tuple(sorted(effects.items())), tuple(clears)
+
+    def fact_ids(self, pairs):
+        return tuple([self.offsets[var] + value for var, value in pairs])
+
+    def indices(self, state):
+        offsets = self.offsets
+        return [offsets[var] + value for var, value in enumerate(self.values(state))]
+
+    def values(self, state):
+        if self.typecode == 'B':
+            return state
+        return memoryview(state).cast(self.typecode)
+
+    def unpack(self, state):
+        return frozenset(self.atoms[fact] for fact in self.indices(state) if self.atoms[fact][0] != '<none>')
+
+    def successor_generator(self):
+        return SASSuccessorGenerator(self)
+
+    # -----------------------------------------------
+    # Applicable
+    # -----------------------------------------------
+
+    def applicable(self, state, index):
+        values = self.values(state)
+        return all(values[var] == value for var, value in self.pre[index]) and not any(values[var] == value for var, value in self.pre_neg[index])
+
+    def goal_reached(self, state):
+        values = self.values(state)
+        return all(values[var] == value for var, value in self.goal) and not any(values[var] == value for var, value in self.goal_neg)
+
+    # -----------------------------------------------
+    # Apply
+    # -----------------------------------------------
+
+    def apply(self, state, index):
+        old = self.values(state)
+        new = array(self.typecode)
+        new.frombytes(state)
+        none = self.none
+        effects = self.effects[index]
+        clears = self.clears[index]
+        if self.conditional[index]:
+            # Conditions are evaluated in the state before the action
+            effects = list(effects)
+            clears = list(clears)
+            for pre, pre_neg, cond_effects, cond_clears in self.conditional[index]:
+                if all(old[var] == value for var, value in pre) and not any(old[var] == value for var, value in pre_neg):
+                    effects += cond_effects
+                    clears += cond_clears
+        for var, value in clears:
+            if old[var] == value:
+                new[var] = none[var]
+        for var, value in effects:
+            new[var] = value
+        return new.tobytes()
+
+
+class SASSuccessorGenerator:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Decision tree over variables, as in the Fast Downward successor
+    # generator. A node holds the actions whose conditions are exhausted and
+    # one switch per variable tested next, a tuple of children indexed by
+    # the variable's value. Conditions are ordered so that variables tested
+    # by many actions come first. Negated values are checked per action.
+
+    def __init__(self, task):
+        self.task = task
+        frequency = [0] * len(task.variables)
+        for pre in task.pre:
+            for var, _ in pre:
+                frequency[var] += 1
+        entries = []
+        for index, pre in enumerate(task.pre):
+            entries.append((index, tuple(sorted(pre, key=lambda condition: (-frequency[condition[0]], condition)))))
+        self.root = self.build(entries, 0)
+
+    def build(self, entries, depth):
+        immediate = []
+        switches = {}
+        for index, conditions in entries:
+            if len(conditions) == depth:
+                immediate.append(index)
+            else:
+                var, value = conditions[depth]
+                switches.setdefault(var, {}).setdefault(value, []).append((index, conditions))
+        compiled = []
+        for var, children in sorted(switches.items()):
+            values = [None] * self.task.domains[var]
+            for value, child in children.items():
+                values[value] = self.build(child, depth + 1)
+            compiled.append((var, tuple(values)))
+        return tuple(immediate), tuple(compiled)
+
+    # -----------------------------------------------
+    # Applicable
+    # -----------------------------------------------
+
+    def applicable(self, state):
+        values = self.task.values(state)
+        pre_neg = self.task.pre_neg
+        result = []
+        stack = [self.root]
+        while stack:
+            immediate, switches = stack.pop()
+            for index in immediate:
+                if not pre_neg[index] or not any(values[var] == value for var, value in pre_neg[index]):
+                    result.append(index)
+            for var, children in switches:
+                child = children[values[var]]
+                if child is not None:
+                    stack.append(child)
+        result.sort()
+        return result
+
+    # -----------------------------------------------
+    # Successors
+    # -----------------------------------------------
+
+    def successors(self, state):
+        apply = self.task.apply
+        for index in self.applicable(state):
+            yield index, apply(state, index)
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys, time
+    from .PDDL import PDDL_Parser
+    from .grounding import Grounder
+    from .task import Task
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    start_time = time.time()
+    invariants = synthesize_invariants(parser.actions)
+    print('Invariant synthesis: ' + str(time.time() - start_time) + 's')
+    for invariant in invariants:
+        print('  ' + ' '.join(predicate + str(list(positions)) for predicate, positions in sorted(invariant)))
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+    start_time = time.time()
+    sas = SASTask(task, invariants)
+    print('Translation: ' + str(time.time() - start_time) + 's')
+    print('Atoms: ' + str(len(task.atoms)) + ', state size ' + str((len(task.atoms) + 7) >> 3) + ' bytes')
+    print('Variables: ' + str(len(sas.variables)) + ', multi-valued ' + str(sum(len(atoms) > 1 for atoms in sas.variables)) +
+          ', state size ' + str(len(sas.init)) + ' bytes')
+    generator = SASSuccessorGenerator(sas)
+    applicable = generator.applicable(sas.init)
+    scanned = [index for index in range(len(sas.actions)) if task.applicable(task.init, index)]
+    if applicable != scanned:
+        sys.exit('Finite-domain successor generator disagrees with the task')
+    print('Applicable: ' + str(len(applicable)) + ' of ' + str(len(sas.actions)))
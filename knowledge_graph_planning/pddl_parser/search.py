@@ -0,0 +1,776 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import heapq, itertools
+import numpy as np
+from array import array
+from collections import deque
+from .search_space import SearchSpace
+from .heuristic import HAdd, negated_atoms
+
+
+class Search:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # A search engine runs over a grounded Task and returns a plan as a list
+    # of action indices into task.actions, or None if no plan was found. The
+    # generated nodes are kept in self.space. Engines run one after the other
+    # on the same task can share a successor generator. Expanded,
+    # generated and duplicate (already in the search space) nodes are
+    # counted for PlannerStats. A Budget set as self.budget is charged one
+    # node per expansion and stops the search with LimitReached. A search
+    # that is complete only returns None when the task has no plan.
+
+    complete = True
+
+    def __init__(self, task, generator=None):
+        self.task = task
+        self.generator = generator or task.successor_generator()
+        self.space = SearchSpace()
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.budget = None
+
+    def expand(self):
+        self.expanded += 1
+        if self.budget is not None:
+            self.budget.check()
+
+    def add_counts(self, search):
+        self.expanded += search.expanded
+        self.generated += search.generated
+        self.duplicates += search.duplicates
+
+    def search(self):
+        raise NotImplementedError
+
+
+class BreadthFirstSearch(Search):
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        space = self.space
+        if task.goal_reached(task.init):
+            return []
+        fringe = deque([space.add(task.init)])
+        while fringe:
+            node = fringe.popleft()
+            self.expand()
+            for index, new_state in self.generator.successors(space.states[node]):
+                self.generated += 1
+                if space.lookup(new_state) is None:
+                    new_node = space.add(new_state, node, index)
+                    if task.goal_reached(new_state):
+                        return space.extract_plan(new_node)
+                    fringe.append(new_node)
+                else:
+                    self.duplicates += 1
+        return None
+
+
+class BestFirstSearch(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Priority-queue best-first search. Greedy search orders the open list by
+    # h alone and never reopens states, otherwise the order is g + weight * h
+    # (weight 1 is A*) and states are reopened when reached more cheaply.
+    # Ties are broken by lower h, then first in first out. Dead ends are kept
+    # in the search space with h = -1 so they are evaluated only once. With
+    # a bound, states reached with g >= bound are not generated, so only
+    # plans shorter than bound are found.
+
+    def __init__(self, task, heuristic, weight=1, greedy=False, generator=None):
+        super().__init__(task, generator)
+        self.heuristic = heuristic
+        self.weight = weight
+        self.greedy = greedy
+        self.bound = None
+
+    def priority(self, g, h):
+        if self.greedy:
+            return h
+        return g + self.weight * h
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        space = self.space
+        h = self.heuristic(task.init)
+        if h is None:
+            return None
+        space.add(task.init)
+        g_values = array('i', [0])
+        h_values = array('i', [h])
+        open_list = [(self.priority(0, h), h, 0, 0, 0)]
+        counter = 1
+        while open_list:
+            _, _, _, g, node = heapq.heappop(open_list)
+            if g > g_values[node]:
+                continue
+            state = space.states[node]
+            if task.goal_reached(state):
+                return space.extract_plan(node)
+            self.expand()
+            new_g = g + 1
+            if self.bound is not None and new_g >= self.bound:
+                continue
+            for index, new_state in self.generator.successors(state):
+                self.generated += 1
+                new_node = space.lookup(new_state)
+                if new_node is None:
+                    h = self.heuristic(new_state)
+                    new_node = space.add(new_state, node, index)
+                    g_values.append(new_g)
+                    h_values.append(-1 if h is None else h)
+                    if h is None:
+                        continue
+                else:
+                    self.duplicates += 1
+                    h = h_values[new_node]
+                    if h < 0 or self.greedy or new_g >= g_values[new_node]:
+                        continue
+                    g_values[new_node] = new_g
+                    space.set_parent(new_node, node, index)
+                heapq.heappush(open_list, (self.priority(new_g, h), h, counter, new_g, new_node))
+                counter += 1
+        return None
+
+
+class GreedyBestFirstSearch(BestFirstSearch):
+
+    def __init__(self, task, heuristic, weight=1, generator=None):
+        super().__init__(task, heuristic, greedy=True, generator=generator)
+
+
+class WeightedAStar(BestFirstSearch):
+
+    def __init__(self, task, heuristic, weight=1, generator=None):
+        super().__init__(task, heuristic, weight, generator=generator)
+
+
+class AnytimeSearch(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Restarting weighted A*: greedy best-first search finds a first plan,
+    # then weighted A* runs again with decreasing weights down to weight,
+    # each bounded by the length of the best plan so far. The best plan is
+    # kept in self.best as it improves, so a caller whose budget runs out
+    # still has it.
+
+    WEIGHTS = (5, 3, 2, 1.5)
+
+    def __init__(self, task, heuristic, weight=1, generator=None):
+        super().__init__(task, generator)
+        self.heuristic = heuristic
+        self.weights = [w for w in self.WEIGHTS if w > weight] + [weight]
+        self.best = None
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        self.best = None
+        engines = [GreedyBestFirstSearch(self.task, self.heuristic, generator=self.generator)]
+        engines += [WeightedAStar(self.task, self.heuristic, weight, self.generator) for weight in self.weights]
+        for engine in engines:
+            if self.best is not None:
+                if not self.best:
+                    break
+                engine.bound = len(self.best)
+            engine.budget = self.budget
+            try:
+                plan = engine.search()
+            finally:
+                self.space = engine.space
+                self.add_counts(engine)
+            if plan is None and self.best is None:
+                # Greedy search is complete, there is no plan
+                return None
+            if plan is not None:
+                self.best = plan
+        return self.best
+
+
+class IteratedWidth(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # IW(k) is breadth-first search that prunes every generated state whose
+    # novelty is greater than k. A state has novelty 1 if it makes an atom
+    # true for the first time in the search and novelty 2 if it makes a pair
+    # of atoms true together for the first time. Atoms that appear negated
+    # in the goal or a condition also count as false, numbered after the
+    # task's atoms, so deleting them can be novel. Other deletes never help
+    # reach the goal. Seen atoms are a NumPy boolean array indexed by atom
+    # id. Seen pairs are a bit packed NumPy table with one row per atom
+    # holding every atom it appeared with. Generated goal states are
+    # returned before novelty pruning. Pruning makes IW incomplete.
+
+    complete = False
+
+    def __init__(self, task, width=1, generator=None):
+        super().__init__(task, generator)
+        self.width = width
+        self.state_bytes = (len(task.atoms) + 7) >> 3
+        negated = negated_atoms(task)
+        self.negated = {atom: len(task.atoms) + k for k, atom in enumerate(negated)}
+        self.negated_ids = np.array(negated, dtype=np.intp)
+        self.size = len(task.atoms) + len(negated)
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        if task.goal_reached(task.init):
+            return []
+        result = self.iterated_width(task.init, self.width, task.goal_reached)
+        if result is None:
+            return None
+        return result[0]
+
+    def iterated_width(self, state, width, is_goal):
+        # Returns the plan and the state it reaches, or None
+        space = self.space = SearchSpace()
+        bits = self.features(state)
+        self.seen_atoms = np.zeros(self.size, dtype=bool)
+        self.seen_atoms[self.atoms(bits)] = True
+        if width > 1:
+            self.seen_pairs = np.zeros((self.size, (self.size + 7) >> 3), dtype=np.uint8)
+            self.seen_pairs[self.atoms(bits)] = bits
+        fringe = deque([space.add(state)])
+        while fringe:
+            node = fringe.popleft()
+            parent = space.states[node]
+            self.expand()
+            for index, new_state in self.generator.successors(parent):
+                self.generated += 1
+                if space.lookup(new_state) is not None:
+                    self.duplicates += 1
+                    continue
+                if is_goal(new_state):
+                    return space.extract_plan(space.add(new_state, node, index)), new_state
+                if not self.novel(parent, index, new_state, width):
+                    continue
+                fringe.append(space.add(new_state, node, index))
+        return None
+
+    # -----------------------------------------------
+    # Novelty
+    # -----------------------------------------------
+
+    def bits(self, state):
+        return np.frombuffer(state.to_bytes(self.state_bytes, 'little'), dtype=np.uint8)
+
+    def features(self, state):
+        # The bits of state followed by one bit per negated atom it lacks
+        bits = self.bits(state)
+        if not self.negated:
+            return bits
+        true = np.unpackbits(bits, count=len(self.task.atoms), bitorder='little')
+        return np.packbits(np.concatenate([true, 1 - true[self.negated_ids]]), bitorder='little')
+
+    def atoms(self, bits):
+        return np.flatnonzero(np.unpackbits(bits, bitorder='little'))
+
+    def novel(self, parent, index, state, width):
+        # Atoms and pairs already true in the parent were seen when it was
+        # kept, so a new tuple holds an atom the action made true or false
+        task = self.task
+        if task.conditional[index]:
+            new_atoms = list(task.indices(state & ~parent))
+            deleted = task.indices(parent & ~state) if self.negated else ()
+        else:
+            new_atoms = [atom for atom in task.add_ids[index] if not parent >> atom & 1]
+            deleted = [atom for atom in task.del_ids[index] if parent >> atom & 1 and not state >> atom & 1] if self.negated else ()
+        new_atoms += [self.negated[atom] for atom in deleted if atom in self.negated]
+        if not new_atoms:
+            return False
+        if width == 1:
+            if self.seen_atoms[new_atoms].all():
+                return False
+            self.seen_atoms[new_atoms] = True
+            return True
+        bits = self.features(state)
+        seen_pairs = self.seen_pairs
+        if not (bits & ~seen_pairs[new_atoms]).any():
+            return False
+        # Mark rows of the new atoms and their column in the rows of all atoms
+        seen_pairs[new_atoms] |= bits
+        atoms = self.atoms(bits)
+        for atom in new_atoms:
+            seen_pairs[atoms, atom >> 3] |= 1 << (atom & 7)
+        return True
+
+
+class SerializedIteratedWidth(IteratedWidth):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # SIW splits the goal into one subproblem per goal atom. Each subproblem
+    # is solved with IW(1), then IW(2) up to max_width, and is done when one
+    # more goal literal holds and no goal literal achieved so far is undone.
+
+    def __init__(self, task, max_width=2, generator=None):
+        super().__init__(task, max_width, generator)
+        self.max_width = max_width
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        state = task.init
+        plan = []
+        while not task.goal_reached(state):
+            positive = state & task.goal_pos
+            negative = state & task.goal_neg
+            def progress(new_state):
+                new_positive = new_state & task.goal_pos
+                new_negative = new_state & task.goal_neg
+                if new_positive & positive != positive or new_negative & ~negative:
+                    return False
+                return new_positive != positive or new_negative != negative
+            for width in range(1, self.max_width + 1):
+                result = self.iterated_width(state, width, progress)
+                if result is not None:
+                    break
+            else:
+                return None
+            sub_plan, state = result
+            plan += sub_plan
+        return plan
+
+
+class BestFirstWidthSearch(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # BFS(f) from Lipovetzky and Geffner: greedy best-first search ordered by
+    # novelty, then by the number of unachieved goal literals, then by the
+    # heuristic if one is given. Novelty is 1 if the state has an atom not
+    # seen before in any state with the same number of unachieved goals and
+    # 2 otherwise. States are never pruned by novelty, so the search is
+    # complete.
+
+    def __init__(self, task, heuristic=None, generator=None):
+        super().__init__(task, generator)
+        self.heuristic = heuristic
+
+    def unachieved(self, state):
+        task = self.task
+        return len(task.goal_pos_ids) - bin(state & task.goal_pos).count('1') + bin(state & task.goal_neg).count('1')
+
+    def evaluate(self, state):
+        # Returns (novelty, unachieved goals, h), or None for a dead end
+        h = 0
+        if self.heuristic is not None:
+            h = self.heuristic(state)
+            if h is None:
+                return None
+        goals = self.unachieved(state)
+        seen = self.seen.get(goals, 0)
+        self.seen[goals] = seen | state
+        return (1 if state & ~seen else 2), goals, h
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        space = self.space
+        self.seen = {}
+        priority = self.evaluate(task.init)
+        if priority is None:
+            return None
+        open_list = [priority + (0, space.add(task.init))]
+        counter = 1
+        while open_list:
+            node = heapq.heappop(open_list)[-1]
+            state = space.states[node]
+            if task.goal_reached(state):
+                return space.extract_plan(node)
+            self.expand()
+            for index, new_state in self.generator.successors(state):
+                self.generated += 1
+                if space.lookup(new_state) is not None:
+                    self.duplicates += 1
+                    continue
+                new_node = space.add(new_state, node, index)
+                priority = self.evaluate(new_state)
+                if priority is not None:
+                    heapq.heappush(open_list, priority + (counter, new_node))
+                    counter += 1
+        return None
+
+
+class SIWThenBFSF(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # SIW first, since it solves most problems with single goal atoms in
+    # time linear in the number of atoms, and the complete BFS(f) with h_add
+    # tie breaking when SIW fails. Same strategy as lapkt's siw-then-bfsf.
+
+    def __init__(self, task, heuristic=None, max_width=2, generator=None):
+        super().__init__(task, generator)
+        self.heuristic = heuristic
+        self.max_width = max_width
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        siw = SerializedIteratedWidth(self.task, self.max_width, self.generator)
+        plan = self.run(siw)
+        if plan is not None:
+            return plan
+        if self.heuristic is None:
+            self.heuristic = HAdd(self.task)
+        return self.run(BestFirstWidthSearch(self.task, self.heuristic, self.generator))
+
+    def run(self, engine):
+        # Runs a search on this one's budget and takes over its counts
+        engine.budget = self.budget
+        try:
+            return engine.search()
+        finally:
+            self.space = engine.space
+            self.add_counts(engine)
+
+
+class RegressionSearch(Search):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Breadth-first search backwards from the goal over partial states, a
+    # pair of masks (positive, negative) of atoms that must be true and
+    # false. Regressing through an action that achieves part of the subgoal
+    # without contradicting the rest gives the subgoal under which the
+    # action reaches it. The search ends at a subgoal the initial state
+    # meets. Only atoms the goal mentions are ever looked at, so small goals
+    # in large tasks stay cheap. Subgoals asking for two atoms of one of
+    # the mutex groups (tuples of atom ids, see sas.mutex_groups) can never
+    # be reached and are pruned. A conditional effect that touches the
+    # subgoal is regressed both ways: it fires, and its condition joins the
+    # subgoal, or one literal of its condition fails.
+    #
+    # Subgoals are not compared for subsumption, so on goals of many
+    # literals the backward space grows much faster than the forward one,
+    # it suits goals of a few literals in large tasks.
+
+    def __init__(self, task, generator=None, mutexes=()):
+        super().__init__(task, generator)
+        self.mutex_masks = [[] for _ in task.atoms]
+        for group in mutexes:
+            mask = task.mask(group)
+            for atom in group:
+                self.mutex_masks[atom].append(mask)
+        self.achievers = [[] for _ in task.atoms]
+        self.deleters = [[] for _ in task.atoms]
+        for index in range(len(task.actions)):
+            adds = set(task.add_ids[index])
+            deletes = set(task.del_ids[index])
+            for _, _, add, delete in task.conditional_ids[index]:
+                adds.update(add)
+                deletes.update(delete)
+            for atom in adds:
+                self.achievers[atom].append(index)
+            for atom in deletes:
+                self.deleters[atom].append(index)
+
+    def regress(self, subgoal, index):
+        # Yields the regressed subgoals, none if the action is irrelevant or
+        # inconsistent with the subgoal
+        task = self.task
+        positive, negative = subgoal
+        effect = (task.add_effects[index], ~task.del_effects[index], task.pre_pos[index], task.pre_neg[index])
+        if not task.conditional[index]:
+            new_subgoal = self.regress_effects(subgoal, *effect)
+            if new_subgoal is not None:
+                yield new_subgoal
+            return
+        effects = [[effect]]
+        for pos, neg, add, delete in task.conditional[index]:
+            delete = ~delete
+            if not (add | delete) & (positive | negative):
+                continue
+            # Fires, or one condition literal fails
+            choices = [(add, delete, pos, neg)]
+            choices += [(0, 0, 0, 1 << atom) for atom in task.indices(pos)]
+            choices += [(0, 0, 1 << atom, 0) for atom in task.indices(neg)]
+            effects.append(choices)
+        for choice in itertools.product(*effects):
+            add = delete = pre_pos = pre_neg = 0
+            for effect in choice:
+                add |= effect[0]
+                delete |= effect[1]
+                pre_pos |= effect[2]
+                pre_neg |= effect[3]
+            new_subgoal = self.regress_effects(subgoal, add, delete, pre_pos, pre_neg)
+            if new_subgoal is not None:
+                yield new_subgoal
+
+    def regress_effects(self, subgoal, add, delete, pre_pos, pre_neg):
+        positive, negative = subgoal
+        # Adds win over deletes of the same atom when applied
+        delete &= ~add
+        if not (positive & add or negative & delete) or positive & delete or negative & add:
+            return None
+        positive = positive & ~add | pre_pos
+        negative = negative & ~delete | pre_neg
+        if positive & negative:
+            return None
+        # Preconditions are the only atoms new to the subgoal
+        for atom in self.task.indices(pre_pos):
+            for mask in self.mutex_masks[atom]:
+                common = positive & mask
+                if common & (common - 1):
+                    return None
+        return positive, negative
+
+    def predecessors(self, subgoal):
+        positive, negative = subgoal
+        relevant = set()
+        for atom in self.task.indices(positive):
+            relevant.update(self.achievers[atom])
+        for atom in self.task.indices(negative):
+            relevant.update(self.deleters[atom])
+        for index in sorted(relevant):
+            for new_subgoal in self.regress(subgoal, index):
+                yield index, new_subgoal
+
+    def satisfied(self, state, subgoal):
+        positive, negative = subgoal
+        return state & positive == positive and not state & negative
+
+    # -----------------------------------------------
+    # Search
+    # -----------------------------------------------
+
+    def search(self):
+        task = self.task
+        space = self.space
+        goal = (task.goal_pos, task.goal_neg)
+        if self.satisfied(task.init, goal):
+            return []
+        fringe = deque([space.add(goal)])
+        while fringe:
+            node = fringe.popleft()
+            self.expand()
+            for index, subgoal in self.predecessors(space.states[node]):
+                self.generated += 1
+                if space.lookup(subgoal) is not None:
+                    self.duplicates += 1
+                    continue
+                new_node = space.add(subgoal, node, index)
+                if self.satisfied(task.init, subgoal):
+                    # Regression steps run from the goal backwards
+                    return space.extract_plan(new_node)[::-1]
+                fringe.append(new_node)
+        return None
+
+
+class BidirectionalSearch(RegressionSearch):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Breadth-first search forwards from the initial state and backwards
+    # from the goal, expanding a whole layer of the smaller frontier at a
+    # time. The frontiers meet when a forward state meets a backward
+    # subgoal. Each subgoal is anchored at the positive atom with the
+    # highest id (atoms interned from action effects tend to be rarer than
+    # those of the initial state) and only forward states holding the
+    # anchor are tested against it. For every anchor the forward nodes
+    # holding it are listed, built by one scan of the forward space when
+    # the anchor is first used. A new forward state costs one test per
+    # anchor plus one per subgoal anchored at an atom it holds, a new
+    # subgoal one per forward state holding its anchor. Subgoals without
+    # positive atoms are tested against every forward state.
+
+    def search(self):
+        task = self.task
+        goal = (task.goal_pos, task.goal_neg)
+        if self.satisfied(task.init, goal):
+            return []
+        forward = self.space
+        backward = self.backward_space = SearchSpace()
+        # Anchor mask -> backward nodes anchored there, forward nodes holding it
+        self.anchored = {}
+        self.holding = {}
+        self.unanchored = []
+        forward_fringe = [forward.add(task.init)]
+        backward_fringe = [backward.add(goal)]
+        self.meet_backward(backward_fringe[0])
+        while forward_fringe and backward_fringe:
+            if len(forward_fringe) <= len(backward_fringe):
+                forward_fringe = self.expand_forward(forward_fringe)
+                for node in forward_fringe:
+                    other = self.meet_forward(node)
+                    if other is not None:
+                        return forward.extract_plan(node) + backward.extract_plan(other)[::-1]
+            else:
+                backward_fringe = self.expand_backward(backward_fringe)
+                for other in backward_fringe:
+                    node = self.meet_backward(other)
+                    if node is not None:
+                        return forward.extract_plan(node) + backward.extract_plan(other)[::-1]
+        return None
+
+    def meet_forward(self, node):
+        # Indexes a new forward node, returns a backward node it meets or None
+        state = self.space.states[node]
+        backward = self.backward_space
+        for anchor, others in self.anchored.items():
+            if state & anchor:
+                self.holding[anchor].append(node)
+                for other in others:
+                    if self.satisfied(state, backward.states[other]):
+                        return other
+        for other in self.unanchored:
+            if self.satisfied(state, backward.states[other]):
+                return other
+        return None
+
+    def meet_backward(self, other):
+        # Indexes a new backward node, returns a forward node it meets or None
+        forward = self.space
+        subgoal = self.backward_space.states[other]
+        positive = subgoal[0]
+        if positive:
+            anchor = 1 << (positive.bit_length() - 1)
+            if anchor not in self.anchored:
+                self.anchored[anchor] = []
+                self.holding[anchor] = [node for node in range(len(forward)) if forward.states[node] & anchor]
+            self.anchored[anchor].append(other)
+            nodes = self.holding[anchor]
+        else:
+            self.unanchored.append(other)
+            nodes = range(len(forward))
+        for node in nodes:
+            if self.satisfied(forward.states[node], subgoal):
+                return node
+        return None
+
+    def expand_forward(self, fringe):
+        space = self.space
+        layer = []
+        for node in fringe:
+            self.expand()
+            for index, new_state in self.generator.successors(space.states[node]):
+                self.generated += 1
+                if space.lookup(new_state) is not None:
+                    self.duplicates += 1
+                    continue
+                layer.append(space.add(new_state, node, index))
+        return layer
+
+    def expand_backward(self, fringe):
+        space = self.backward_space
+        layer = []
+        for node in fringe:
+            self.expand()
+            for index, subgoal in self.predecessors(space.states[node]):
+                self.generated += 1
+                if space.lookup(subgoal) is not None:
+                    self.duplicates += 1
+                    continue
+                layer.append(space.add(subgoal, node, index))
+        return layer
+
+
+SEARCHES = {
+    'bfs': BreadthFirstSearch,
+    'gbfs': GreedyBestFirstSearch,
+    'astar': WeightedAStar,
+    'iw': IteratedWidth,
+    'siw': SerializedIteratedWidth,
+    'siw-bfsf': SIWThenBFSF,
+    'anytime': AnytimeSearch,
+    'regression': RegressionSearch,
+    'bidirectional': BidirectionalSearch,
+}
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    # Node counts and times of searches without heuristics on each problem
+    import argparse, time
+    from .PDDL import PDDL_Parser
+    from .grounding import Grounder
+    from .task import Task
+    from .sas import synthesize_invariants, mutex_groups
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('domain')
+    argparser.add_argument('problem', nargs='+')
+    argparser.add_argument('-s', '--search', action='append', choices=['bfs', 'regression', 'bidirectional'], help='search to compare, may be repeated')
+    args = argparser.parse_args()
+    searches = args.search or ['bfs', 'regression', 'bidirectional']
+    print('problem search plan expanded generated time')
+    for problem in args.problem:
+        parser = PDDL_Parser()
+        parser.parse_domain(args.domain)
+        parser.parse_problem(problem)
+        grounder = Grounder(parser.objects, parser.types)
+        ground_actions = grounder.ground(parser.actions, parser.state)
+        task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+        mutexes = mutex_groups(task, synthesize_invariants(parser.actions))
+        for name in searches:
+            start_time = time.time()
+            if name == 'bfs':
+                engine = BreadthFirstSearch(task)
+            else:
+                engine = (RegressionSearch if name == 'regression' else BidirectionalSearch)(task, mutexes=mutexes)
+            plan = engine.search()
+            print(' '.join([problem, name, '-' if plan is None else str(len(plan)), str(engine.expanded), str(engine.generated), '%.3f' % (time.time() - start_time)]))
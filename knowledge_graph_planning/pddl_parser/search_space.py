@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+from array import array
+
+
+class SearchSpace:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Every generated state is stored once and gets an integer node id. The
+    # parent node id and the index of the action that created the node are
+    # kept in typed arrays, so open lists only hold ids and plans are rebuilt
+    # by walking the arrays back to the root (parent -1).
+
+    def __init__(self):
+        self.ids = {}
+        self.states = []
+        self.parents = array('i')
+        self.actions = array('i')
+
+    def __len__(self):
+        return len(self.states)
+
+    # -----------------------------------------------
+    # Nodes
+    # -----------------------------------------------
+
+    def lookup(self, state):
+        return self.ids.get(state)
+
+    def add(self, state, parent=-1, action=-1):
+        node = len(self.states)
+        self.ids[state] = node
+        self.states.append(state)
+        self.parents.append(parent)
+        self.actions.append(action)
+        return node
+
+    def set_parent(self, node, parent, action):
+        self.parents[node] = parent
+        self.actions[node] = action
+
+    # -----------------------------------------------
+    # Extract plan
+    # -----------------------------------------------
+
+    def extract_plan(self, node):
+        plan = []
+        while self.parents[node] != -1:
+            plan.append(self.actions[node])
+            node = self.parents[node]
+        plan.reverse()
+        return plan
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import json, sys, time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss():
+    # Peak resident set size of this process in kilobytes, None where unavailable
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+class PlannerStats:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Measurements of one planner call. Times are in seconds, peak_rss is the
+    # peak of the whole process so far in kilobytes. Phases that did not run
+    # keep a time of 0. status is one of the budget module's statuses.
+    # pruned_objects are the objects of the problem that no grounded action
+    # mentions when grounding keeps only the actions relevant to the goal.
+
+    FIELDS = ('status', 'parse_time', 'grounding_time', 'search_time', 'total_time',
+              'objects', 'pruned_objects', 'atoms', 'actions', 'expanded', 'generated', 'duplicates',
+              'plan_length', 'repaired', 'peak_rss')
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.status = None
+        self.parse_time = 0.0
+        self.grounding_time = 0.0
+        self.search_time = 0.0
+        self.total_time = 0.0
+        self.objects = 0
+        self.pruned_objects = 0
+        self.atoms = 0
+        self.actions = 0
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.plan_length = None
+        self.repaired = False
+        self.peak_rss = None
+
+    @property
+    def nodes_per_second(self):
+        if not self.search_time:
+            return 0.0
+        return self.generated / self.search_time
+
+    def add_search(self, search):
+        self.expanded += search.expanded
+        self.generated += search.generated
+        self.duplicates += search.duplicates
+
+    def finish(self):
+        self.total_time = time.time() - self.start_time
+        self.peak_rss = peak_rss()
+
+    # -----------------------------------------------
+    # Output
+    # -----------------------------------------------
+
+    def as_dict(self):
+        stats = {field: getattr(self, field) for field in self.FIELDS}
+        stats['nodes_per_second'] = self.nodes_per_second
+        return stats
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def __str__(self):
+        return '\n'.join(field + ': ' + str(value) for field, value in self.as_dict().items())
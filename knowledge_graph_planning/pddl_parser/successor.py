@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+
+class SuccessorGenerator:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Decision tree over preconditions, in the spirit of the Fast Downward
+    # successor generator. Each ground action's conditions are sorted so that
+    # atoms shared by many actions are tested first and inserted into a trie.
+    # A node holds the actions whose conditions are exhausted at that node and
+    # its outgoing edges, split into atoms that must be true and atoms that
+    # must be false. Only subtrees whose edge test passes are visited.
+
+    def __init__(self, task):
+        self.task = task
+        frequency = [0] * len(task.atoms)
+        for ids in task.pre_pos_ids:
+            for atom in ids:
+                frequency[atom] += 1
+        for ids in task.pre_neg_ids:
+            for atom in ids:
+                frequency[atom] += 1
+        order = lambda condition: (-frequency[condition[0]], condition)
+        root = ([], {})
+        for index in range(len(task.actions)):
+            conditions = [(atom, True) for atom in task.pre_pos_ids[index]] + [(atom, False) for atom in task.pre_neg_ids[index]]
+            node = root
+            for condition in sorted(conditions, key=order):
+                node = node[1].setdefault(condition, ([], {}))
+            node[0].append(index)
+        # One shared bit per atom, so edges do not each hold a large int
+        self.bits = {}
+        self.root = self.compile(root)
+
+    def compile(self, node):
+        immediate, children = node
+        positive = []
+        negative = []
+        for (atom, value), child in sorted(children.items()):
+            bit = self.bits.get(atom)
+            if bit is None:
+                bit = self.bits[atom] = 1 << atom
+            (positive if value else negative).append((bit, self.compile(child)))
+        return tuple(immediate), tuple(positive), tuple(negative)
+
+    # -----------------------------------------------
+    # Applicable
+    # -----------------------------------------------
+
+    def applicable(self, state):
+        result = []
+        stack = [self.root]
+        while stack:
+            immediate, positive, negative = stack.pop()
+            result += immediate
+            for bit, child in positive:
+                if state & bit:
+                    stack.append(child)
+            for bit, child in negative:
+                if not state & bit:
+                    stack.append(child)
+        result.sort()
+        return result
+
+    # -----------------------------------------------
+    # Successors
+    # -----------------------------------------------
+
+    def successors(self, state):
+        add_effects = self.task.add_effects
+        del_effects = self.task.del_effects
+        conditional = self.task.conditional
+        for index in self.applicable(state):
+            if conditional[index]:
+                yield index, self.task.apply(state, index)
+            else:
+                yield index, state & del_effects[index] | add_effects[index]
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys, time
+    from .PDDL import PDDL_Parser
+    from .grounding import Grounder
+    from .task import Task
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+    start_time = time.time()
+    generator = SuccessorGenerator(task)
+    print('Build time: ' + str(time.time() - start_time) + 's')
+    start_time = time.time()
+    applicable = generator.applicable(task.init)
+    print('Lookup time: ' + str(time.time() - start_time) + 's')
+    start_time = time.time()
+    scanned = [index for index in range(len(task.actions)) if task.applicable(task.init, index)]
+    print('Scan time: ' + str(time.time() - start_time) + 's')
+    if applicable != scanned:
+        sys.exit('Successor generator disagrees with a full scan')
+    print('Applicable: ' + str(len(applicable)) + ' of ' + str(len(task.actions)))
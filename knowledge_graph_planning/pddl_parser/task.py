@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import copy
+from .successor import SuccessorGenerator
+
+
+class Task:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # A grounded task with interned atoms. Every ground atom gets an integer
+    # id and a state is a packed bit vector (a Python int) with bit i set iff
+    # atom i holds. Preconditions and effects of each ground action are
+    # precomputed as masks over that bit vector. Ground conditional effects
+    # are kept per action as (positive, negative, add, del) masks.
+
+    def __init__(self, state, positive_goals, negative_goals, actions):
+        self.actions = list(actions)
+        self.atoms = []
+        self.atom_ids = {}
+        for atom in state:
+            self.intern(atom)
+        for atom in positive_goals | negative_goals:
+            self.intern(atom)
+        for act in self.actions:
+            for group in (act.positive_preconditions, act.negative_preconditions, act.add_effects, act.del_effects):
+                for atom in group:
+                    self.intern(atom)
+            for effect in act.conditional_effects:
+                for group in effect[1:]:
+                    for atom in group:
+                        self.intern(atom)
+        self.setup(self.ids(state), self.ids(positive_goals), self.ids(negative_goals),
+                   [self.ids(act.positive_preconditions) for act in self.actions],
+                   [self.ids(act.negative_preconditions) for act in self.actions],
+                   [self.ids(act.add_effects) for act in self.actions],
+                   [self.ids(act.del_effects) for act in self.actions],
+                   [tuple([tuple([self.ids(group) for group in effect[1:]]) for effect in act.conditional_effects]) for act in self.actions])
+
+    def setup(self, init_ids, goal_pos_ids, goal_neg_ids, pre_pos_ids, pre_neg_ids, add_ids, del_ids, conditional_ids=None):
+        self.set_problem(init_ids, goal_pos_ids, goal_neg_ids)
+        self.pre_pos_ids = pre_pos_ids
+        self.pre_neg_ids = pre_neg_ids
+        self.add_ids = add_ids
+        self.del_ids = del_ids
+        self.pre_pos = [self.mask(ids) for ids in self.pre_pos_ids]
+        self.pre_neg = [self.mask(ids) for ids in self.pre_neg_ids]
+        self.add_effects = [self.mask(ids) for ids in self.add_ids]
+        # Deletes are kept complemented so apply is a single and/or
+        self.del_effects = [~self.mask(ids) for ids in self.del_ids]
+        # Per action a tuple of (pre_pos, pre_neg, add, del) id tuples, one per conditional effect
+        self.conditional_ids = conditional_ids if conditional_ids is not None else [()] * len(self.add_ids)
+        self.conditional = [tuple([(self.mask(pos), self.mask(neg), self.mask(add), ~self.mask(delete)) for pos, neg, add, delete in effects])
+                            for effects in self.conditional_ids]
+
+    def set_problem(self, init_ids, goal_pos_ids, goal_neg_ids):
+        self.init = self.mask(init_ids)
+        self.goal_pos_ids = tuple(goal_pos_ids)
+        self.goal_neg_ids = tuple(goal_neg_ids)
+        self.goal_pos = self.mask(self.goal_pos_ids)
+        self.goal_neg = self.mask(self.goal_neg_ids)
+
+    def with_problem(self, state, positive_goals, negative_goals):
+        # Shallow copy sharing atoms and actions with another initial state
+        # and goal, whose atoms must already be interned
+        task = copy.copy(self)
+        task.set_problem(self.ids(state), self.ids(positive_goals), self.ids(negative_goals))
+        return task
+
+    def intern(self, atom):
+        index = self.atom_ids.get(atom)
+        if index is None:
+            index = self.atom_ids[atom] = len(self.atoms)
+            self.atoms.append(atom)
+        return index
+
+    # -----------------------------------------------
+    # Ids / Masks
+    # -----------------------------------------------
+
+    def ids(self, atoms):
+        return tuple(sorted(self.atom_ids[atom] for atom in atoms))
+
+    def mask(self, ids):
+        state = 0
+        for index in ids:
+            state |= 1 << index
+        return state
+
+    def pack(self, atoms):
+        return self.mask(self.atom_ids[atom] for atom in atoms)
+
+    def unpack(self, state):
+        return frozenset(self.atoms[index] for index in self.indices(state))
+
+    def indices(self, state):
+        # Scanning the binary string finds set bits in C, shifting the int would be quadratic
+        bits = bin(state)[:1:-1]
+        index = bits.find('1')
+        while index >= 0:
+            yield index
+            index = bits.find('1', index + 1)
+
+    def successor_generator(self):
+        return SuccessorGenerator(self)
+
+    # -----------------------------------------------
+    # Applicable
+    # -----------------------------------------------
+
+    def applicable(self, state, index):
+        pre = self.pre_pos[index]
+        return state & pre == pre and not state & self.pre_neg[index]
+
+    def goal_reached(self, state):
+        return state & self.goal_pos == self.goal_pos and not state & self.goal_neg
+
+    # -----------------------------------------------
+    # Apply
+    # -----------------------------------------------
+
+    def apply(self, state, index):
+        if not self.conditional[index]:
+            return state & self.del_effects[index] | self.add_effects[index]
+        # Conditions are evaluated in the state before the action
+        delete = self.del_effects[index]
+        add = self.add_effects[index]
+        for pos, neg, cond_add, cond_delete in self.conditional[index]:
+            if state & pos == pos and not state & neg:
+                delete &= cond_delete
+                add |= cond_add
+        return state & delete | add
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys
+    from .PDDL import PDDL_Parser
+    from .grounding import Grounder
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+    print('Atoms: ' + str(len(task.atoms)))
+    print('Actions: ' + str(len(task.actions)))
+    print('State size: ' + str((len(task.atoms) + 7) >> 3) + ' bytes')
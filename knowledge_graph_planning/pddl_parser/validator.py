@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import itertools
+from .PDDL import PDDL_Parser, DEFAULT_CACHE_DIR
+from .grounding import Grounder
+
+
+def type_name(type):
+    # A parameter type as written in PDDL, either types are lists
+    if isinstance(type, (list, tuple)):
+        return '(' + ' '.join(type) + ')'
+    return type
+
+
+class ValidationResult:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Outcome of executing a plan. failed_step is the index of the first
+    # step that could not be applied, or None if every step was. At that
+    # step missing holds the positive preconditions that were false and
+    # present the negative ones that were true, and error says why a step
+    # could not even be instantiated. If every step applied, missing and
+    # present are the goal literals left unsatisfied. state is the state
+    # after the last applied step.
+
+    def __init__(self, state, goal_reached, failed_step=None, missing=frozenset(), present=frozenset(), error=None):
+        self.state = state
+        self.goal_reached = goal_reached
+        self.failed_step = failed_step
+        self.missing = missing
+        self.present = present
+        self.error = error
+
+    @property
+    def valid(self):
+        return self.failed_step is None and self.goal_reached
+
+    def __repr__(self):
+        if self.failed_step is not None:
+            return 'ValidationResult(step ' + str(self.failed_step) + ' failed)'
+        return 'ValidationResult(' + ('goal reached' if self.goal_reached else 'goal not reached') + ')'
+
+
+class PlanValidator:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Executes plans in memory against lifted actions, without grounding the
+    # task. objects and types are as in PDDL_Parser. Each step is
+    # instantiated from its schema when first seen and kept, and states are
+    # sets of ground atoms updated in place, so a step costs a few
+    # microseconds. Conditional effects follow Planner.apply.
+
+    def __init__(self, actions, objects, types):
+        self.actions = {act.name: act for act in actions}
+        self.grounder = Grounder(objects, types)
+        self.steps = {}
+
+    @classmethod
+    def from_parser(cls, parser):
+        return cls(parser.actions, parser.objects, parser.types)
+
+    # -----------------------------------------------
+    # Instantiate
+    # -----------------------------------------------
+
+    def instantiate(self, name, parameters):
+        # Returns (positive, negative, add, delete, conditional effects) of
+        # the step, raises an Exception if it cannot be built
+        key = (name, tuple(parameters))
+        step = self.steps.get(key)
+        if step is not None:
+            return step
+        act = self.actions.get(name)
+        if act is None:
+            raise Exception('Unknown action ' + name)
+        if len(parameters) != len(act.parameters):
+            raise Exception('Action ' + name + ' takes ' + str(len(act.parameters)) + ' parameters, got ' + str(len(parameters)))
+        mapping = {}
+        for (var, type), value in zip(act.parameters, parameters):
+            if value not in self.grounder.domain(type):
+                raise Exception('Parameter ' + value + ' of ' + name + ' is not of type ' + type_name(type))
+            mapping[var] = value
+        def ground(group, mapping):
+            return frozenset([(atom[0],) + tuple([mapping.get(arg, arg) for arg in atom[1:]]) for atom in group])
+        conditional = []
+        for effect_parameters, positive, negative, add, delete in act.conditional_effects:
+            for values in itertools.product(*[self.grounder.domain(type) for _, type in effect_parameters]):
+                effect_mapping = dict(mapping)
+                effect_mapping.update(zip([var for var, _ in effect_parameters], values))
+                conditional.append(tuple([ground(group, effect_mapping) for group in (positive, negative, add, delete)]))
+        step = self.steps[key] = (ground(act.positive_preconditions, mapping), ground(act.negative_preconditions, mapping),
+                                  ground(act.add_effects, mapping), ground(act.del_effects, mapping), tuple(conditional))
+        return step
+
+    # -----------------------------------------------
+    # Validate
+    # -----------------------------------------------
+
+    def check(self, state, name, parameters):
+        # Returns the (missing, present) preconditions of the step in state
+        positive, negative = self.instantiate(name, parameters)[:2]
+        return positive.difference(state), negative.intersection(state)
+
+    def effects(self, state, name, parameters):
+        # Returns the (add, delete) atoms of the step in state, with those
+        # of the conditional effects that fire
+        _, _, add, delete, conditional = self.instantiate(name, parameters)
+        for cond_positive, cond_negative, cond_add, cond_delete in conditional:
+            if cond_positive.issubset(state) and cond_negative.isdisjoint(state):
+                add = add | cond_add
+                delete = delete | cond_delete
+        return add, delete
+
+    def apply(self, state, name, parameters):
+        # Applies the step to the set state in place, preconditions are not checked
+        add, delete = self.effects(state, name, parameters)
+        state.difference_update(delete)
+        state.update(add)
+
+    def validate(self, steps, state, positive_goals=frozenset(), negative_goals=frozenset()):
+        # steps are (name, parameters) pairs, state any collection of atoms
+        state = set(state)
+        for index, (name, parameters) in enumerate(steps):
+            try:
+                missing, present = self.check(state, name, parameters)
+            except Exception as e:
+                return ValidationResult(frozenset(state), False, index, error=str(e))
+            if missing or present:
+                return ValidationResult(frozenset(state), False, index, missing, present)
+            self.apply(state, name, parameters)
+        missing = frozenset(positive_goals).difference(state)
+        present = frozenset(negative_goals).intersection(state)
+        return ValidationResult(frozenset(state), not missing and not present, missing=missing, present=present)
+
+
+def validate_plan(domain, problem, steps, cache_dir=DEFAULT_CACHE_DIR):
+    # Validates (name, parameters) steps against the problem's initial state and goal
+    parser = PDDL_Parser(cache_dir)
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    return PlanValidator.from_parser(parser).validate(steps, parser.state, parser.positive_goals, parser.negative_goals)
+
+
+def format_validation(result, steps):
+    # Report lines for a ValidationResult of steps
+    def atoms(prefix, group):
+        return ['  ' + prefix + ' (' + ' '.join(atom) + ')' for atom in sorted(group)]
+    if result.failed_step is not None:
+        step = steps[result.failed_step]
+        lines = ['Step ' + str(result.failed_step + 1) + ' (' + ' '.join((step[0],) + tuple(step[1])) + ') failed']
+        if result.error:
+            lines.append('  ' + result.error)
+    elif not result.goal_reached:
+        lines = ['Goal not reached']
+    else:
+        return ['Plan valid']
+    return lines + atoms('missing', result.missing) + atoms('present', result.present)
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import sys, time
+    from .backend import parse_plan
+    domain = sys.argv[1]
+    problem = sys.argv[2]
+    with open(sys.argv[3]) as f:
+        steps = parse_plan(f.read())
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    validator = PlanValidator.from_parser(parser)
+    start_time = time.time()
+    result = validator.validate(steps, parser.state, parser.positive_goals, parser.negative_goals)
+    duration = time.time() - start_time
+    print('Time: ' + str(duration) + 's, ' + str(duration * 1e6 / max(len(steps), 1)) + ' us per step')
+    print('\n'.join(format_validation(result, steps)))
+    if not result.valid:
+        sys.exit(1)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# Four spaces as indentation [no tabs]
+
+# This file is part of PDDL Parser, available at <https://github.com/pucrs-automated-planning/pddl-parser>.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import json, os, queue, select, subprocess, sys, threading, time
+from .PDDL import DEFAULT_CACHE_DIR
+from .backend import PlannerBackend, InProcessBackend, PlanResult, ERROR
+from .budget import LimitReached, TIMEOUT
+
+# Budget limits a request may carry, see budget.Budget
+LIMITS = ('time_limit', 'node_limit', 'memory_limit')
+# Seconds a worker may answer late before the client kills it, the
+# planner only checks its time limit between search nodes
+KILL_GRACE = 10
+
+
+class PlannerWorker:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Long-lived planner process. Requests and responses are JSON objects,
+    # one per line. A request holds the domain and problem file paths and
+    # optionally a search, heuristic, previous plan and time, node and
+    # memory limits; a response holds the request id, status, steps, output,
+    # time and stats. Planners are kept per search configuration, so parsed
+    # domains stay in memory between requests.
+
+    def __init__(self, search='siw-bfsf', heuristic='hadd', cache_dir=DEFAULT_CACHE_DIR):
+        self.search = search
+        self.heuristic = heuristic
+        self.cache_dir = cache_dir
+        self.backends = {}
+        self.requests = 0
+        self.start_time = time.time()
+
+    def backend(self, search, heuristic):
+        key = (search, heuristic)
+        if key not in self.backends:
+            self.backends[key] = InProcessBackend(search, heuristic, self.cache_dir)
+        return self.backends[key]
+
+    # -----------------------------------------------
+    # Handle
+    # -----------------------------------------------
+
+    def handle(self, request):
+        self.requests += 1
+        backend = self.backend(request.get('search', self.search), request.get('heuristic', self.heuristic))
+        warm = len(backend.planner.domains)
+        for limit in LIMITS:
+            setattr(backend, limit, request.get(limit))
+        result = backend.plan(request['domain'], request['problem'], request.get('previous_plan'))
+        stats = dict(result.stats)
+        stats.update({
+            'pid': os.getpid(),
+            'requests': self.requests,
+            'uptime': time.time() - self.start_time,
+            'domain_warm': len(backend.planner.domains) == warm,
+        })
+        return {'id': request.get('id'), 'status': result.status, 'steps': result.steps, 'output': result.output, 'time': result.time, 'stats': stats}
+
+    # -----------------------------------------------
+    # Serve
+    # -----------------------------------------------
+
+    def serve(self, input, output):
+        for line in input:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.handle(request)
+            except Exception as e:
+                response = {'id': None, 'status': ERROR, 'steps': None, 'output': 'Error: ' + str(e), 'time': 0.0, 'stats': {}}
+            output.write(json.dumps(response) + '\n')
+            output.flush()
+
+
+class WorkerProcess:
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Client side of one worker subprocess talking over its stdin and stdout.
+    # A request not answered within timeout seconds raises LimitReached and
+    # leaves the worker to be killed.
+
+    def __init__(self, search, heuristic, cache_dir):
+        command = [sys.executable, '-m', 'pddl_parser.worker', '--search', search, '--heuristic', heuristic]
+        command += ['--no-cache'] if cache_dir is None else ['--cache-dir', cache_dir]
+        env = dict(os.environ)
+        package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_parent, env.get('PYTHONPATH')]))
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True, env=env)
+        self.counter = 0
+
+    def request(self, request, timeout=None):
+        self.counter += 1
+        request = dict(request, id=self.counter)
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+        # The worker writes each response as one line, so once it starts the
+        # rest of the line follows
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise LimitReached(TIMEOUT)
+        line = self.process.stdout.readline()
+        if not line:
+            raise Exception('Planner worker exited with code ' + str(self.process.wait()))
+        response = json.loads(line)
+        if response['id'] != self.counter:
+            raise Exception('Planner worker answered request ' + str(response['id']) + ' instead of ' + str(self.counter))
+        return response
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+
+class WorkerBackend(PlannerBackend):
+
+    # -----------------------------------------------
+    # Initialize
+    # -----------------------------------------------
+
+    # Pool of at most max_workers warm worker processes, started on demand.
+    # plan() is thread safe and blocks while all workers are busy, so
+    # max_workers bounds how many problems are planned at once. A worker
+    # that fails is discarded and replaced by the next call. The limits
+    # are sent with every request. A worker that has not answered
+    # KILL_GRACE seconds after the time limit is killed, and the call
+    # returns TIMEOUT.
+
+    def __init__(self, max_workers=1, search='siw-bfsf', heuristic='hadd', cache_dir=DEFAULT_CACHE_DIR, time_limit=None, node_limit=None, memory_limit=None):
+        self.max_workers = max_workers
+        self.search = search
+        self.heuristic = heuristic
+        self.cache_dir = cache_dir
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.memory_limit = memory_limit
+        self.slots = threading.BoundedSemaphore(max_workers)
+        # Most recently used first, it is the one with the warmest caches
+        self.idle = queue.LifoQueue()
+
+    # -----------------------------------------------
+    # Plan
+    # -----------------------------------------------
+
+    def plan(self, domain, problem, previous_plan=None):
+        start_time = time.time()
+        with self.slots:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                worker = WorkerProcess(self.search, self.heuristic, self.cache_dir)
+            try:
+                request = {'domain': os.path.abspath(domain), 'problem': os.path.abspath(problem)}
+                if previous_plan:
+                    request['previous_plan'] = previous_plan
+                for limit in LIMITS:
+                    if getattr(self, limit) is not None:
+                        request[limit] = getattr(self, limit)
+                timeout = None if self.time_limit is None else self.time_limit + KILL_GRACE
+                response = worker.request(request, timeout)
+            except LimitReached as e:
+                worker.kill()
+                return PlanResult(e.status, output='Planner worker killed after ' + str(timeout) + 's', time=time.time() - start_time)
+            except Exception as e:
+                worker.close()
+                return PlanResult(ERROR, output='Error: ' + str(e), time=time.time() - start_time)
+            self.idle.put(worker)
+        steps = response['steps']
+        if steps is not None:
+            steps = [(name, tuple(parameters)) for name, parameters in steps]
+        stats = dict(response['stats'], round_trip=time.time() - start_time)
+        return PlanResult(response['status'], steps, response['output'], response['time'], stats)
+
+    # -----------------------------------------------
+    # Close
+    # -----------------------------------------------
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# -----------------------------------------------
+# Main
+# -----------------------------------------------
+if __name__ == '__main__':
+    import argparse
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('-s', '--search', default='siw-bfsf')
+    argparser.add_argument('-H', '--heuristic', default='hadd')
+    argparser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    argparser.add_argument('--no-cache', action='store_true', help='do not use the parsed domain cache')
+    args = argparser.parse_args()
+    # Responses go to the real stdout, anything the parser prints goes to stderr
+    output = sys.stdout
+    sys.stdout = sys.stderr
+    PlannerWorker(args.search, args.heuristic, None if args.no_cache else args.cache_dir).serve(sys.stdin, output)
@@ -4,7 +4,6 @@ import sys
 from typing import IO
 from contextlib import redirect_stdout
 import os
-from pathlib import Path
 from difflib import ndiff
 
 from dataset.dataset import Dataset
@@ -15,10 +14,15 @@ from knowledge_representation._libknowledge_rep_wrapper_cpp import LongTermMemor
 
 from knowledge_graph.load_graph import load_graph
 from knowledge_graph.agent import KGAgent
+from pddl_parser.backend import PlannerBackend, InProcessBackend, parse_plan, format_plan
+from pddl_parser.worker import WorkerBackend
+from pddl_parser.validator import validate_plan, format_validation
 from knowledge_graph.utils import reset_database
 
 AGENT_LABEL = "the_agent"
 AGENT_IN_ROOM = "agent_in_room"
+# seconds a single goal may be planned for before it is reported as timed out
+PLAN_TIME_LIMIT = 60
 
 # set API key
 openai_keys_file = os.path.join(os.getcwd(), "keys/openai_keys.txt")
@@ -27,13 +31,12 @@ with open(openai_keys_file, "r") as f:
 keys = keys.strip().split('\n')
 os.environ["OPENAI_API_KEY"] = keys[0]
 
-project_dir = Path(__file__).parent.parent.as_posix()
-
 class KGSim:
-	def __init__(self, dataset: Dataset, agent: KGAgent, log_dir: str) -> None:
+	def __init__(self, dataset: Dataset, agent: KGAgent, log_dir: str, planner: PlannerBackend | None = None) -> None:
 		self.dataset = dataset
 		self.agent = agent
 		self.log_dir = log_dir
+		self.planner = planner if planner is not None else InProcessBackend()
 		self.report: list[Result] = []
 	
 	def run(self):
@@ -80,26 +83,26 @@ class KGSim:
 				print("Generated plan")
 
 				if "true_plan_pddl" in time_step:
-					true_plan = time_step["true_plan_pddl"].splitlines()
+					true_plan = format_plan(parse_plan(time_step["true_plan_pddl"]))
 				else:
-					plan_file = "true_plan.pddl"
-					os.system(f"sudo docker run --rm -v {project_dir}:/root/experiments lapkt/lapkt-public ./siw-then-bfsf " + \
-						f"--domain /root/experiments/{self.dataset.domain_path} " + \
-						f"--problem /root/experiments/{time_step['problem_path']} " + \
-						f"--output /root/experiments/{plan_file} " + \
-						f"> /dev/null")
-					with open(os.path.join(project_dir, plan_file), "r") as f:
-						true_plan = f.read().splitlines()
-					os.remove(os.path.join(project_dir, plan_file))
+					true_plan = self.planner.plan(self.dataset.domain_path, time_step["problem_path"]).lines()
 				
-				if true_plan != predicted_plan:
-					print("Conflicting expected plan and predicted plan")
-					self.report.append(Result(time_step["time"], "plan", time_step["type"], False))
-					with open(os.path.join(self.log_dir, f"{time_step['time']:04d}_plan.diff"), "w") as f:
-						f.write("\n".join(ndiff(true_plan, predicted_plan)))
-				else:
+				if true_plan == predicted_plan:
 					print("Plan is correct")
 					self.report.append(Result(time_step["time"], "plan", time_step["type"], True))
+				else:
+					# a different plan is still correct if it reaches the goal in the true problem
+					predicted_steps = parse_plan("\n".join(predicted_plan))
+					validation = validate_plan(self.dataset.domain_path, time_step["problem_path"], predicted_steps)
+					if validation.valid:
+						print("Predicted plan differs from expected plan but is valid")
+						self.report.append(Result(time_step["time"], "plan", time_step["type"], True))
+					else:
+						print("Conflicting expected plan and predicted plan")
+						self.report.append(Result(time_step["time"], "plan", time_step["type"], False))
+					with open(os.path.join(self.log_dir, f"{time_step['time']:04d}_plan.diff"), "w") as f:
+						f.write("\n".join(ndiff(true_plan, predicted_plan)))
+						f.write("\n\n" + "\n".join(format_validation(validation, predicted_steps)))
 			else:
 				continue
 
@@ -203,14 +206,18 @@ if __name__ == "__main__":
 
 	def cleanup(exit: bool = False):
 		sim.close()
+		planner.close()
 		log.close()
 		if exit:
 			sys.exit(0)
 	
 	signal.signal(signal.SIGINT, lambda sig, frame: cleanup(True))
 	
+	# one warm planner worker shared by the agent and the reference plans
+	planner = WorkerBackend(max_workers=1, time_limit=PLAN_TIME_LIMIT)
+
 	with redirect_stdout(log):
-		sim = KGSim(Dataset(domain_path), KGAgent(run_dir, True, True, AGENT_LABEL), run_dir)
+		sim = KGSim(Dataset(domain_path), KGAgent(run_dir, True, True, AGENT_LABEL, planner=planner), run_dir, planner)
 		try:
 			sim.run()
 		finally:
@@ -0,0 +1,100 @@
+# Four spaces as indentation [no tabs]
+
+import os, sys
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# pddl_parser lives in knowledge_graph_planning, the dataset package in the repository root
+for path in (os.path.dirname(os.path.dirname(TESTS_DIR)), os.path.dirname(TESTS_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+PDDL_DIR = os.path.join(TESTS_DIR, 'pddl')
+# Toy problems as (domain directory, problem file): a negative goal, a
+# household, forall/when effects, a when effect behind a negative
+# precondition and an either typed parameter
+TOY_PROBLEMS = {
+    'dinner': ('dinner', 'problem'),
+    'house': ('house', 'problem'),
+    'laundry': ('laundry', 'problem'),
+    'corridor': ('corridor', 'problem'),
+    'kitchen': ('kitchen', 'problem'),
+}
+# Generated by dataset.benchmark at the small scale, one problem per goal kind
+GENERATED_PROBLEMS = ('room_00', 'collective_00', 'movable_00')
+PROBLEMS = sorted(TOY_PROBLEMS) + list(GENERATED_PROBLEMS)
+TIME_LIMIT = 60
+
+bfs_lengths = {}
+
+
+def toy_files(domain, problem):
+    return os.path.join(PDDL_DIR, domain, 'domain.pddl'), os.path.join(PDDL_DIR, domain, problem + '.pddl')
+
+
+def solve(files, search, heuristic='hff', **options):
+    # Returns the status and plan of a fresh planner without a domain cache
+    from pddl_parser.planner import Planner
+    from pddl_parser.budget import Budget
+    planner = Planner(search, heuristic, cache_dir=None, **options)
+    plan = planner.solve(*files, budget=Budget(TIME_LIMIT))
+    return planner.stats.status, plan
+
+
+def steps(plan):
+    return [(act.name, act.parameters) for act in plan]
+
+
+def assert_valid(files, plan):
+    from pddl_parser.validator import validate_plan
+    result = validate_plan(*files, steps(plan), cache_dir=None)
+    assert result.valid, result
+
+
+def bfs_length(files):
+    # Length of the optimal plan, found once per problem by BFS
+    from pddl_parser.budget import SOLVED
+    if files not in bfs_lengths:
+        status, plan = solve(files, 'bfs')
+        assert status == SOLVED
+        assert_valid(files, plan)
+        bfs_lengths[files] = len(plan)
+    return bfs_lengths[files]
+
+
+def ground_task(files):
+    # Parser and fully grounded Task of a problem, static facts left out
+    from pddl_parser.PDDL import PDDL_Parser
+    from pddl_parser.grounding import Grounder
+    from pddl_parser.task import Task
+    parser = PDDL_Parser()
+    parser.parse_domain(files[0])
+    parser.parse_problem(files[1])
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    return parser, Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, ground_actions)
+
+
+def config_id(config):
+    search, heuristic, options = config
+    return ':'.join([search, heuristic] + [key + '=' + str(value) for key, value in sorted(options.items())])
+
+
+@pytest.fixture(scope='session')
+def generated_dir(tmp_path_factory):
+    from dataset.benchmark import generate_problems
+    directory = str(tmp_path_factory.mktemp('generated'))
+    generate_problems('small', 0, 1, directory)
+    return directory
+
+
+@pytest.fixture
+def problem_files(request, generated_dir):
+    # Parametrized with a name of TOY_PROBLEMS or GENERATED_PROBLEMS
+    name = request.param
+    if name in TOY_PROBLEMS:
+        return toy_files(*TOY_PROBLEMS[name])
+    problem = os.path.join(generated_dir, name + '.pddl')
+    if not os.path.exists(problem):
+        pytest.skip('no ' + name + ' goal was generated')
+    return os.path.join(generated_dir, 'domain.pddl'), problem
@@ -0,0 +1,56 @@
+# Four spaces as indentation [no tabs]
+
+from conftest import toy_files
+from pddl_parser.backend import InProcessBackend, PlanResult, parse_plan, format_plan, ERROR
+from pddl_parser.budget import SOLVED, UNSOLVABLE, FAILED
+from pddl_parser.validator import validate_plan
+
+
+# -----------------------------------------------
+# Plan format
+# -----------------------------------------------
+
+def test_parse_plan_skips_comments_and_blank_lines():
+    text = '(MOVE robot a b)\n\n; cost = 2 (unit cost)\n(pick robot ball a) ; trailing\n'
+    assert parse_plan(text) == [('move', ('robot', 'a', 'b')), ('pick', ('robot', 'ball', 'a'))]
+
+
+def test_format_plan_round_trips():
+    steps = [('move', ('robot', 'a', 'b')), ('wait', ())]
+    assert format_plan(steps) == ['(move robot a b)', '(wait)']
+    assert parse_plan('\n'.join(format_plan(steps))) == steps
+    assert PlanResult(SOLVED, steps).lines() == format_plan(steps)
+
+
+# -----------------------------------------------
+# In process
+# -----------------------------------------------
+
+def test_in_process_solves():
+    files = toy_files('dinner', 'problem')
+    result = InProcessBackend(cache_dir=None).plan(*files)
+    assert result.solved
+    assert result.status == SOLVED
+    assert result.stats['plan_length'] == len(result.steps)
+    assert validate_plan(*files, result.steps, cache_dir=None).valid
+
+
+def test_in_process_reports_unsolvable():
+    result = InProcessBackend('bfs', cache_dir=None).plan(*toy_files('dinner', 'unsolvable'))
+    assert result.status == UNSOLVABLE
+    assert result.steps is None
+    assert result.output == 'The problem has no plan'
+
+
+def test_in_process_reports_failed():
+    # IW(1) gives up on the unsolvable problem without proving it
+    result = InProcessBackend('iw', cache_dir=None).plan(*toy_files('dinner', 'unsolvable'))
+    assert result.status == FAILED
+    assert result.output == 'No plan was found'
+
+
+def test_in_process_reports_errors():
+    result = InProcessBackend(cache_dir=None).plan(toy_files('dinner', 'problem')[0], 'missing.pddl')
+    assert result.status == ERROR
+    assert not result.solved
+    assert result.output.startswith('Error: ')
@@ -0,0 +1,36 @@
+# Four spaces as indentation [no tabs]
+
+import multiprocessing, time
+import pytest
+from dataset.benchmark import run_benchmark, run_in_process, unfinished_stats
+from pddl_parser.budget import SOLVED, TIMEOUT
+from pddl_parser.backend import ERROR
+
+
+def test_broken_configuration_keeps_the_other_runs(tmp_path):
+    results = run_benchmark(['small'], ['bogus:hff', 'gbfs:hff'], 0, 1, 20, str(tmp_path))
+    runs = results['runs']
+    assert runs
+    for run in runs:
+        if run['configuration'] == 'bogus:hff':
+            assert run['status'] == ERROR
+            assert 'bogus' in run['error']
+        else:
+            assert run['status'] == SOLVED
+            assert 'error' not in run
+    assert len(runs) == 2 * len(set(run['problem'] for run in runs))
+
+
+def test_stuck_process_is_killed():
+    context = multiprocessing.get_context('spawn')
+    start_time = time.time()
+    with pytest.raises(multiprocessing.TimeoutError):
+        run_in_process(context, 0.5, time.sleep, 30)
+    assert time.time() - start_time < 10
+
+
+def test_unfinished_stats():
+    stats = unfinished_stats(TIMEOUT, 12.5)
+    assert stats['status'] == TIMEOUT
+    assert stats['total_time'] == 12.5
+    assert stats['plan_length'] is None
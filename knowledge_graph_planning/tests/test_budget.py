@@ -0,0 +1,108 @@
+# Four spaces as indentation [no tabs]
+
+import time
+import pytest
+from conftest import PROBLEMS, toy_files, solve, steps, assert_valid, bfs_length
+from pddl_parser.planner import Planner
+from pddl_parser.budget import Budget, CancellationToken, LimitReached, SOLVED, UNSOLVABLE, TIMEOUT, NODE_LIMIT, MEMORY_OUT, CANCELLED
+
+HOUSE = toy_files('house', 'problem')
+
+
+def stopped(budget, nodes=1):
+    # Status of the LimitReached that check raises, None if it passes
+    try:
+        budget.check(nodes)
+    except LimitReached as e:
+        return e.status
+    return None
+
+
+# -----------------------------------------------
+# Budget
+# -----------------------------------------------
+
+def test_node_limit():
+    budget = Budget(node_limit=2)
+    assert stopped(budget) is None
+    assert stopped(budget) is None
+    assert stopped(budget) == NODE_LIMIT
+
+
+def test_time_limit():
+    budget = Budget(0.01)
+    assert 0 < budget.remaining <= 0.01
+    assert stopped(budget, 0) is None
+    time.sleep(0.02)
+    assert budget.remaining == 0.0
+    assert stopped(budget, 0) == TIMEOUT
+    assert Budget().remaining is None
+
+
+def test_memory_limit():
+    # Between phases memory is always read, a kilobyte is never enough
+    assert stopped(Budget(memory_limit=1), 0) == MEMORY_OUT
+    assert stopped(Budget(memory_limit=1), 1) is None
+
+
+def test_cancellation_token():
+    token = CancellationToken()
+    budget = Budget(token=token)
+    assert stopped(budget) is None
+    token.cancel()
+    assert token.cancelled
+    assert stopped(budget) == CANCELLED
+
+
+# -----------------------------------------------
+# Planner
+# -----------------------------------------------
+
+@pytest.mark.parametrize('budget, status', [
+    (lambda: Budget(node_limit=1), NODE_LIMIT),
+    (lambda: Budget(memory_limit=1), MEMORY_OUT),
+])
+def test_planner_stops_at_the_limit(budget, status):
+    planner = Planner('bfs', cache_dir=None)
+    assert planner.solve(*HOUSE, budget=budget()) is None
+    assert planner.stats.status == status
+
+
+def test_planner_is_cancelled_between_phases():
+    # The token is cancelled once grounding ends, the search stops at its
+    # first expansion
+    token = CancellationToken()
+    planner = Planner('bfs', cache_dir=None, hooks=[lambda phase, stats: phase == 'grounding' and token.cancel()])
+    assert planner.solve(*HOUSE, budget=Budget(token=token)) is None
+    assert planner.stats.status == CANCELLED
+    assert planner.stats.expanded == 0
+
+
+# -----------------------------------------------
+# Anytime
+# -----------------------------------------------
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_anytime_search(problem_files):
+    status, plan = solve(problem_files, 'anytime', 'hff', weight=3)
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) >= bfs_length(problem_files)
+
+
+def test_anytime_proves_unsolvable():
+    status, plan = solve(toy_files('dinner', 'unsolvable'), 'anytime', 'hff', weight=3)
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+def test_anytime_keeps_its_best_plan():
+    # Enough nodes for the greedy first plan but not for the restarts
+    greedy = Planner('gbfs', cache_dir=None)
+    first = greedy.solve(*HOUSE)
+    planner = Planner('anytime', cache_dir=None)
+    plan = planner.solve(*HOUSE, budget=Budget(node_limit=greedy.stats.expanded + 1))
+    assert planner.stats.status == SOLVED
+    assert steps(plan) == steps(first)
+    assert_valid(HOUSE, plan)
+    assert planner.stats.expanded > greedy.stats.expanded
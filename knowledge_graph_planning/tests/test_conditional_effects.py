@@ -0,0 +1,65 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import toy_files, solve, steps, assert_valid, ground_task
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.planner import Planner
+from pddl_parser.budget import SOLVED
+
+
+def ground_action(task, name, parameters):
+    return next(act for act in task.actions if act.name == name and act.parameters == parameters)
+
+
+# -----------------------------------------------
+# Parse and ground
+# -----------------------------------------------
+
+def test_parse_forall_when():
+    parser = PDDL_Parser()
+    parser.parse_domain(toy_files('laundry', 'problem')[0])
+    run = next(act for act in parser.actions if act.name == 'run')
+    assert not run.add_effects and not run.del_effects
+    assert run.conditional_effects == (
+        ((('?c', 'cloth'),), frozenset([('placed', '?c', '?w')]), frozenset(),
+         frozenset([('clean', '?c')]), frozenset([('dry', '?c'), ('dirty', '?c')])),
+    )
+
+
+def test_ground_forall_over_objects():
+    # One plain when effect per cloth, its variables replaced
+    _, task = ground_task(toy_files('laundry', 'problem'))
+    run = ground_action(task, 'run', ('w', 'r', 'me'))
+    assert sorted(run.conditional_effects) == [
+        ((), frozenset([('placed', cloth, 'w')]), frozenset(), frozenset([('clean', cloth)]), frozenset([('dry', cloth), ('dirty', cloth)]))
+        for cloth in ('s1', 's2', 's3')
+    ]
+
+
+# -----------------------------------------------
+# Apply
+# -----------------------------------------------
+
+def test_conditions_read_the_old_state():
+    # Only the cloth placed before running is cleaned, in sets and in masks
+    parser, task = ground_task(toy_files('laundry', 'problem'))
+    run = ground_action(task, 'run', ('w', 'r', 'me'))
+    state = Planner().apply(parser.state, run.add_effects, run.del_effects, run.conditional_effects)
+    assert ('clean', 's2') in state and ('dirty', 's2') not in state and ('dry', 's2') not in state
+    assert ('clean', 's1') not in state and ('dirty', 's1') in state
+    index = task.actions.index(run)
+    # The task leaves static facts out of its states
+    assert set(task.unpack(task.apply(task.init, index))) == state.intersection(task.atom_ids)
+
+
+@pytest.mark.parametrize('domain, plan', [
+    ('laundry', [('place', ('s1', 'w', 'me', 'r')), ('run', ('w', 'r', 'me'))]),
+    ('corridor', [('move', ('a', 'c')), ('move', ('c', 'd'))]),
+])
+def test_plans_through_conditional_effects(domain, plan):
+    # Both goals are only reached through when effects
+    files = toy_files(domain, 'problem')
+    status, found = solve(files, 'bfs')
+    assert status == SOLVED
+    assert_valid(files, found)
+    assert steps(found) == plan
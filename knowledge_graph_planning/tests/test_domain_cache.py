@@ -0,0 +1,59 @@
+# Four spaces as indentation [no tabs]
+
+import os, pickle
+import pytest
+from conftest import toy_files
+from pddl_parser.PDDL import PDDL_Parser
+
+DOMAIN, PROBLEM = toy_files('house', 'problem')
+
+
+def parse(cache_dir, domain=DOMAIN):
+    parser = PDDL_Parser(cache_dir)
+    parser.parse_domain(domain)
+    return parser
+
+
+def cache_files(cache_dir):
+    return [name for name in os.listdir(cache_dir) if name.endswith('.pickle')]
+
+
+def domain_fields(parser):
+    return {field: getattr(parser, field) for field in PDDL_Parser.DOMAIN_FIELDS}
+
+
+def test_second_parse_reads_the_cache(tmp_path, monkeypatch):
+    expected = domain_fields(parse(str(tmp_path)))
+    assert len(cache_files(str(tmp_path))) == 1
+    # A cache hit never tokenizes the file
+    def scan(*args):
+        raise AssertionError('domain parsed again')
+    monkeypatch.setattr(PDDL_Parser, 'scan_string', scan)
+    assert domain_fields(parse(str(tmp_path))) == expected
+
+
+def test_changed_domain_gets_a_new_entry(tmp_path):
+    parse(str(tmp_path))
+    changed = tmp_path / 'domain.pddl'
+    with open(DOMAIN) as f:
+        changed.write_text(f.read() + '\n; changed\n')
+    parse(str(tmp_path), str(changed))
+    assert len(cache_files(str(tmp_path))) == 2
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'\x80\x05truncated',
+    pickle.dumps({'domain_name': 'house'}),
+    pickle.dumps(['not', 'a', 'dict']),
+], ids=['empty', 'truncated', 'missing-fields', 'wrong-type'])
+def test_broken_entry_is_a_miss(tmp_path, content):
+    expected = domain_fields(parse(str(tmp_path)))
+    cache_file = os.path.join(str(tmp_path), cache_files(str(tmp_path))[0])
+    with open(cache_file, 'wb') as f:
+        f.write(content)
+    assert domain_fields(parse(str(tmp_path))) == expected
+    # The entry is written again
+    with open(cache_file, 'rb') as f:
+        assert pickle.load(f)['domain_name'] == expected['domain_name']
+
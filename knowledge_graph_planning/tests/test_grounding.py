@@ -0,0 +1,82 @@
+# Four spaces as indentation [no tabs]
+
+import itertools
+import pytest
+from conftest import TOY_PROBLEMS, toy_files
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.grounding import Grounder
+from pddl_parser.task import Task
+from test_task import reachable_states
+
+# Toy problems whose whole state space is small enough to enumerate
+SMALL_PROBLEMS = ['corridor', 'dinner', 'kitchen', 'laundry']
+
+
+def parse(name):
+    domain, problem = toy_files(*TOY_PROBLEMS[name])
+    parser = PDDL_Parser()
+    parser.parse_domain(domain)
+    parser.parse_problem(problem)
+    return parser
+
+
+def product_ground(grounder, actions):
+    # Every typed assignment of the parameters, as Action.groundify did
+    for action in actions:
+        variables = [var for var, _ in action.parameters]
+        domains = [grounder.domain(type) for _, type in action.parameters]
+        for assignment in itertools.product(*domains):
+            act = grounder.instantiate(action, variables, assignment)
+            if act is not None:
+                yield act
+
+
+def keys(actions):
+    return set((act.name, tuple(act.parameters)) for act in actions)
+
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_reachability_matches_product(name):
+    # Exactly the product actions whose preconditions are relaxed reachable
+    parser = parse(name)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    assert len(keys(ground_actions)) == len(ground_actions)
+    product = [act for act in product_ground(grounder, parser.actions) if act.positive_preconditions <= grounder.reachable]
+    assert keys(ground_actions) == keys(product)
+
+
+@pytest.mark.parametrize('name', ['corridor', 'laundry'])
+def test_unreachable_actions_are_dropped(name):
+    parser = parse(name)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    assert len(ground_actions) < len(list(product_ground(grounder, parser.actions)))
+
+
+@pytest.mark.parametrize('name', SMALL_PROBLEMS)
+def test_same_state_space_as_product(name):
+    parser = parse(name)
+    grounder = Grounder(parser.objects, parser.types)
+    ground_actions = grounder.ground(parser.actions, parser.state)
+    product = list(product_ground(grounder, parser.actions))
+    spaces = []
+    for actions in (ground_actions, product):
+        task = Task(grounder.dynamic(parser.state), grounder.dynamic(parser.positive_goals), parser.negative_goals, actions)
+        spaces.append(set(task.unpack(state) for state in reachable_states(task)))
+    assert spaces[0] == spaces[1]
+
+
+def test_either_typed_parameters():
+    # A parameter of type (either a b) ranges over the objects of both
+    parser = parse('kitchen')
+    grounder = Grounder(parser.objects, parser.types)
+    for action in parser.actions:
+        for _, type in action.parameters:
+            if isinstance(type, list):
+                expected = set()
+                for member in type[1:]:
+                    expected.update(grounder.domain(member))
+                assert set(grounder.domain(type)) == expected
+                return
+    pytest.fail('kitchen has no either typed parameter')
@@ -0,0 +1,93 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import PROBLEMS, TOY_PROBLEMS, solve, assert_valid, bfs_length, toy_files, ground_task, config_id
+from pddl_parser.heuristic import HEURISTICS, HMax, HAdd, HFF
+from pddl_parser.budget import SOLVED, UNSOLVABLE
+from test_task import reachable_states
+
+# (search, heuristic, Planner keywords), optimal ones must match the BFS plan length
+OPTIMAL = [
+    ('astar', 'hmax', {}),
+]
+CONFIGURATIONS = OPTIMAL + [
+    ('gbfs', 'hff', {}),
+    ('gbfs', 'hadd', {}),
+    ('astar', 'hff', {}),
+]
+
+
+# -----------------------------------------------
+# Engines against BFS
+# -----------------------------------------------
+
+@pytest.mark.parametrize('config', CONFIGURATIONS, ids=config_id)
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_heuristic_search(problem_files, config):
+    search, heuristic, options = config
+    status, plan = solve(problem_files, search, heuristic, **options)
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    if config in OPTIMAL:
+        assert len(plan) == bfs_length(problem_files)
+    else:
+        assert len(plan) >= bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('config', CONFIGURATIONS, ids=config_id)
+def test_heuristic_search_proves_unsolvable(config):
+    search, heuristic, options = config
+    status, plan = solve(toy_files('dinner', 'unsolvable'), search, heuristic, **options)
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+# -----------------------------------------------
+# Heuristics
+# -----------------------------------------------
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_heuristics_are_ordered(name):
+    # h_max <= h_FF <= h_add on every state, and h_max never overestimates
+    # the plan from the initial state
+    _, task = ground_task(toy_files(*TOY_PROBLEMS[name]))
+    hmax, hadd, hff = HMax(task), HAdd(task), HFF(task)
+    for state in reachable_states(task):
+        values = hmax(state), hff(state), hadd(state)
+        if values[0] is None:
+            assert values == (None, None, None)
+        else:
+            assert values[0] <= values[1] <= values[2]
+    assert hmax(task.init) <= bfs_length(toy_files(*TOY_PROBLEMS[name]))
+
+
+@pytest.mark.parametrize('heuristic', sorted(HEURISTICS))
+def test_goal_states_are_zero(heuristic):
+    _, task = ground_task(toy_files('dinner', 'problem'))
+    assert HEURISTICS[heuristic](task)(task.mask(task.goal_pos_ids)) == 0
+
+
+@pytest.mark.parametrize('heuristic', sorted(HEURISTICS))
+def test_negative_goals_count(heuristic):
+    # Only (not (garbage)) is left to achieve
+    _, task = ground_task(toy_files('dinner', 'problem'))
+    assert HEURISTICS[heuristic](task)(task.mask(task.goal_pos_ids) | task.goal_neg) == 1
+
+
+@pytest.mark.parametrize('heuristic', sorted(HEURISTICS))
+def test_dead_ends_are_none(heuristic):
+    # Nothing adds (clean), which cooking dinner needs
+    _, task = ground_task(toy_files('dinner', 'problem'))
+    assert HEURISTICS[heuristic](task)(0) is None
+
+
+def test_relaxed_plan_reaches_the_goal():
+    # Applying the relaxed plan without deletes from the initial state reaches the goal
+    _, task = ground_task(toy_files('house', 'problem'))
+    plan = HFF(task).relaxed_plan(task.init)
+    state = task.init
+    for _ in plan:
+        for index in plan:
+            if state & task.pre_pos[index] == task.pre_pos[index]:
+                state |= task.add_effects[index]
+    assert state & task.goal_pos == task.goal_pos
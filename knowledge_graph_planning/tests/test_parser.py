@@ -0,0 +1,63 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import TOY_PROBLEMS, toy_files
+from pddl_parser.PDDL import PDDL_Parser
+
+
+def parse_files(files):
+    parser = PDDL_Parser()
+    parser.parse_domain(files[0])
+    parser.parse_problem(files[1])
+    return parser
+
+
+def parse_strings(files):
+    parser = PDDL_Parser()
+    with open(files[0]) as f:
+        parser.parse_domain_string(f.read())
+    with open(files[1]) as f:
+        parser.parse_problem_string(f.read())
+    return parser
+
+
+# -----------------------------------------------
+# Tokens
+# -----------------------------------------------
+
+def test_tokenize_nests_lowercases_and_cuts_comments():
+    parser = PDDL_Parser()
+    text = '(define ; a comment (with parentheses\n  (Domain Test)(:predicates (on ?x)));trailing'
+    assert parser.scan_string(text) == ['define', ['domain', 'test'], [':predicates', ['on', '?x']]]
+
+
+def test_tokenize_splits_adjacent_parentheses():
+    assert PDDL_Parser().scan_string('((a)(b c))') == [['a'], ['b', 'c']]
+
+
+@pytest.mark.parametrize('text, message', [
+    ('(define (domain test)', 'Missing close parentheses'),
+    ('(define))', 'Missing open parentheses'),
+    ('(a) (b)', 'Malformed expression'),
+])
+def test_tokenize_rejects_unbalanced(text, message):
+    with pytest.raises(Exception, match=message):
+        PDDL_Parser().scan_string(text)
+
+
+# -----------------------------------------------
+# Strings against files
+# -----------------------------------------------
+
+@pytest.mark.parametrize('problem', sorted(TOY_PROBLEMS))
+def test_parse_strings_match_files(problem):
+    files = toy_files(*TOY_PROBLEMS[problem])
+    from_files = parse_files(files)
+    from_strings = parse_strings(files)
+    for field in PDDL_Parser.DOMAIN_FIELDS + ('problem_name', 'state', 'positive_goals', 'negative_goals'):
+        assert getattr(from_strings, field) == getattr(from_files, field), field
+
+
+def test_parse_domain_string_rejects_other_patterns():
+    with pytest.raises(Exception, match='Domain string does not match domain pattern'):
+        PDDL_Parser().parse_domain_string('(problem (x))')
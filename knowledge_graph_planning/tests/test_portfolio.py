@@ -0,0 +1,86 @@
+# Four spaces as indentation [no tabs]
+
+import multiprocessing, os
+import pytest
+from conftest import TIME_LIMIT, toy_files, assert_valid
+from pddl_parser.portfolio import Portfolio, DEFAULT_CONFIGURATIONS
+from pddl_parser.backend import PortfolioBackend
+from pddl_parser.planner import Planner
+from pddl_parser.budget import Budget, SOLVED, UNSOLVABLE, FAILED
+
+HOUSE = toy_files('house', 'problem')
+UNSOLVABLE_DINNER = toy_files('dinner', 'unsolvable')
+
+# Patches to Planner only reach configurations running in forked processes
+forked = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='needs the fork start method')
+
+
+def race(files, configurations):
+    portfolio = Portfolio(configurations, TIME_LIMIT, cache_dir=None)
+    plan = portfolio.solve(*files, budget=Budget(TIME_LIMIT))
+    return portfolio, plan
+
+
+# -----------------------------------------------
+# Race
+# -----------------------------------------------
+
+def test_portfolio_solves_and_names_the_winner():
+    portfolio, plan = race(HOUSE, DEFAULT_CONFIGURATIONS)
+    assert portfolio.stats.status == SOLVED
+    assert_valid(HOUSE, plan)
+    assert portfolio.winner in DEFAULT_CONFIGURATIONS
+    assert portfolio.stats.expanded > 0
+    assert portfolio.errors == []
+
+
+def test_portfolio_proves_unsolvable():
+    # A complete configuration ends the race, IW alone cannot
+    portfolio, plan = race(UNSOLVABLE_DINNER, [('iw', 'hff', None), ('bfs', 'hff', None)])
+    assert plan is None
+    assert portfolio.stats.status == UNSOLVABLE
+    portfolio, plan = race(UNSOLVABLE_DINNER, [('iw', 'hff', None)])
+    assert plan is None
+    assert portfolio.stats.status == FAILED
+
+
+def test_portfolio_rejects_unknown_configurations():
+    with pytest.raises(Exception, match='Search dfs not supported'):
+        Portfolio([('dfs', 'hff', None)])
+    with pytest.raises(Exception, match='Heuristic hlm not supported'):
+        Portfolio([('gbfs', 'hlm', None)])
+
+
+# -----------------------------------------------
+# Errors
+# -----------------------------------------------
+
+@forked
+def test_portfolio_reports_raising_configurations(monkeypatch):
+    search_engine = Planner.search_engine
+    def failing_gbfs(self, task, generator=None, invariants=None):
+        if self.search == 'gbfs':
+            raise ValueError('broken heuristic')
+        return search_engine(self, task, generator, invariants)
+    monkeypatch.setattr(Planner, 'search_engine', failing_gbfs)
+    portfolio, plan = race(HOUSE, [('gbfs', 'hff', None), ('bfs', 'hff', None)])
+    assert portfolio.winner == ('bfs', 'hff', None)
+    assert portfolio.errors == [(('gbfs', 'hff', None), 'ValueError: broken heuristic')]
+    assert_valid(HOUSE, plan)
+
+
+@forked
+def test_portfolio_reports_dead_configurations(monkeypatch):
+    monkeypatch.setattr(Planner, 'search_engine', lambda *args: os._exit(3))
+    portfolio, plan = race(HOUSE, [('gbfs', 'hff', None)])
+    assert plan is None
+    assert portfolio.stats.status == FAILED
+    assert portfolio.errors == [(('gbfs', 'hff', None), 'Process exited with code 3')]
+
+
+@forked
+def test_portfolio_backend_appends_errors(monkeypatch):
+    monkeypatch.setattr(Planner, 'search_engine', lambda *args: os._exit(3))
+    result = PortfolioBackend([('gbfs', 'hff', None)], TIME_LIMIT, cache_dir=None).plan(*HOUSE)
+    assert result.status == FAILED
+    assert result.output.endswith('\ngbfs:hff failed: Process exited with code 3')
@@ -0,0 +1,108 @@
+# Four spaces as indentation [no tabs]
+
+import os
+import pytest
+from conftest import toy_files, assert_valid
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.problem import Problem
+from pddl_parser.planner import Planner
+from pddl_parser.backend import InProcessBackend, PlannerBackend
+from pddl_parser.budget import SOLVED
+
+KITCHEN = toy_files('kitchen', 'problem')
+
+
+def kitchen_problem():
+    # The kitchen toy problem built in code, with mixed case names
+    problem = Problem('Dishes', 'kitchen')
+    problem.add_object('C', 'cup')
+    problem.add_object('p', 'Plate')
+    problem.add_object('kitchen', 'room')
+    problem.add_object('hall', 'room')
+    for atom in [('in', 'hall'), ('at', 'c', 'kitchen'), ('at', 'P', 'kitchen')]:
+        problem.add_fact(atom)
+    problem.parse_goal('(:goal (and (clean c) (clean p)))')
+    return problem
+
+
+def parsed(problem=None, text=None):
+    parser = PDDL_Parser()
+    parser.parse_domain(KITCHEN[0])
+    if problem is not None:
+        problem.load(parser)
+    elif text is not None:
+        parser.parse_problem_string(text)
+    else:
+        parser.parse_problem(KITCHEN[1])
+    return parser
+
+
+def problem_fields(parser):
+    objects = {type: sorted(objects) for type, objects in parser.objects.items()}
+    return parser.problem_name, objects, parser.state, parser.positive_goals, parser.negative_goals
+
+
+# -----------------------------------------------
+# Build and write
+# -----------------------------------------------
+
+def test_written_and_loaded_problems_match_the_file():
+    problem = kitchen_problem()
+    expected = problem_fields(parsed())
+    assert problem_fields(parsed(text=problem.to_pddl())) == expected
+    assert problem_fields(parsed(problem)) == expected
+
+
+def test_write(tmp_path):
+    filename = str(tmp_path / 'dishes.pddl')
+    problem = kitchen_problem()
+    problem.write(filename)
+    with open(filename) as f:
+        assert f.read() == problem.to_pddl()
+
+
+def test_negative_goals_and_clearing():
+    problem = kitchen_problem()
+    problem.parse_goal('(and (clean c) (not (in hall)))')
+    assert list(problem.positive_goals) == [('clean', 'c')]
+    assert list(problem.negative_goals) == [('in', 'hall')]
+    assert '(not (in hall))' in problem.to_pddl()
+    problem.clear_goal()
+    problem.clear_facts()
+    assert ':goal' not in problem.to_pddl()
+    assert parsed(text=problem.to_pddl()).state == frozenset()
+
+
+@pytest.mark.parametrize('goal', ['(:goal (clean c) (clean p))', '(and (clean (c)))'])
+def test_malformed_goals(goal):
+    with pytest.raises(Exception, match='Malformed goal'):
+        kitchen_problem().parse_goal(goal)
+
+
+def test_load_checks_the_domain():
+    with pytest.raises(Exception, match='Different domain specified in problem dishes'):
+        Problem('dishes', 'house').load(parsed())
+
+
+# -----------------------------------------------
+# Planning
+# -----------------------------------------------
+
+def test_planner_takes_a_problem():
+    planner = Planner('bfs', cache_dir=None)
+    plan = planner.solve(KITCHEN[0], kitchen_problem())
+    assert planner.stats.status == SOLVED
+    assert_valid(KITCHEN, plan)
+
+
+def test_plan_problem(tmp_path):
+    # The in-process backend plans without writing the file, others write it first
+    filename = str(tmp_path / 'dishes.pddl')
+    result = InProcessBackend(cache_dir=None).plan_problem(KITCHEN[0], kitchen_problem(), filename)
+    assert result.solved
+    assert not os.path.exists(filename)
+    class FileBackend(PlannerBackend):
+        def plan(self, domain, problem, previous_plan=None):
+            return InProcessBackend(cache_dir=None).plan(domain, problem, previous_plan)
+    assert FileBackend().plan_problem(KITCHEN[0], kitchen_problem(), filename).steps == result.steps
+    assert os.path.exists(filename)
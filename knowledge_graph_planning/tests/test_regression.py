@@ -0,0 +1,69 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import PROBLEMS, solve, assert_valid, bfs_length, toy_files, ground_task
+from pddl_parser.search import BidirectionalSearch
+from pddl_parser.budget import SOLVED, UNSOLVABLE
+
+# Regression does not detect subsumed subgoals and takes far longer on the
+# goals of many literals of house and collective_00
+REGRESSION_PROBLEMS = [problem for problem in PROBLEMS if problem not in ('house', 'collective_00')]
+
+
+# -----------------------------------------------
+# Against BFS
+# -----------------------------------------------
+
+@pytest.mark.parametrize('problem_files', REGRESSION_PROBLEMS, indirect=True)
+def test_regression_is_optimal(problem_files):
+    # Backward breadth-first search finds plans of the BFS length
+    status, plan = solve(problem_files, 'regression')
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) == bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_bidirectional_is_optimal(problem_files):
+    status, plan = solve(problem_files, 'bidirectional')
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) == bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('search', ['regression', 'bidirectional'])
+def test_regresses_conditional_effects(search):
+    # Laundry is only solvable through when effects
+    status, plan = solve(toy_files('laundry', 'problem'), search)
+    assert status == SOLVED
+    assert_valid(toy_files('laundry', 'problem'), plan)
+
+
+@pytest.mark.parametrize('search', ['regression', 'bidirectional'])
+def test_proves_unsolvable(search):
+    status, plan = solve(toy_files('dinner', 'unsolvable'), search)
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+# -----------------------------------------------
+# Meeting
+# -----------------------------------------------
+
+def test_bidirectional_anchor_index():
+    # Every anchor lists the forward states holding it, up to where the
+    # search met, and every subgoal is anchored at its highest positive atom
+    _, task = ground_task(toy_files('house', 'problem'))
+    search = BidirectionalSearch(task)
+    plan = search.search()
+    assert plan is not None
+    forward = search.space
+    for anchor, nodes in search.holding.items():
+        holding = [node for node in range(len(forward)) if forward.states[node] & anchor]
+        assert nodes == holding[:len(nodes)]
+    anchored = sorted(other for others in search.anchored.values() for other in others)
+    assert sorted(anchored + search.unanchored) == sorted(set(anchored + search.unanchored))
+    for anchor, others in search.anchored.items():
+        for other in others:
+            positive = search.backward_space.states[other][0]
+            assert anchor == 1 << (positive.bit_length() - 1)
@@ -0,0 +1,99 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import PROBLEMS, toy_files, solve, assert_valid, bfs_length
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.grounding import Grounder
+from pddl_parser.relevance import RelevanceGrounder
+from pddl_parser.planner import Planner
+from pddl_parser.problem import Problem
+from pddl_parser.budget import SOLVED, UNSOLVABLE
+
+# Blind search over every reachable action of collective_00 runs past the
+# time limit
+BFS_PROBLEMS = [problem for problem in PROBLEMS if problem != 'collective_00']
+
+
+def ground_both(files):
+    # Reachable and relevant ground actions of a problem, by (name, parameters)
+    parser = PDDL_Parser()
+    parser.parse_domain(files[0])
+    parser.parse_problem(files[1])
+    reachable = Grounder(parser.objects, parser.types).ground(parser.actions, parser.state)
+    grounder = RelevanceGrounder(parser.objects, parser.types, parser.positive_goals, parser.negative_goals)
+    relevant = grounder.ground(parser.actions, parser.state)
+    return grounder, {(act.name, act.parameters): act for act in reachable}, {(act.name, act.parameters): act for act in relevant}
+
+
+def kitchen_with_a_bowl():
+    # The kitchen problem with a bowl no goal mentions
+    parser = PDDL_Parser()
+    parser.parse_domain(toy_files('kitchen', 'problem')[0])
+    parser.parse_problem(toy_files('kitchen', 'problem')[1])
+    problem = Problem(parser.problem_name, parser.domain_name)
+    for type, objects in parser.objects.items():
+        for name in objects:
+            problem.add_object(name, type)
+    problem.add_object('bowl', 'cup')
+    for atom in sorted(parser.state) + [('at', 'bowl', 'kitchen')]:
+        problem.add_fact(atom)
+    for atom in sorted(parser.positive_goals):
+        problem.add_goal(atom)
+    return problem
+
+
+# -----------------------------------------------
+# Relevant actions
+# -----------------------------------------------
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_relevant_actions_are_reachable_ones(problem_files):
+    # Relevance only drops actions, it never changes one
+    _, reachable, relevant = ground_both(problem_files)
+    for key, act in relevant.items():
+        assert reachable[key] == act
+
+
+@pytest.mark.parametrize('problem_files', BFS_PROBLEMS, indirect=True)
+def test_relevance_keeps_optimal_plans(problem_files):
+    status, plan = solve(problem_files, 'bfs', relevance=False)
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) == bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_search_without_relevance(problem_files):
+    status, plan = solve(problem_files, 'gbfs', 'hff', relevance=False)
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) >= bfs_length(problem_files)
+
+
+def test_search_without_relevance_proves_unsolvable():
+    status, plan = solve(toy_files('dinner', 'unsolvable'), 'gbfs', 'hff', relevance=False)
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+# -----------------------------------------------
+# Pruned objects
+# -----------------------------------------------
+
+def test_blocked_room_is_pruned():
+    # Nothing can move into the blocked room, so no relevant action mentions it
+    grounder, reachable, relevant = ground_both(toy_files('corridor', 'problem'))
+    assert grounder.irrelevant_objects == {'b'}
+    assert set(relevant) == set(reachable)
+
+
+def test_unmentioned_object_is_pruned():
+    domain = toy_files('kitchen', 'problem')[0]
+    planner = Planner('bfs', cache_dir=None)
+    plan = planner.solve(domain, kitchen_with_a_bowl())
+    assert planner.stats.pruned_objects == 1
+    assert not any('bowl' in act.parameters for act in plan)
+    unpruned = Planner('bfs', cache_dir=None, relevance=False)
+    assert len(unpruned.solve(domain, kitchen_with_a_bowl())) == len(plan)
+    assert unpruned.stats.pruned_objects == 0
+    assert unpruned.stats.actions > planner.stats.actions
@@ -0,0 +1,86 @@
+# Four spaces as indentation [no tabs]
+
+from conftest import toy_files, solve, steps, ground_task
+from pddl_parser.planner import Planner
+from pddl_parser.repair import PlanRepair
+from pddl_parser.budget import Budget, SOLVED
+
+HOUSE = toy_files('house', 'problem')
+
+
+def house_plan():
+    # Parser, task and BFS plan of the house problem as action indices
+    parser, task = ground_task(HOUSE)
+    _, plan = solve(HOUSE, 'bfs')
+    return parser, task, PlanRepair(task).indices(steps(plan))
+
+
+def plan_steps(task, plan):
+    return [(task.actions[index].name, task.actions[index].parameters) for index in plan]
+
+
+def execute(task, plan):
+    state = task.init
+    for index in plan:
+        assert task.applicable(state, index)
+        state = task.apply(state, index)
+    return task.goal_reached(state)
+
+
+# -----------------------------------------------
+# Reuse
+# -----------------------------------------------
+
+def test_repair_keeps_a_working_plan():
+    _, task, plan = house_plan()
+    assert PlanRepair(task).repair(plan_steps(task, plan)) == plan
+
+
+def test_repair_skips_steps_already_done():
+    # Starting where the first three steps left off, only the rest is needed
+    parser, task, plan = house_plan()
+    state = task.init
+    for index in plan[:3]:
+        state = task.apply(state, index)
+    moved = task.with_problem(task.unpack(state), parser.positive_goals, parser.negative_goals)
+    assert PlanRepair(moved).repair(plan_steps(task, plan)) == plan[3:]
+
+
+def test_repair_bridges_a_changed_init():
+    # The agent starts one room further, IW finds the way back into the plan
+    parser, task, plan = house_plan()
+    atoms = set(task.unpack(task.init))
+    atoms.remove(('at', 'bot', 'r0'))
+    atoms.add(('at', 'bot', 'r1'))
+    moved = task.with_problem(atoms, parser.positive_goals, parser.negative_goals)
+    repaired = PlanRepair(moved).repair(plan_steps(task, plan))
+    assert repaired is not None
+    assert execute(moved, repaired)
+    assert len(repaired) <= len(plan) + 1
+
+
+def test_regression_stops_at_unknown_steps():
+    _, task, plan = house_plan()
+    repair = PlanRepair(task)
+    assert repair.indices([('fly', ('bot',))]) == [None]
+    subgoals = repair.regress(plan + [None])
+    assert subgoals == [(len(plan) + 1, task.goal_pos, task.goal_neg)]
+
+
+# -----------------------------------------------
+# Planner
+# -----------------------------------------------
+
+def test_planner_reports_repairs():
+    _, plan = solve(HOUSE, 'bfs')
+    planner = Planner('gbfs', cache_dir=None)
+    assert steps(planner.solve(*HOUSE, steps(plan), Budget(60))) == steps(plan)
+    assert planner.stats.repaired
+
+
+def test_planner_searches_when_repair_fails():
+    planner = Planner('gbfs', cache_dir=None)
+    plan = planner.solve(*HOUSE, [('fly', ('bot',))], Budget(60))
+    assert plan is not None
+    assert planner.stats.status == SOLVED
+    assert not planner.stats.repaired
@@ -0,0 +1,110 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import PROBLEMS, TOY_PROBLEMS, toy_files, solve, assert_valid, bfs_length, ground_task, config_id
+from test_task import reachable_states
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.planner import Planner
+from pddl_parser.sas import SASTask, synthesize_invariants, mutex_groups
+from pddl_parser.budget import SOLVED, UNSOLVABLE
+
+# (search, heuristic, Planner keywords) over the finite-domain translation,
+# optimal ones must match the BFS plan length
+OPTIMAL = [
+    ('astar', 'hmax', {'sas': True}),
+]
+CONFIGURATIONS = OPTIMAL + [
+    ('gbfs', 'hff', {'sas': True}),
+]
+
+
+def sas_task(files):
+    parser, task = ground_task(files)
+    invariants = synthesize_invariants(parser.actions)
+    return task, invariants, SASTask(task, invariants)
+
+
+# -----------------------------------------------
+# Invariants
+# -----------------------------------------------
+
+def test_house_invariants():
+    # The agent is in one room and holds at most one item, each item is in
+    # one room or held
+    parser = PDDL_Parser()
+    parser.parse_domain(toy_files('house', 'problem')[0])
+    invariants = synthesize_invariants(parser.actions)
+    assert frozenset([('at', (0,))]) in invariants
+    assert frozenset([('free', (0,)), ('holding', (0,))]) in invariants
+    assert frozenset([('in', (0,)), ('holding', (1,))]) in invariants
+
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_mutex_groups_hold_in_reachable_states(name):
+    task, invariants, _ = sas_task(toy_files(*TOY_PROBLEMS[name]))
+    groups = mutex_groups(task, invariants)
+    for state in reachable_states(task):
+        true = set(task.indices(state))
+        for group in groups:
+            assert len(true.intersection(group)) <= 1
+
+
+# -----------------------------------------------
+# Finite-domain states
+# -----------------------------------------------
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_sas_task_matches_task(name):
+    # Both encodings have the same successors and goal states
+    task, _, sas = sas_task(toy_files(*TOY_PROBLEMS[name]))
+    assert sas.unpack(sas.init) == task.unpack(task.init)
+    for state in reachable_states(sas):
+        bits = task.pack(sas.unpack(state))
+        assert sas.goal_reached(state) == task.goal_reached(bits)
+        for index in range(len(task.actions)):
+            assert sas.applicable(state, index) == task.applicable(bits, index)
+            if task.applicable(bits, index):
+                assert task.pack(sas.unpack(sas.apply(state, index))) == task.apply(bits, index)
+
+
+def test_sas_successor_generator_matches_scan():
+    _, _, sas = sas_task(toy_files('house', 'problem'))
+    generator = sas.successor_generator()
+    for state in reachable_states(sas):
+        assert generator.applicable(state) == [index for index in range(len(sas.actions)) if sas.applicable(state, index)]
+
+
+def test_house_variables_are_fewer_than_atoms():
+    task, _, sas = sas_task(toy_files('house', 'problem'))
+    assert len(sas.variables) < len(task.atoms)
+    assert len(sas.init) == len(sas.variables)
+
+
+# -----------------------------------------------
+# Search
+# -----------------------------------------------
+
+@pytest.mark.parametrize('config', CONFIGURATIONS, ids=config_id)
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_sas_search(problem_files, config):
+    search, heuristic, options = config
+    status, plan = solve(problem_files, search, heuristic, **options)
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    if config in OPTIMAL:
+        assert len(plan) == bfs_length(problem_files)
+    else:
+        assert len(plan) >= bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('config', CONFIGURATIONS, ids=config_id)
+def test_sas_search_proves_unsolvable(config):
+    search, heuristic, options = config
+    status, plan = solve(toy_files('dinner', 'unsolvable'), search, heuristic, **options)
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+def test_sas_rejects_width_searches():
+    with pytest.raises(Exception, match='does not support the finite-domain encoding'):
+        Planner('siw', sas=True)
@@ -0,0 +1,45 @@
+# Four spaces as indentation [no tabs]
+
+from pddl_parser.search_space import SearchSpace
+
+
+def chain(space, states):
+    # Adds states as a path from the root, action k leads to states[k + 1]
+    node = space.add(states[0])
+    for action, state in enumerate(states[1:]):
+        node = space.add(state, node, action)
+    return node
+
+
+def test_add_and_lookup():
+    space = SearchSpace()
+    assert space.lookup(5) is None
+    assert space.add(5) == 0
+    assert space.add(9, 0, 3) == 1
+    assert space.lookup(5) == 0
+    assert space.lookup(9) == 1
+    assert space.states[1] == 9
+    assert len(space) == 2
+
+
+def test_extract_plan_walks_back_to_the_root():
+    space = SearchSpace()
+    node = chain(space, [1, 2, 4, 8])
+    assert space.extract_plan(node) == [0, 1, 2]
+    assert space.extract_plan(0) == []
+
+
+def test_set_parent_reroutes_the_plan():
+    # A cheaper path found later replaces the parent of a node
+    space = SearchSpace()
+    goal = chain(space, [1, 2, 4, 8])
+    space.set_parent(goal, 0, 7)
+    assert space.extract_plan(goal) == [7]
+
+
+def test_arrays_are_typed():
+    space = SearchSpace()
+    chain(space, list(range(1000)))
+    assert space.parents.typecode == 'i'
+    assert space.actions.typecode == 'i'
+    assert list(space.parents[:3]) == [-1, 0, 1]
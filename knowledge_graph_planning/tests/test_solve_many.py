@@ -0,0 +1,36 @@
+# Four spaces as indentation [no tabs]
+
+from conftest import GENERATED_PROBLEMS, TIME_LIMIT, toy_files, steps, bfs_length
+from pddl_parser.planner import Planner
+from pddl_parser.budget import Budget, SOLVED, UNSOLVABLE
+from pddl_parser.validator import validate_plan
+
+
+def test_solve_many(generated_dir):
+    problems = [generated_dir + '/' + name + '.pddl' for name in GENERATED_PROBLEMS]
+    domain = generated_dir + '/domain.pddl'
+    planner = Planner('siw-bfsf', 'hadd', cache_dir=None)
+    results = planner.solve_many(domain, problems, Budget(TIME_LIMIT))
+    assert len(results) == len(problems)
+    for problem, (plan, stats) in zip(problems, results):
+        assert stats.status == SOLVED
+        assert stats.plan_length == len(plan)
+        assert validate_plan(domain, problem, steps(plan), cache_dir=None).valid
+    assert planner.stats is results[-1][1]
+
+
+def test_solve_many_grounds_once(monkeypatch):
+    # Problems over the same objects share one grounding, each keeps its
+    # own status and an optimal search keeps its own plan length
+    domain, problem = toy_files('dinner', 'problem')
+    unsolvable = toy_files('dinner', 'unsolvable')[1]
+    planner = Planner('bfs', cache_dir=None)
+    grounders = []
+    grounder = planner.grounder
+    monkeypatch.setattr(planner, 'grounder', lambda *args: grounders.append(grounder(*args)) or grounders[-1])
+    results = planner.solve_many(domain, [problem, unsolvable, problem], Budget(TIME_LIMIT))
+    assert len(grounders) == 1
+    assert [stats.status for _, stats in results] == [SOLVED, UNSOLVABLE, SOLVED]
+    assert results[1][0] is None
+    for plan, _ in results[::2]:
+        assert len(plan) == bfs_length((domain, problem))
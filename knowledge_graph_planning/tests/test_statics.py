@@ -0,0 +1,62 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import toy_files, ground_task
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.grounding import Grounder
+
+
+def ground(name, static_facts=None):
+    # Parser, grounder and ground actions by (name, parameters) of a toy problem
+    parser = PDDL_Parser()
+    parser.parse_domain(toy_files(name, 'problem')[0])
+    parser.parse_problem(toy_files(name, 'problem')[1])
+    grounder = Grounder(parser.objects, parser.types)
+    actions = grounder.ground(parser.actions, parser.state, static_facts)
+    return parser, grounder, {(act.name, act.parameters): act for act in actions}
+
+
+@pytest.mark.parametrize('name, statics', [
+    ('house', {'adj'}),
+    ('laundry', {'in_room', 'has'}),
+    ('corridor', {'adj', 'blocked', 'lit'}),
+    ('dinner', set()),
+])
+def test_static_predicates(name, statics):
+    # Predicates no effect mentions
+    _, grounder, _ = ground(name)
+    assert grounder.statics == statics
+
+
+def test_static_preconditions_are_compiled_away():
+    # Only moves between adjacent rooms are grounded, without their adj condition
+    parser, grounder, actions = ground('house')
+    moves = [act for act in actions.values() if act.name == 'move']
+    assert sorted(act.parameters[1:] for act in moves) == sorted(fact[1:] for fact in parser.state if fact[0] == 'adj')
+    for act in actions.values():
+        assert not any(fact[0] == 'adj' for fact in act.positive_preconditions)
+    _, task = ground_task(toy_files('house', 'problem'))
+    assert not any(atom[0] == 'adj' for atom in task.atoms)
+
+
+def test_static_negative_preconditions_and_conditions():
+    # Moving into the blocked room is dropped and the lit condition decides
+    # once whether visited is added
+    _, _, actions = ground('corridor')
+    assert ('move', ('a', 'b')) not in actions
+    into_lit = actions[('move', ('c', 'd'))]
+    assert not into_lit.conditional_effects
+    assert ('visited', 'd') in into_lit.add_effects
+    into_dark = actions[('move', ('a', 'c'))]
+    assert not into_dark.conditional_effects
+    assert ('visited', 'c') not in into_dark.add_effects
+    assert into_dark.negative_preconditions == frozenset()
+
+
+def test_static_facts_outside_every_state_stay_conditions():
+    # With no static fact known to hold, adj stays a precondition
+    _, grounder, actions = ground('house', frozenset())
+    assert grounder.static_facts == frozenset()
+    move = actions[('move', ('bot', 'r0', 'r1'))]
+    assert ('adj', 'r0', 'r1') in move.positive_preconditions
+    assert grounder.dynamic([('adj', 'r0', 'r1')]) == frozenset([('adj', 'r0', 'r1')])
@@ -0,0 +1,52 @@
+# Four spaces as indentation [no tabs]
+
+import json
+from conftest import toy_files
+from pddl_parser.planner import Planner
+from pddl_parser.stats import PlannerStats
+from pddl_parser.budget import SOLVED
+
+HOUSE = toy_files('house', 'problem')
+
+
+def test_solve_fills_the_stats():
+    phases = []
+    planner = Planner('bfs', cache_dir=None, hooks=[lambda phase, stats: phases.append((phase, stats))])
+    plan = planner.solve(*HOUSE)
+    stats = planner.stats
+    assert stats.status == SOLVED
+    assert stats.plan_length == len(plan)
+    # 8 rooms, 6 items and the agent
+    assert stats.objects == 15
+    assert stats.atoms > 0 and stats.actions > 0
+    assert 0 < stats.expanded <= stats.generated
+    assert not stats.repaired
+    assert stats.peak_rss > 0
+    # Every phase reports the stats of the call once it ends
+    assert phases == [('parse', stats), ('grounding', stats), ('search', stats)]
+    assert min(stats.parse_time, stats.grounding_time, stats.search_time) >= 0
+    assert stats.total_time >= stats.parse_time + stats.grounding_time + stats.search_time
+
+
+def test_solved_init_skips_grounding_and_search(tmp_path):
+    phases = []
+    planner = Planner('bfs', cache_dir=None, hooks=[lambda phase, stats: phases.append(phase)])
+    problem = tmp_path / 'done.pddl'
+    problem.write_text('(define (problem done) (:domain dinner) (:init (clean)) (:goal (and (clean) (not (garbage)))))')
+    assert planner.solve(toy_files('dinner', 'problem')[0], str(problem)) == []
+    assert phases == ['parse']
+    assert planner.stats.plan_length == 0
+    assert planner.stats.grounding_time == planner.stats.search_time == 0
+
+
+def test_output_formats():
+    stats = PlannerStats()
+    stats.generated = 50
+    assert stats.nodes_per_second == 0.0
+    stats.search_time = 2.0
+    assert stats.nodes_per_second == 25.0
+    stats.finish()
+    fields = stats.as_dict()
+    assert list(fields) == list(PlannerStats.FIELDS) + ['nodes_per_second']
+    assert json.loads(stats.to_json()) == fields
+    assert 'generated: 50' in str(stats).splitlines()
@@ -0,0 +1,35 @@
+# Four spaces as indentation [no tabs]
+
+import pytest
+from conftest import PROBLEMS, ground_task
+from pddl_parser.successor import SuccessorGenerator
+from test_task import reachable_states
+
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_applicable_matches_a_full_scan(problem_files):
+    _, task = ground_task(problem_files)
+    generator = SuccessorGenerator(task)
+    for state in reachable_states(task):
+        assert generator.applicable(state) == [index for index in range(len(task.actions)) if task.applicable(state, index)]
+
+
+@pytest.mark.parametrize('problem_files', ['laundry', 'corridor', 'room_00'], indirect=True)
+def test_successors_apply_the_action(problem_files):
+    # Laundry and corridor have conditional effects
+    _, task = ground_task(problem_files)
+    generator = task.successor_generator()
+    for state in reachable_states(task):
+        for index, new_state in generator.successors(state):
+            assert new_state == task.apply(state, index)
+
+
+def test_actions_without_preconditions_are_always_applicable():
+    class Empty:
+        atoms = [('p',)]
+        actions = [None, None]
+        pre_pos_ids = [(), (0,)]
+        pre_neg_ids = [(), ()]
+    generator = SuccessorGenerator(Empty())
+    assert generator.applicable(0) == [0]
+    assert generator.applicable(1) == [0, 1]
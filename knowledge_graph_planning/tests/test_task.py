@@ -0,0 +1,86 @@
+# Four spaces as indentation [no tabs]
+
+from collections import deque
+import pytest
+from conftest import PROBLEMS, TOY_PROBLEMS, solve, assert_valid, toy_files, ground_task
+from pddl_parser.planner import Planner
+from pddl_parser.budget import SOLVED, UNSOLVABLE
+
+MAX_STATES = 300
+
+
+def reachable_states(task):
+    # Breadth-first states of task, at most MAX_STATES
+    seen = {task.init}
+    queue = deque([task.init])
+    while queue and len(seen) < MAX_STATES:
+        state = queue.popleft()
+        yield state
+        for index in range(len(task.actions)):
+            if task.applicable(state, index):
+                new_state = task.apply(state, index)
+                if new_state not in seen:
+                    seen.add(new_state)
+                    queue.append(new_state)
+
+
+# -----------------------------------------------
+# Bit vector states
+# -----------------------------------------------
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_pack_unpack(name):
+    parser, task = ground_task(toy_files(*TOY_PROBLEMS[name]))
+    for state in reachable_states(task):
+        atoms = task.unpack(state)
+        assert task.pack(atoms) == state
+        assert list(task.indices(state)) == sorted(task.atom_ids[atom] for atom in atoms)
+
+
+@pytest.mark.parametrize('name', sorted(TOY_PROBLEMS))
+def test_apply_matches_set_semantics(name):
+    # Masks give the same successors as the frozenset states of the baseline planner
+    parser, task = ground_task(toy_files(*TOY_PROBLEMS[name]))
+    planner = Planner()
+    for state in reachable_states(task):
+        atoms = task.unpack(state)
+        for index, act in enumerate(task.actions):
+            applicable = planner.applicable(atoms, act.positive_preconditions, act.negative_preconditions)
+            assert task.applicable(state, index) == applicable
+            if applicable:
+                expected = planner.apply(atoms, act.add_effects, act.del_effects, act.conditional_effects)
+                assert task.unpack(task.apply(state, index)) == expected
+
+
+def test_goal_reached():
+    parser, task = ground_task(toy_files('dinner', 'problem'))
+    assert not task.goal_reached(task.init)
+    goal = task.mask(task.goal_pos_ids)
+    assert task.goal_reached(goal)
+    assert not task.goal_reached(goal | task.goal_neg)
+
+
+def test_with_problem_shares_actions():
+    parser, task = ground_task(toy_files('house', 'problem'))
+    goal = frozenset([task.atoms[task.goal_pos_ids[0]]])
+    other = task.with_problem(task.unpack(task.init), goal, frozenset())
+    assert other.actions is task.actions
+    assert other.goal_pos_ids == task.goal_pos_ids[:1]
+    assert task.goal_pos_ids != other.goal_pos_ids
+
+
+# -----------------------------------------------
+# Breadth-first search
+# -----------------------------------------------
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_bfs_plans_are_valid(problem_files):
+    status, plan = solve(problem_files, 'bfs')
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+
+
+def test_bfs_proves_unsolvable():
+    status, plan = solve(toy_files('dinner', 'unsolvable'), 'bfs')
+    assert plan is None
+    assert status == UNSOLVABLE
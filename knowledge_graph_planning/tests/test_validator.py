@@ -0,0 +1,81 @@
+# Four spaces as indentation [no tabs]
+
+from conftest import toy_files
+from pddl_parser.PDDL import PDDL_Parser
+from pddl_parser.validator import PlanValidator, validate_plan, format_validation
+
+KITCHEN = toy_files('kitchen', 'problem')
+KITCHEN_PLAN = [('go', ('hall', 'kitchen')), ('wash', ('c', 'kitchen')), ('wash', ('p', 'kitchen'))]
+
+
+def validator(files):
+    parser = PDDL_Parser()
+    parser.parse_domain(files[0])
+    parser.parse_problem(files[1])
+    return parser, PlanValidator.from_parser(parser)
+
+
+# -----------------------------------------------
+# Valid plans
+# -----------------------------------------------
+
+def test_valid_plan_with_either_types():
+    result = validate_plan(*KITCHEN, KITCHEN_PLAN, cache_dir=None)
+    assert result.valid
+    assert result.failed_step is None
+    assert ('clean', 'p') in result.state
+    assert format_validation(result, KITCHEN_PLAN) == ['Plan valid']
+
+
+def test_conditional_effects_follow_the_old_state():
+    steps = [('place', ('s1', 'w', 'me', 'r')), ('run', ('w', 'r', 'me'))]
+    result = validate_plan(*toy_files('laundry', 'problem'), steps, cache_dir=None)
+    assert result.valid
+    assert ('dirty', 's3') in result.state
+
+
+# -----------------------------------------------
+# Invalid plans
+# -----------------------------------------------
+
+def test_missing_precondition():
+    steps = KITCHEN_PLAN[1:]
+    result = validate_plan(*KITCHEN, steps, cache_dir=None)
+    assert not result.valid
+    assert result.failed_step == 0
+    assert result.missing == frozenset([('in', 'kitchen')])
+    assert format_validation(result, steps) == ['Step 1 (wash c kitchen) failed', '  missing (in kitchen)']
+
+
+def test_present_negative_goal():
+    result = validate_plan(*toy_files('dinner', 'problem'), [], cache_dir=None)
+    assert not result.goal_reached
+    assert result.missing == frozenset([('dinner',), ('present',)])
+    assert result.present == frozenset([('garbage',)])
+    assert format_validation(result, []) == ['Goal not reached', '  missing (dinner)', '  missing (present)', '  present (garbage)']
+
+
+def test_goal_not_reached():
+    result = validate_plan(*KITCHEN, KITCHEN_PLAN[:2], cache_dir=None)
+    assert not result.valid
+    assert result.failed_step is None
+    assert result.missing == frozenset([('clean', 'p')])
+
+
+def test_steps_that_cannot_be_instantiated():
+    parser, plan_validator = validator(KITCHEN)
+    for step, error in [
+        (('fly', ('hall',)), 'Unknown action fly'),
+        (('go', ('hall',)), 'Action go takes 2 parameters, got 1'),
+        (('wash', ('hall', 'kitchen')), 'Parameter hall of wash is not of type (either cup plate)'),
+    ]:
+        result = plan_validator.validate([step], parser.state, parser.positive_goals)
+        assert result.failed_step == 0
+        assert result.error == error
+
+
+def test_steps_are_instantiated_once():
+    parser, plan_validator = validator(KITCHEN)
+    plan_validator.validate(KITCHEN_PLAN, parser.state)
+    plan_validator.validate(KITCHEN_PLAN, parser.state)
+    assert sorted(plan_validator.steps) == sorted((name, parameters) for name, parameters in KITCHEN_PLAN)
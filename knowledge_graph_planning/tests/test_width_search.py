@@ -0,0 +1,105 @@
+# Four spaces as indentation [no tabs]
+
+import numpy as np
+import pytest
+from conftest import PROBLEMS, toy_files, solve, assert_valid, bfs_length, ground_task, config_id
+from pddl_parser.search import IteratedWidth, BestFirstWidthSearch
+from pddl_parser.budget import SOLVED, UNSOLVABLE, FAILED
+
+# (search, heuristic, Planner keywords), IW and SIW prune by novelty and may
+# miss plans
+INCOMPLETE = [
+    ('iw', 'hff', {'width': 1}),
+    ('iw', 'hff', {'width': 2}),
+    ('siw', 'hff', {'width': 1}),
+    ('siw', 'hff', {}),
+]
+
+
+# -----------------------------------------------
+# Against BFS
+# -----------------------------------------------
+
+@pytest.mark.parametrize('config', INCOMPLETE, ids=config_id)
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_incomplete_search(problem_files, config):
+    # Width based searches may miss plans, but never claim there is none
+    search, heuristic, options = config
+    status, plan = solve(problem_files, search, heuristic, **options)
+    if plan is None:
+        assert status == FAILED
+        return
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) >= bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('problem_files', PROBLEMS, indirect=True)
+def test_siw_then_bfsf(problem_files):
+    # BFS(f) takes over where SIW fails, so every problem is solved
+    status, plan = solve(problem_files, 'siw-bfsf', 'hadd')
+    assert status == SOLVED
+    assert_valid(problem_files, plan)
+    assert len(plan) >= bfs_length(problem_files)
+
+
+@pytest.mark.parametrize('search', ['iw', 'siw', 'siw-bfsf'])
+@pytest.mark.parametrize('problem_files', ['dinner', 'room_00'], indirect=True)
+def test_width_search_solves_negative_goals(problem_files, search):
+    # Both goals need a step that only deletes atoms
+    status, plan = solve(problem_files, search, 'hadd')
+    assert status == SOLVED
+    assert len(plan) == bfs_length(problem_files)
+
+
+# -----------------------------------------------
+# Unsolvable
+# -----------------------------------------------
+
+@pytest.mark.parametrize('config', INCOMPLETE, ids=config_id)
+def test_incomplete_search_fails_on_unsolvable(config):
+    search, heuristic, options = config
+    status, plan = solve(toy_files('dinner', 'unsolvable'), search, heuristic, **options)
+    assert plan is None
+    assert status == FAILED
+
+
+def test_siw_then_bfsf_proves_unsolvable():
+    status, plan = solve(toy_files('dinner', 'unsolvable'), 'siw-bfsf', 'hadd')
+    assert plan is None
+    assert status == UNSOLVABLE
+
+
+# -----------------------------------------------
+# Novelty tables
+# -----------------------------------------------
+
+def test_iw1_keeps_one_state_per_new_atom():
+    # Every kept state but the first makes some atom or negated atom true first
+    _, task = ground_task(toy_files('house', 'problem'))
+    search = IteratedWidth(task, 1)
+    search.iterated_width(task.init, 1, lambda state: False)
+    assert len(search.space) <= search.size + 1
+    assert search.seen_atoms.sum() <= search.size
+
+
+def test_iw2_pairs_are_symmetric():
+    _, task = ground_task(toy_files('house', 'problem'))
+    search = IteratedWidth(task, 2)
+    search.iterated_width(task.init, 2, lambda state: False)
+    pairs = np.unpackbits(search.seen_pairs, count=search.size, axis=1, bitorder='little')
+    assert (pairs == pairs.T).all()
+    # Every atom of a kept state was seen with every other one of it
+    for node in range(len(search.space)):
+        atoms = search.atoms(search.features(search.space.states[node]))
+        assert pairs[np.ix_(atoms, atoms)].all()
+
+
+def test_bfsf_is_complete_without_a_heuristic():
+    _, task = ground_task(toy_files('dinner', 'unsolvable'))
+    assert BestFirstWidthSearch(task).search() is None
+    files = toy_files('house', 'problem')
+    _, task = ground_task(files)
+    plan = BestFirstWidthSearch(task).search()
+    assert plan is not None
+    assert len(plan) >= bfs_length(files)
@@ -0,0 +1,72 @@
+# Four spaces as indentation [no tabs]
+
+import io, json, os
+from conftest import toy_files
+from pddl_parser import worker
+from pddl_parser.worker import PlannerWorker, WorkerBackend
+from pddl_parser.backend import ERROR
+from pddl_parser.budget import SOLVED, TIMEOUT
+
+
+# -----------------------------------------------
+# Serve
+# -----------------------------------------------
+
+def test_worker_serves_json_lines():
+    domain, problem = toy_files('dinner', 'problem')
+    request = json.dumps({'id': 7, 'domain': domain, 'problem': problem})
+    output = io.StringIO()
+    PlannerWorker(cache_dir=None).serve(io.StringIO(request + '\n\nnot json\n' + request + '\n'), output)
+    first, malformed, second = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert first['id'] == 7
+    assert first['status'] == SOLVED
+    assert not first['stats']['domain_warm']
+    assert malformed['status'] == ERROR
+    # The parsed domain is kept for the next request
+    assert second['stats']['domain_warm']
+    assert second['stats']['requests'] == 2
+
+
+# -----------------------------------------------
+# Backend
+# -----------------------------------------------
+
+def test_worker_backend_reuses_the_warm_worker():
+    files = toy_files('dinner', 'problem')
+    with WorkerBackend(cache_dir=None) as backend:
+        first = backend.plan(*files)
+        second = backend.plan(*files)
+    assert first.status == second.status == SOLVED
+    assert first.steps == second.steps
+    assert second.stats['pid'] == first.stats['pid']
+    assert second.stats['domain_warm']
+
+
+def test_worker_backend_kills_a_late_worker(monkeypatch, tmp_path):
+    # Opening a fifo nobody writes to blocks the worker past its time limit
+    monkeypatch.setattr(worker, 'KILL_GRACE', 0)
+    files = toy_files('dinner', 'problem')
+    blocking = str(tmp_path / 'blocking.pddl')
+    os.mkfifo(blocking)
+    with WorkerBackend(cache_dir=None) as backend:
+        first = backend.plan(*files)
+        backend.time_limit = 0.5
+        late = backend.plan(files[0], blocking)
+        respawned = backend.plan(*files)
+    assert late.status == TIMEOUT
+    assert late.steps is None
+    assert respawned.status == SOLVED
+    assert respawned.stats['pid'] != first.stats['pid']
+    assert respawned.stats['requests'] == 1
+
+
+def test_worker_backend_replaces_a_dead_worker():
+    files = toy_files('dinner', 'problem')
+    with WorkerBackend(cache_dir=None) as backend:
+        first = backend.plan(*files)
+        backend.idle.queue[0].kill()
+        dead = backend.plan(*files)
+        respawned = backend.plan(*files)
+    assert dead.status == ERROR
+    assert respawned.status == SOLVED
+    assert respawned.stats['pid'] != first.stats['pid']